@@ -67,6 +67,9 @@ pip install fastapi uvicorn python-dotenv psutil jinja2
 pip install python-multipart  # Pour les requêtes multipart/form-data
 
 echo "Dépendances installées"
+
+# Précompiler les templates Jinja (cache de bytecode dans data/cache/jinja)
+python linxo_agent/template_registry.py
 ENDSSH
 
 echo -e "${GREEN}✓${NC} Dépendances installées"
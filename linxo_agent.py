@@ -15,7 +15,6 @@ import argparse
 import sys
 import os
 import traceback
-import shutil
 from csv import Error as CsvError
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -32,6 +31,8 @@ from linxo_agent.linxo_driver_factory import (
 )
 from linxo_agent.analyzer import analyser_csv
 from linxo_agent.notifications import NotificationManager
+from linxo_agent.pipeline_metrics import track_stage
+from linxo_agent.storage_accounting import remove_tree
 from linxo_agent.run_analysis import should_send_notification, mark_notification_sent
 
 DOWNLOAD_ERRORS = (
@@ -103,18 +104,21 @@ def run_full_workflow(skip_download=False, skip_notifications=False, csv_file=No
             print("=" * 80)
 
             try:
-                # Initialiser le navigateur (retourne maintenant driver, wait, user_data_dir)
-                driver, wait, user_data_dir = initialiser_driver_linxo()
+                with track_stage("download") as stage:
+                    # Initialiser le navigateur (retourne maintenant driver, wait, user_data_dir)
+                    driver, wait, user_data_dir = initialiser_driver_linxo()
 
-                # Se connecter à Linxo
-                connexion_ok = se_connecter_linxo(driver, wait)
+                    # Se connecter à Linxo
+                    connexion_ok = se_connecter_linxo(driver, wait)
 
-                if not connexion_ok:
-                    print("[ERREUR] Echec de la connexion a Linxo")
-                    return results
+                    if not connexion_ok:
+                        print("[ERREUR] Echec de la connexion a Linxo")
+                        stage["success"] = False
+                        return results
 
-                # Télécharger le CSV
-                csv_path = telecharger_csv_linxo(driver, wait)
+                    # Télécharger le CSV
+                    csv_path = telecharger_csv_linxo(driver, wait)
+                    stage["success"] = bool(csv_path and Path(csv_path).exists())
 
                 if csv_path and Path(csv_path).exists():
                     print(f"[SUCCESS] CSV telecharge: {csv_path}")
@@ -147,7 +151,7 @@ def run_full_workflow(skip_download=False, skip_notifications=False, csv_file=No
                 # Cleanup du répertoire user-data temporaire
                 if user_data_dir and user_data_dir.exists():
                     try:
-                        shutil.rmtree(user_data_dir, ignore_errors=True)
+                        remove_tree(user_data_dir, ignore_errors=True)
                         print(
                             f"[CLEANUP] Repertoire temporaire supprime: "
                             f"{user_data_dir.name}"
@@ -223,7 +227,7 @@ def run_full_workflow(skip_download=False, skip_notifications=False, csv_file=No
 
                         if user_data_dir and user_data_dir.exists():
                             try:
-                                shutil.rmtree(user_data_dir, ignore_errors=True)
+                                remove_tree(user_data_dir, ignore_errors=True)
                             except (OSError, PermissionError):
                                 pass
 
@@ -292,7 +296,7 @@ AUCUN rapport budget n'a été envoyé.
         print("=" * 80)
 
         try:
-            analysis_result = analyser_csv(results['csv_path'])
+            analysis_result = analyser_csv(results['csv_path'], record_metrics=True)
 
             if analysis_result:
                 print("\n[SUCCESS] Analyse terminee!")
@@ -323,9 +327,8 @@ AUCUN rapport budget n'a été envoyé.
 
         report_index = None
         try:
-            import pandas as pd
             import os
-            from linxo_agent.reports import build_daily_report
+            from linxo_agent.reports import TransactionBatch, build_daily_report
 
             # Vérifier que REPORTS_BASE_URL est configuré
             base_url = os.getenv('REPORTS_BASE_URL')
@@ -333,30 +336,14 @@ AUCUN rapport budget n'a été envoyé.
                 base_url = "https://linxo.appliprz.ovh/reports"
                 print(f"[INFO] REPORTS_BASE_URL non defini, utilisation de {base_url}")
 
-            # Convertir les données en DataFrame
-            all_transactions = (
-                analysis_result.get('depenses_fixes', []) +
-                analysis_result.get('depenses_variables', [])
-            )
-
-            if all_transactions:
-                # Créer le DataFrame
-                df_data = []
-                for trans in all_transactions:
-                    df_data.append({
-                        'date': trans.get('date_str', ''),
-                        'libelle': trans.get('libelle', ''),
-                        'montant': trans.get('montant', 0),
-                        'categorie': trans.get('categorie', 'Non classé'),
-                        'date_str': trans.get('date_str', '')
-                    })
-
-                df = pd.DataFrame(df_data)
+            # Dépenses fixes + variables, en colonnes (sans pandas)
+            batch = TransactionBatch.from_analysis(analysis_result)
 
+            if len(batch):
                 # Générer les rapports
                 signing_key = os.getenv('REPORTS_SIGNING_KEY')
                 report_index = build_daily_report(
-                    df,
+                    batch,
                     report_date=None,  # Aujourd'hui par défaut
                     base_url=base_url,
                     signing_key=signing_key,
@@ -530,7 +517,7 @@ Résultat du diagnostic:
         # Cleanup du répertoire user-data temporaire
         if user_data_dir and user_data_dir.exists():
             try:
-                shutil.rmtree(user_data_dir, ignore_errors=True)
+                remove_tree(user_data_dir, ignore_errors=True)
                 print(
                     f"[CLEANUP] Repertoire temporaire supprime: "
                     f"{user_data_dir.name}"
@@ -557,7 +544,7 @@ Résultat du diagnostic:
         # Cleanup du répertoire user-data temporaire
         if user_data_dir and user_data_dir.exists():
             try:
-                shutil.rmtree(user_data_dir, ignore_errors=True)
+                remove_tree(user_data_dir, ignore_errors=True)
                 print(
                     f"[CLEANUP] Repertoire temporaire supprime: "
                     f"{user_data_dir.name}"
@@ -582,7 +569,7 @@ Résultat du diagnostic:
         # Cleanup du répertoire user-data temporaire
         if user_data_dir and user_data_dir.exists():
             try:
-                shutil.rmtree(user_data_dir, ignore_errors=True)
+                remove_tree(user_data_dir, ignore_errors=True)
                 print(
                     f"[CLEANUP] Repertoire temporaire supprime: "
                     f"{user_data_dir.name}"
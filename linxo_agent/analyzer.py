@@ -6,8 +6,11 @@ Version 2.0 - Refactorisé et simplifié avec configuration unifiée
 """
 
 import csv
+import hashlib
+import json
 import re
 import calendar
+import time
 from datetime import datetime
 from pathlib import Path
 import sys
@@ -15,13 +18,15 @@ import sys
 # Import du module de configuration unifié
 try:
     from config import get_config
+    from pipeline_metrics import record_stage, track_stage
 except ImportError:
     sys.path.insert(0, str(Path(__file__).parent))
     from config import get_config
+    from pipeline_metrics import record_stage, track_stage
 
 # Import du classificateur intelligent (optionnel)
 try:
-    from smart_classifier import create_classifier
+    from smart_classifier import get_shared_classifier
     SMART_CLASSIFIER_AVAILABLE = True
 except ImportError:
     SMART_CLASSIFIER_AVAILABLE = False
@@ -151,6 +156,49 @@ def doit_exclure_transaction(libelle, categorie="", notes="", montant=0.0):
     return False, None
 
 
+def _reference_key(depense_fixe):
+    """Libellé(s) et montant d'une dépense fixe, sérialisés"""
+    return json.dumps(
+        [depense_fixe.get('libelle', ''), depense_fixe.get('montant', 0)],
+        ensure_ascii=False, sort_keys=True
+    )
+
+
+def reference_id(depense_fixe, depenses_fixes=None):
+    """
+    Identifiant stable d'une dépense fixe de référence
+
+    Utilise l'ID attribué par l'interface d'administration s'il existe,
+    sinon une empreinte du libellé et du montant (les 'identifiant' ne sont
+    pas uniques). L'identifiant ne dépend pas de la position dans la liste:
+    une modification du fichier entre l'analyse et la génération des pages
+    (ajout, suppression, réordonnancement) ne change pas les rattachements.
+
+    Args:
+        depense_fixe: Entrée de depenses_fixes
+        depenses_fixes: Liste contenant l'entrée (départage les doublons
+            exacts par leur rang parmi les entrées identiques)
+
+    Returns:
+        str: Identifiant de référence
+    """
+    entry_id = depense_fixe.get('id')
+    if isinstance(entry_id, int):
+        return f"id-{entry_id}"
+    key = _reference_key(depense_fixe)
+    ref_id = f"ref-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]}"
+    if depenses_fixes:
+        duplicates = 0
+        for other in depenses_fixes:
+            if other is depense_fixe:
+                break
+            if not isinstance(other.get('id'), int) and _reference_key(other) == key:
+                duplicates += 1
+        if duplicates:
+            ref_id = f"{ref_id}-{duplicates + 1}"
+    return ref_id
+
+
 def est_depense_recurrente(transaction, depenses_fixes):
     """
     Détermine si une transaction est une dépense récurrente
@@ -161,6 +209,8 @@ def est_depense_recurrente(transaction, depenses_fixes):
 
     Returns:
         tuple: (bool, dict ou None) - (est_recurrente, depense_match)
+            depense_match contient 'ref_id' (voir reference_id), None si
+            la correspondance vient du label 'Récurrent'
     """
     libelle = transaction.get('libelle_complet', transaction.get('libelle', ''))
     libelle_upper = libelle.upper()
@@ -214,13 +264,15 @@ def est_depense_recurrente(transaction, depenses_fixes):
                         # Le libellé correspond et le montant est dans la tolérance
                         return True, {
                             'nom': depense_fixe.get('identifiant', pattern_libelle_str) if identifiant else pattern_libelle_str,
-                            'categorie': depense_fixe.get('categorie', 'Non classe')
+                            'categorie': depense_fixe.get('categorie', 'Non classe'),
+                            'ref_id': reference_id(depense_fixe, depenses_fixes)
                         }
                 else:
                     # Pas de montant de référence, le libellé seul suffit
                     return True, {
                         'nom': depense_fixe.get('identifiant', pattern_libelle_str) if identifiant else pattern_libelle_str,
-                        'categorie': depense_fixe.get('categorie', 'Non classe')
+                        'categorie': depense_fixe.get('categorie', 'Non classe'),
+                        'ref_id': reference_id(depense_fixe, depenses_fixes)
                     }
 
     # Méthode 2: Si le label contient 'Récurrent' (fallback)
@@ -228,24 +280,28 @@ def est_depense_recurrente(transaction, depenses_fixes):
     if labels and 'Récurrent' in labels:
         return True, {
             'nom': 'Depense recurrente (label)',
-            'categorie': transaction.get('categorie', 'Non classe')
+            'categorie': transaction.get('categorie', 'Non classe'),
+            'ref_id': None
         }
 
     return False, None
 
 
-def lire_csv_linxo(csv_path):
+def lire_csv_linxo(csv_path, timings=None):
     """
     Lit le fichier CSV exporté de Linxo avec filtrage des exclusions
 
     Args:
         csv_path: Chemin vers le fichier CSV
+        timings: dict optionnel, reçoit la durée du filtrage des exclusions
+            (clé 'exclude', secondes)
 
     Returns:
         tuple: (transactions_valides, transactions_exclues)
     """
     transactions = []
     exclus = []
+    exclude_seconds = 0.0
 
     print(f"\n[ANALYSE] Lecture du fichier CSV: {csv_path}")
 
@@ -307,9 +363,11 @@ def lire_csv_linxo(csv_path):
                 libelle_complet = f"{libelle} {notes}".strip()
 
                 # Vérifier si la transaction doit être exclue
+                exclude_start = time.perf_counter()
                 doit_exclure, raison = doit_exclure_transaction(
                     libelle_complet, categorie, notes, montant
                 )
+                exclude_seconds += time.perf_counter() - exclude_start
 
                 transaction = {
                     'date': date,
@@ -330,6 +388,8 @@ def lire_csv_linxo(csv_path):
                     transactions.append(transaction)
 
         print(f"[OK] {len(transactions)} transactions valides (+ {len(exclus)} exclues)")
+        if timings is not None:
+            timings['exclude'] = exclude_seconds
         return transactions, exclus
 
     except Exception as e:
@@ -367,7 +427,7 @@ def analyser_transactions(transactions, use_ml=True, enable_learning=True, enabl
     ml_classifications = 0
     if use_ml and SMART_CLASSIFIER_AVAILABLE:
         try:
-            classifier = create_classifier()
+            classifier = get_shared_classifier()
             print(f"[ML] Classificateur intelligent activé")
             stats = classifier.get_statistics()
             if stats['training_examples'] > 0:
@@ -413,6 +473,7 @@ def analyser_transactions(transactions, use_ml=True, enable_learning=True, enabl
         if est_recurrente:
             transaction['depense_recurrente'] = depense_match['nom']
             transaction['categorie_fixe'] = depense_match['categorie']
+            transaction['depense_fixe_id'] = depense_match['ref_id']
             depenses_fixes.append(transaction)
             total_fixes += abs(montant)
         else:
@@ -485,6 +546,32 @@ def analyser_transactions(transactions, use_ml=True, enable_learning=True, enabl
     }
 
 
+def lire_depenses_variables(csv_path):
+    """
+    Lit un CSV et retourne ses dépenses variables classées (sans apprentissage)
+
+    Point d'entrée de l'interface d'administration: exécuté dans un processus
+    séparé, il ne reçoit et ne renvoie que des données sérialisables.
+
+    Args:
+        csv_path: Chemin du fichier CSV
+
+    Returns:
+        list: Transactions variables (liste vide si le CSV est vide)
+    """
+    transactions, _ = lire_csv_linxo(str(csv_path))
+    if not transactions:
+        return []
+
+    analysis = analyser_transactions(
+        transactions,
+        use_ml=True,
+        enable_learning=False,
+        enable_familles=False
+    )
+    return analysis.get('depenses_variables', [])
+
+
 def generer_conseil_budget(total_depenses, budget_max):
     """
     Génère un conseil budget intelligent basé sur la situation
@@ -650,13 +737,15 @@ def generer_rapport(analyse, transactions_exclues, budget_max=None):
     return "\n".join(rapport)
 
 
-def analyser_csv(csv_path=None, budget_max=None):
+def analyser_csv(csv_path=None, budget_max=None, record_metrics=False):
     """
     Fonction principale d'analyse
 
     Args:
         csv_path: Chemin vers le fichier CSV (optionnel, utilise le dernier par défaut)
         budget_max: Budget maximum (optionnel, utilise config par défaut)
+        record_metrics: Enregistrer les étapes parse/exclude/classify dans les
+            métriques du pipeline (exécution planifiée uniquement)
 
     Returns:
         dict: Résultats de l'analyse complète
@@ -671,15 +760,24 @@ def analyser_csv(csv_path=None, budget_max=None):
         print(f"[ERREUR] Fichier CSV introuvable: {csv_path}")
         return None
 
-    # Lire le CSV
-    transactions, exclus = lire_csv_linxo(csv_path)
+    # Lire le CSV (les exclusions sont filtrées pendant la lecture)
+    timings = {}
+    with track_stage("parse", enabled=record_metrics) as stage:
+        transactions, exclus = lire_csv_linxo(csv_path, timings)
+        stage["rows"] = len(transactions) + len(exclus)
+        stage["success"] = bool(transactions)
+    if record_metrics:
+        # Filtrage fait pendant la lecture: durée cumulée des contrôles
+        record_stage("exclude", timings.get('exclude'), rows=len(exclus))
 
     if not transactions:
         print("[ERREUR] Aucune transaction a analyser")
         return None
 
     # Analyser
-    analyse = analyser_transactions(transactions)
+    with track_stage("classify", enabled=record_metrics) as stage:
+        analyse = analyser_transactions(transactions)
+        stage["rows"] = len(transactions)
 
     # Générer le rapport
     rapport = generer_rapport(analyse, exclus, budget_max)
@@ -8,11 +8,145 @@ Gère les environnements Windows/Linux et charge toutes les configurations
 import os
 import sys
 import json
+import tempfile
 import time
+from contextlib import contextmanager
 from datetime import datetime, timedelta, date
 from pathlib import Path
+from typing import IO, Any, Iterator, Optional, Tuple
 from dotenv import load_dotenv
 
+try:
+    import fcntl
+except ImportError:  # Windows: pas de verrou consultatif
+    fcntl = None
+
+
+# ---------------------------------------------------------------------- #
+# Fichiers de configuration JSON partagés (depenses_recurrentes.json)    #
+# ---------------------------------------------------------------------- #
+#
+# Lus par le cron (Config) et écrits par l'interface admin (ConfigManager):
+# - verrou consultatif fcntl sur un fichier voisin "<nom>.lock" (le JSON
+#   lui-même est remplacé à chaque écriture, un verrou posé dessus ne
+#   protégerait pas le fichier suivant)
+# - écriture dans un fichier temporaire puis os.replace: un lecteur voit
+#   l'ancienne ou la nouvelle version, jamais un fichier tronqué
+# - le fichier .lock contient la version de la configuration, incrémentée
+#   à chaque écriture: les caches qui dépendent de la configuration
+#   peuvent l'utiliser comme clé
+
+def config_lock_path(path: Path) -> Path:
+    """Fichier de verrou (et de version) associé à un fichier de configuration"""
+    return path.with_name(path.name + '.lock')
+
+
+@contextmanager
+def config_file_lock(path: Path, exclusive: bool = False) -> Iterator[IO[str]]:
+    """
+    Verrou consultatif sur un fichier de configuration
+
+    Args:
+        path: Fichier de configuration protégé
+        exclusive: True pour une écriture, False (partagé) pour une lecture
+
+    Yields:
+        IO[str]: Fichier de verrou ouvert (contient la version)
+    """
+    lock_path = config_lock_path(path)
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, 'a+', encoding='utf-8') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield lock_file
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def _read_version(lock_file: IO[str]) -> int:
+    lock_file.seek(0)
+    try:
+        return int(lock_file.read().strip() or 0)
+    except ValueError:
+        return 0
+
+
+def config_version(path: Path) -> int:
+    """Version d'un fichier de configuration (0 s'il n'a jamais été écrit par write_json_config)"""
+    if not config_lock_path(path).exists():
+        return 0
+    with config_file_lock(path) as lock_file:
+        return _read_version(lock_file)
+
+
+def config_file_stat(path: Path) -> Tuple[int, int]:
+    """(st_mtime_ns, st_size) d'un fichier de configuration ((-1, -1) s'il est absent)"""
+    try:
+        st = path.stat()
+    except OSError:
+        return -1, -1
+    return st.st_mtime_ns, st.st_size
+
+
+def read_json_config(path: Path) -> Tuple[Any, int]:
+    """
+    Lit un fichier de configuration JSON sous verrou partagé
+
+    Returns:
+        Tuple[Any, int]: (contenu, version)
+
+    Raises:
+        OSError, json.JSONDecodeError: Fichier absent ou invalide
+    """
+    with config_file_lock(path) as lock_file:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data, _read_version(lock_file)
+
+
+def write_json_config(path: Path, data: Any, lock_file: Optional[IO[str]] = None) -> int:
+    """
+    Écrit un fichier de configuration JSON (atomique) et incrémente sa version
+
+    Args:
+        path: Fichier de configuration
+        data: Contenu sérialisable en JSON
+        lock_file: Verrou exclusif déjà pris par l'appelant (config_file_lock);
+            pris ici sinon
+
+    Returns:
+        int: Nouvelle version
+    """
+    if lock_file is None:
+        with config_file_lock(path, exclusive=True) as own_lock:
+            return write_json_config(path, data, own_lock)
+
+    fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp crée en 0600: garder les droits du fichier remplacé
+        os.chmod(tmp_name, path.stat().st_mode & 0o777 if path.exists() else 0o644)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+    version = _read_version(lock_file) + 1
+    lock_file.seek(0)
+    lock_file.truncate()
+    lock_file.write(str(version))
+    lock_file.flush()
+    return version
+
+
 class Config:
     """Configuration unifiée pour tous les environnements"""
 
@@ -147,10 +281,13 @@ class Config:
     def _load_depenses_config(self):
         """Charge la configuration des dépenses depuis .env et JSON"""
         # Charger le fichier depenses_recurrentes.json si disponible
+        self.depenses_version = 0
+        # Relevé avant lecture: une écriture concurrente provoquera un rechargement
+        self.depenses_stat = config_file_stat(self.depenses_file)
         if self.depenses_file.exists():
             try:
-                with open(self.depenses_file, 'r', encoding='utf-8') as f:
-                    self.depenses_data = json.load(f)
+                # Verrou partagé: jamais de lecture pendant une écriture de l'admin
+                self.depenses_data, self.depenses_version = read_json_config(self.depenses_file)
 
                 # S'assurer que les nouvelles structures existent
                 self.depenses_data.setdefault('ajustements_budget', [])
@@ -459,6 +596,13 @@ def get_config():
     global _CONFIG_INSTANCE  # pylint: disable=global-statement
     if _CONFIG_INSTANCE is None:
         _CONFIG_INSTANCE = Config()
+    elif (
+        config_version(_CONFIG_INSTANCE.depenses_file) != _CONFIG_INSTANCE.depenses_version
+        or config_file_stat(_CONFIG_INSTANCE.depenses_file) != _CONFIG_INSTANCE.depenses_stat
+    ):
+        # depenses_recurrentes.json réécrit depuis le chargement (interface admin
+        # ou édition manuelle, qui ne change pas la version)
+        _CONFIG_INSTANCE._load_depenses_config()  # pylint: disable=protected-access
     return _CONFIG_INSTANCE
 
 
@@ -469,4 +613,8 @@ def reload_config():
     return _CONFIG_INSTANCE
 
 # Export pour faciliter l'usage
-__all__ = ['Config', 'get_config', 'reload_config']
+__all__ = [
+    'Config', 'get_config', 'reload_config',
+    'config_file_lock', 'config_file_stat', 'config_version', 'read_json_config',
+    'write_json_config',
+]
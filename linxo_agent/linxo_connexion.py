@@ -36,6 +36,13 @@ except ImportError:
     sys.path.insert(0, str(Path(__file__).parent))
     from config import get_config  # type: ignore
 
+# Suppressions des profils Chrome reportées dans la comptabilité disque
+try:
+    from .storage_accounting import remove_tree, storage_ledger
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from storage_accounting import remove_tree, storage_ledger  # type: ignore
+
 # Import du module 2FA
 try:
     from .linxo_2fa import recuperer_code_2fa_email
@@ -119,23 +126,25 @@ def _nettoyer_anciens_user_data_dirs(base_dir, max_age_hours=24):
         current_time = datetime.now()
         max_age = timedelta(hours=max_age_hours)
 
-        for user_data_dir in base_path.glob(pattern):
-            if not user_data_dir.is_dir():
-                continue
+        # Profils supprimés: une seule mise à jour du compteur disque
+        with storage_ledger.batch():
+            for user_data_dir in base_path.glob(pattern):
+                if not user_data_dir.is_dir():
+                    continue
 
-            try:
-                # Vérifier l'âge du répertoire
-                dir_mtime = datetime.fromtimestamp(user_data_dir.stat().st_mtime)
-                age = current_time - dir_mtime
+                try:
+                    # Vérifier l'âge du répertoire
+                    dir_mtime = datetime.fromtimestamp(user_data_dir.stat().st_mtime)
+                    age = current_time - dir_mtime
 
-                if age > max_age:
-                    print(f"[CLEANUP] Suppression du repertoire ancien: {user_data_dir.name} (age: {age.total_seconds()/3600:.1f}h)")
-                    shutil.rmtree(user_data_dir, ignore_errors=True)
-                    repertoires_supprimes += 1
+                    if age > max_age:
+                        print(f"[CLEANUP] Suppression du repertoire ancien: {user_data_dir.name} (age: {age.total_seconds()/3600:.1f}h)")
+                        remove_tree(user_data_dir, ignore_errors=True)
+                        repertoires_supprimes += 1
 
-            except (OSError, ValueError) as e:
-                print(f"[WARN] Impossible de supprimer {user_data_dir.name}: {e}")
-                continue
+                except (OSError, ValueError) as e:
+                    print(f"[WARN] Impossible de supprimer {user_data_dir.name}: {e}")
+                    continue
 
     except Exception as e:
         print(f"[WARN] Erreur lors du nettoyage des repertoires: {e}")
@@ -717,7 +726,7 @@ def initialiser_driver_linxo(download_dir=None, headless=False, cleanup=True, ma
             if user_data_dir is not None:
                 try:
                     if user_data_dir.exists():
-                        shutil.rmtree(user_data_dir, ignore_errors=True)
+                        remove_tree(user_data_dir, ignore_errors=True)
                         print(f"[CLEANUP] Repertoire temporaire supprime: {user_data_dir.name}")
                 except Exception as cleanup_error:
                     print(f"[WARN] Impossible de supprimer {user_data_dir.name}: {cleanup_error}")
@@ -1095,7 +1104,7 @@ if __name__ == "__main__":
 
         # Cleanup du répertoire temporaire
         if test_user_data_dir and test_user_data_dir.exists():
-            shutil.rmtree(test_user_data_dir, ignore_errors=True)
+            remove_tree(test_user_data_dir, ignore_errors=True)
             print(f"[CLEANUP] Repertoire temporaire supprime: {test_user_data_dir.name}")
 
     except KeyboardInterrupt:
@@ -1108,7 +1117,7 @@ if __name__ == "__main__":
 
         # Cleanup du répertoire temporaire
         if test_user_data_dir and test_user_data_dir.exists():
-            shutil.rmtree(test_user_data_dir, ignore_errors=True)
+            remove_tree(test_user_data_dir, ignore_errors=True)
             print(f"[CLEANUP] Repertoire temporaire supprime: {test_user_data_dir.name}")
 
     except WebDriverException as e:
@@ -1117,5 +1126,5 @@ if __name__ == "__main__":
 
         # Cleanup du répertoire temporaire
         if test_user_data_dir and test_user_data_dir.exists():
-            shutil.rmtree(test_user_data_dir, ignore_errors=True)
+            remove_tree(test_user_data_dir, ignore_errors=True)
             print(f"[CLEANUP] Repertoire temporaire supprime: {test_user_data_dir.name}")
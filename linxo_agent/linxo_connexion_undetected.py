@@ -98,6 +98,13 @@ except ImportError:
     sys.path.insert(0, str(Path(__file__).parent))
     from linxo_2fa import recuperer_code_2fa_email  # type: ignore
 
+# Suppressions des profils Chrome reportées dans la comptabilité disque
+try:
+    from .storage_accounting import remove_tree
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from storage_accounting import remove_tree  # type: ignore
+
 # Importer les fonctions utilitaires du module standard
 try:
     from .linxo_connexion import (
@@ -263,8 +270,7 @@ def initialiser_driver_linxo_undetected(
             if user_data_dir is not None:
                 try:
                     if user_data_dir.exists():
-                        import shutil
-                        shutil.rmtree(user_data_dir, ignore_errors=True)
+                        remove_tree(user_data_dir, ignore_errors=True)
                         print(f"[CLEANUP] Répertoire temporaire supprimé: {user_data_dir.name}")
                 except Exception as cleanup_error:
                     print(f"[WARN] Impossible de supprimer {user_data_dir.name}: {cleanup_error}")
@@ -331,8 +337,7 @@ if __name__ == "__main__":
 
         # Cleanup du répertoire temporaire
         if test_user_data_dir and test_user_data_dir.exists():
-            import shutil
-            shutil.rmtree(test_user_data_dir, ignore_errors=True)
+            remove_tree(test_user_data_dir, ignore_errors=True)
             print(f"[CLEANUP] Répertoire temporaire supprimé: {test_user_data_dir.name}")
 
     except KeyboardInterrupt:
@@ -344,13 +349,11 @@ if __name__ == "__main__":
                 pass
 
         if test_user_data_dir and test_user_data_dir.exists():
-            import shutil
-            shutil.rmtree(test_user_data_dir, ignore_errors=True)
+            remove_tree(test_user_data_dir, ignore_errors=True)
 
     except (WebDriverException, Exception) as e:
         print(f"\n[ERREUR] Erreur durant le test: {e}")
         traceback.print_exc()
 
         if test_user_data_dir and test_user_data_dir.exists():
-            import shutil
-            shutil.rmtree(test_user_data_dir, ignore_errors=True)
+            remove_tree(test_user_data_dir, ignore_errors=True)
@@ -209,6 +209,81 @@ def _config_from_env() -> NotificationConfig:
     return NotificationConfig(emails=email_settings, ovh_sms=ovh_settings, whatsapp=whatsapp_settings)
 
 
+def _local_budget_state(total_variables: float, budget_max: float) -> Mapping[str, Any]:
+    """
+    État budgétaire calculé sur place, à la date du jour (module des rapports
+    indisponible): mêmes clés que compute_budget_state.
+    """
+    import calendar
+    from datetime import datetime as _dt
+
+    now = _dt.now()
+    reste = budget_max - total_variables
+    pct = (total_variables / budget_max * 100) if budget_max > 0 else 0.0
+    jours_dans_mois = calendar.monthrange(now.year, now.month)[1]
+    jours_restants = jours_dans_mois - now.day
+    avancement_mois = (now.day / jours_dans_mois) * 100.0
+
+    couleur_barre_variables = "#28a745"
+    if reste < 0:
+        couleur_barre_variables = "#dc3545"
+    elif pct > avancement_mois + 10:
+        couleur_barre_variables = "#fd7e14"
+
+    # Prédiction basée sur la tendance actuelle (dépense quotidienne moyenne)
+    prediction_fin_mois = total_variables + (total_variables / now.day) * jours_restants
+    prediction_depassement = prediction_fin_mois - budget_max
+    prediction_pourcentage = (prediction_fin_mois / budget_max * 100) if budget_max > 0 else 0
+
+    couleur_prediction = "#28a745"
+    if prediction_depassement > 0:
+        couleur_prediction = "#dc3545"
+    elif prediction_pourcentage > 90:
+        couleur_prediction = "#fd7e14"
+
+    if prediction_depassement > 0:
+        message_prediction = f"⚠️ Vous risquez de dépasser de {abs(prediction_depassement):.2f} €"
+    elif prediction_pourcentage > 90:
+        message_prediction = f"⚡ Attention, vous serez à {prediction_pourcentage:.0f}% du budget"
+    else:
+        message_prediction = f"✅ Vous devriez rester sous budget ({prediction_pourcentage:.0f}%)"
+
+    return {
+        "reste": reste,
+        "pourcentage": pct,
+        "avancement_mois": avancement_mois,
+        "jours_restants": jours_restants,
+        "couleur_barre_variables": couleur_barre_variables,
+        "prediction_fin_mois": prediction_fin_mois,
+        "prediction_depassement": prediction_depassement,
+        "prediction_pourcentage": prediction_pourcentage,
+        "couleur_prediction": couleur_prediction,
+        "message_prediction": message_prediction,
+    }
+
+
+def _budget_state(
+    report_date: str, total_variables: float, total_fixes: float, budget_max: float
+) -> Mapping[str, Any]:
+    """
+    État budgétaire à la date du rapport, calculé comme pour la page index et
+    le manifeste (calcul sur place si le module des rapports est indisponible).
+    """
+    try:
+        try:
+            from reports import compute_budget_state  # type: ignore
+        except ImportError:
+            from linxo_agent.reports import compute_budget_state  # type: ignore
+    except Exception:  # pylint: disable=broad-except
+        return _local_budget_state(total_variables, budget_max)
+    from datetime import date as _date, datetime as _dt
+    try:
+        r_date = _dt.strptime(report_date, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        r_date = _date.today()
+    return compute_budget_state(r_date, total_variables, total_fixes, budget_max)
+
+
 def load_notification_config() -> NotificationConfig:
     """
     Charge la configuration (priorité au module `linxo_agent.config` si présent).
@@ -632,8 +707,16 @@ class NotificationManager:
             analysis_result.get("total_variables", 0) or 0
         )  # type: ignore[arg-type]
         budget_max = float(analysis_result.get("budget_max", 0) or 0)  # type: ignore[arg-type]
-        reste = budget_max - total_depenses
-        pct = (total_depenses / budget_max * 100) if budget_max > 0 else 0.0
+        total_fixes = float(
+            analysis_result.get("total_fixes", 0) or 0
+        )  # type: ignore[arg-type]
+
+        # SMS, sujet et email: tous les chiffres viennent du même état budgétaire
+        state = _budget_state(
+            getattr(report_index, "report_date", ""), total_depenses, total_fixes, budget_max
+        )
+        reste = state["reste"]
+        pct = state["pourcentage"]
 
         # SMS via formateur si dispo
         sms_msg = None
@@ -659,16 +742,14 @@ class NotificationManager:
         html_body: Optional[str] = None
         try:
             if report_index is not None:
-                # Essai rendu Jinja2 si présent
-                from jinja2 import Environment, FileSystemLoader, select_autoescape  # type: ignore
+                # Essai rendu Jinja2 si présent (environnement partagé)
+                try:
+                    from template_registry import get_template  # type: ignore
+                except ImportError:
+                    from linxo_agent.template_registry import get_template  # type: ignore
                 import os as _os
 
-                templates_dir = Path(__file__).parent.parent / "templates" / "email"
-                env = Environment(
-                    loader=FileSystemLoader(templates_dir),
-                    autoescape=select_autoescape(["html", "xml"]),
-                )
-                template = env.get_template("daily_summary.html.j2")
+                template = get_template("daily_summary.html.j2", group="email")
 
                 base_url = _os.getenv("REPORTS_BASE_URL") or "https://linxo.appliprz.ovh/reports"
                 index_url = "#"
@@ -714,9 +795,6 @@ class NotificationManager:
                         except Exception:  # pylint: disable=broad-except
                             pass
 
-                total_fixes = float(
-                    analysis_result.get("total_fixes", 0) or 0
-                )  # type: ignore[arg-type]
                 try:
                     # si la config expose les dépenses fixes de référence
                     cfg = _try_import_get_config()
@@ -736,17 +814,6 @@ class NotificationManager:
                 except Exception:  # pylint: disable=broad-except
                     budget_fixes_prevu = 3271.0  # Fallback (mise à jour 2025)
 
-                import calendar
-                now = _dt.now()
-                avancement_mois = (
-                    now.day / calendar.monthrange(now.year, now.month)[1]
-                ) * 100.0
-                couleur_barre_variables = "#28a745"
-                if reste < 0:
-                    couleur_barre_variables = "#dc3545"
-                elif pct > avancement_mois + 10:
-                    couleur_barre_variables = "#fd7e14"
-
                 pourcentage_fixes = (
                     (total_fixes / budget_fixes_prevu * 100)
                     if budget_fixes_prevu > 0
@@ -758,38 +825,6 @@ class NotificationManager:
                 elif pourcentage_fixes > 90:
                     couleur_barre_fixes = "#fd7e14"
 
-                # Calcul de la prédiction de fin de mois
-                jours_dans_mois = calendar.monthrange(now.year, now.month)[1]
-                jours_restants = jours_dans_mois - now.day
-
-                # Prédiction basée sur la tendance actuelle (dépense quotidienne moyenne)
-                if now.day > 0:
-                    depense_quotidienne_moyenne = total_depenses / now.day
-                    prediction_fin_mois = total_depenses + (depense_quotidienne_moyenne * jours_restants)
-                    prediction_depassement = prediction_fin_mois - budget_max
-                    prediction_pourcentage = (prediction_fin_mois / budget_max * 100) if budget_max > 0 else 0
-
-                    # Couleur de la prédiction
-                    couleur_prediction = "#28a745"  # Vert = OK
-                    if prediction_depassement > 0:
-                        couleur_prediction = "#dc3545"  # Rouge = dépassement
-                    elif prediction_pourcentage > 90:
-                        couleur_prediction = "#fd7e14"  # Orange = attention
-
-                    # Message de prédiction
-                    if prediction_depassement > 0:
-                        message_prediction = f"⚠️ Vous risquez de dépasser de {abs(prediction_depassement):.2f} €"
-                    elif prediction_pourcentage > 90:
-                        message_prediction = f"⚡ Attention, vous serez à {prediction_pourcentage:.0f}% du budget"
-                    else:
-                        message_prediction = f"✅ Vous devriez rester sous budget ({prediction_pourcentage:.0f}%)"
-                else:
-                    prediction_fin_mois = 0
-                    prediction_depassement = 0
-                    prediction_pourcentage = 0
-                    couleur_prediction = "#6c757d"
-                    message_prediction = "⏳ Prédiction disponible après le 1er jour"
-
                 html_body = template.render(
                     report_date=getattr(report_index, "report_date", ""),
                     total_variables=total_depenses,
@@ -799,15 +834,15 @@ class NotificationManager:
                     reste=reste,
                     pourcentage=pct,
                     pourcentage_fixes=pourcentage_fixes,
-                    couleur_barre_variables=couleur_barre_variables,
+                    couleur_barre_variables=state["couleur_barre_variables"],
                     couleur_barre_fixes=couleur_barre_fixes,
-                    avancement_mois=avancement_mois,
-                    prediction_fin_mois=prediction_fin_mois,
-                    prediction_depassement=prediction_depassement,
-                    prediction_pourcentage=prediction_pourcentage,
-                    couleur_prediction=couleur_prediction,
-                    message_prediction=message_prediction,
-                    jours_restants=jours_restants,
+                    avancement_mois=state["avancement_mois"],
+                    prediction_fin_mois=state["prediction_fin_mois"],
+                    prediction_depassement=state["prediction_depassement"],
+                    prediction_pourcentage=state["prediction_pourcentage"],
+                    couleur_prediction=state["couleur_prediction"],
+                    message_prediction=state["message_prediction"],
+                    jours_restants=state["jours_restants"],
                     families=getattr(report_index, "families", []),
                     grand_total=getattr(report_index, "grand_total", 0),
                     index_url=index_url,
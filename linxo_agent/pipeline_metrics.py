@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Métriques de la dernière exécution du pipeline quotidien.
+
+Chaque étape (téléchargement, lecture, exclusions, classification, rapports,
+upload, notifications) enregistre sa durée et son nombre de lignes dans un
+fichier JSON local. Le serveur de rapports le relit pour /metrics.
+
+Les scripts du cron (linxo_agent.py puis run_analysis.py) écrivent chacun
+leurs étapes: le fichier garde la dernière valeur connue de chaque étape.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+# Étapes du pipeline, dans l'ordre d'exécution
+PIPELINE_STAGES = ("download", "parse", "exclude", "classify", "report", "upload", "notify")
+
+PIPELINE_METRICS_FILE = Path(
+    os.getenv(
+        "PIPELINE_METRICS_FILE",
+        str(Path(__file__).parent.parent / "data" / "metrics" / "pipeline.json"),
+    )
+)
+
+
+def load_pipeline_metrics(path: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    Lit les métriques de la dernière exécution.
+
+    Returns:
+        Dict: {"updated_at": ..., "stages": {nom: {...}}} (stages vide si absent)
+    """
+    path = path or PIPELINE_METRICS_FILE
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {"stages": {}}
+    if not isinstance(data, dict) or not isinstance(data.get("stages"), dict):
+        return {"stages": {}}
+    return data
+
+
+def record_stage(
+    name: str,
+    duration: Optional[float] = None,
+    rows: Optional[int] = None,
+    success: bool = True,
+    path: Optional[Path] = None,
+) -> None:
+    """
+    Enregistre le résultat d'une étape (écriture atomique).
+
+    Ne lève jamais d'exception: les métriques ne doivent pas faire échouer
+    le pipeline.
+
+    Args:
+        name: Nom de l'étape (voir PIPELINE_STAGES)
+        duration: Durée en secondes (None si non mesurable séparément)
+        rows: Nombre de lignes traitées
+        success: False si l'étape a échoué
+        path: Fichier de métriques (défaut: PIPELINE_METRICS_FILE)
+    """
+    path = path or PIPELINE_METRICS_FILE
+    try:
+        metrics = load_pipeline_metrics(path)
+        now = time.time()
+        metrics["stages"][name] = {
+            "duration_seconds": duration,
+            "rows": rows,
+            "success": success,
+            "finished_at": now,
+        }
+        metrics["updated_at"] = datetime.fromtimestamp(now).isoformat()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(metrics, f, indent=2, sort_keys=True)
+        os.replace(tmp_name, path)
+    except OSError as e:
+        print(f"[WARN] Metriques du pipeline non enregistrees ({name}): {e}")
+
+
+@contextmanager
+def track_stage(name: str, path: Optional[Path] = None, enabled: bool = True) -> Iterator[Dict[str, Any]]:
+    """
+    Mesure la durée d'un bloc et l'enregistre comme étape du pipeline.
+
+    Le bloc peut renseigner stage["rows"] et stage["success"] (échec sans
+    exception); une exception marque l'étape en échec puis est propagée.
+    Avec enabled=False rien n'est enregistré (appel hors du pipeline: admin,
+    scripts de test), le bloc s'exécute normalement.
+
+    Usage:
+        with track_stage("report") as stage:
+            index = build_daily_report(...)
+            stage["rows"] = index.total_transactions
+    """
+    stage: Dict[str, Any] = {"rows": None, "success": True}
+    if not enabled:
+        yield stage
+        return
+    start = time.perf_counter()
+    try:
+        yield stage
+    except BaseException:
+        record_stage(name, time.perf_counter() - start, stage["rows"], success=False, path=path)
+        raise
+    record_stage(name, time.perf_counter() - start, stage["rows"], success=bool(stage["success"]), path=path)
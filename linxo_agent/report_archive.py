@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Archivage des rapports journaliers en conteneurs mensuels.
+
+- data/reports/archive/<YYYY-MM>.zip : un zip par mois, entrées <YYYY-MM-DD>/<fichier>
+- Les variantes déjà compressées (.gz, .br) sont stockées telles quelles,
+  le HTML et les manifestes sont compressés (deflate)
+- Le répertoire central du zip sert d'index: une page se lit sans parcourir
+  le disque, et le serveur de rapports la sert directement depuis le pack
+
+Usage:
+    python linxo_agent/report_archive.py --days 90
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    from storage_accounting import remove_tree, replace_file, storage_ledger
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from storage_accounting import remove_tree, replace_file, storage_ledger
+
+# Même racine que reports.REPORTS_ROOT (ce module ne dépend que de la stdlib)
+REPORTS_ROOT = Path(__file__).parent.parent / "data" / "reports"
+ARCHIVE_DIR_NAME = "archive"
+
+# Suffixes stockés sans recompression
+_PRECOMPRESSED_SUFFIXES = (".gz", ".br")
+
+_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+@dataclass
+class ArchivedFile:
+    """Fichier lu depuis un pack mensuel"""
+    data: bytes
+    mtime_ns: int
+    pack_path: Path
+    pack_stat: Tuple[int, int]
+
+
+def archive_dir(reports_root: Path) -> Path:
+    return reports_root / ARCHIVE_DIR_NAME
+
+
+def pack_path(reports_root: Path, report_date: str) -> Path:
+    """Pack mensuel contenant une date de rapport (YYYY-MM-DD)."""
+    return archive_dir(reports_root) / f"{report_date[:7]}.zip"
+
+
+def _pack_stat(path: Path) -> Tuple[int, int]:
+    try:
+        stat_result = path.stat()
+    except OSError:
+        return -1, -1
+    return stat_result.st_mtime_ns, stat_result.st_size
+
+
+def _zip_mtime_ns(info: zipfile.ZipInfo) -> int:
+    """Date d'une entrée (heure locale, précision 2 s) en nanosecondes."""
+    return int(time.mktime(info.date_time + (0, 0, -1))) * 1_000_000_000
+
+
+class _OpenPack:
+    """Pack ouvert et nombre de lectures en cours."""
+
+    __slots__ = ("stat", "zip", "users", "retired")
+
+    def __init__(self, stat: Tuple[int, int], pack: zipfile.ZipFile):
+        self.stat = stat
+        self.zip = pack
+        self.users = 0
+        self.retired = False
+
+
+class _PackReader:
+    """
+    Packs ouverts en lecture, rouverts si le fichier zip a changé.
+
+    Un pack ouvert garde son répertoire central en mémoire: la lecture
+    d'une page coûte un stat() du pack et un accès direct à l'entrée.
+    Un pack remplacé est fermé dès que plus aucune lecture ne l'utilise.
+    """
+
+    def __init__(self):
+        self._packs: Dict[Path, _OpenPack] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def open(self, path: Path) -> Iterator[Optional[Tuple[Tuple[int, int], zipfile.ZipFile]]]:
+        """(stat, ZipFile) du pack pendant le bloc with, None s'il est absent ou illisible."""
+        pack = self._acquire(path)
+        if pack is None:
+            yield None
+            return
+        try:
+            yield pack.stat, pack.zip
+        finally:
+            self._release(pack)
+
+    def _acquire(self, path: Path) -> Optional[_OpenPack]:
+        current = _pack_stat(path)
+        with self._lock:
+            pack = self._packs.get(path)
+            if pack is None or pack.stat != current:
+                if pack is not None:
+                    del self._packs[path]
+                    self._retire(pack)
+                if current[0] < 0:
+                    return None
+                try:
+                    pack = _OpenPack(current, zipfile.ZipFile(path))
+                except (OSError, zipfile.BadZipFile):
+                    return None
+                self._packs[path] = pack
+            pack.users += 1
+            return pack
+
+    def _release(self, pack: _OpenPack) -> None:
+        with self._lock:
+            pack.users -= 1
+            if pack.retired and pack.users == 0:
+                pack.zip.close()
+
+    @staticmethod
+    def _retire(pack: _OpenPack) -> None:
+        # Lecture en cours: fermé par la dernière, sinon tout de suite
+        pack.retired = True
+        if pack.users == 0:
+            pack.zip.close()
+
+    def close(self) -> None:
+        with self._lock:
+            for pack in self._packs.values():
+                self._retire(pack)
+            self._packs.clear()
+
+
+_reader = _PackReader()
+
+
+def read_archived_file(reports_root: Path, report_date: str, name: str) -> Optional[ArchivedFile]:
+    """
+    Lit un fichier de rapport archivé.
+
+    Args:
+        reports_root: Racine des rapports
+        report_date: Date du rapport (YYYY-MM-DD)
+        name: Chemin du fichier dans le répertoire de la date
+
+    Returns:
+        Optional[ArchivedFile]: Contenu et métadonnées, ou None si absent
+    """
+    if not _DATE_RE.fullmatch(report_date):
+        return None
+    path = pack_path(reports_root, report_date)
+    with _reader.open(path) as opened:
+        if opened is None:
+            return None
+        stat, pack = opened
+        try:
+            info = pack.getinfo(f"{report_date}/{name}")
+            data = pack.read(info)
+        except (KeyError, OSError, zipfile.BadZipFile):
+            return None
+    return ArchivedFile(data=data, mtime_ns=_zip_mtime_ns(info), pack_path=path, pack_stat=stat)
+
+
+def archived_dates(reports_root: Path) -> List[str]:
+    """Dates de rapport présentes dans les packs (triées)."""
+    dates = set()
+    for path in sorted(archive_dir(reports_root).glob("*.zip")):
+        with _reader.open(path) as opened:
+            if opened is None:
+                continue
+            for entry_name in opened[1].namelist():
+                report_date = entry_name.split("/", 1)[0]
+                if _DATE_RE.fullmatch(report_date):
+                    dates.add(report_date)
+    return sorted(dates)
+
+
+def _write_pack(path: Path, report_dirs: List[Path]) -> int:
+    """
+    Réécrit un pack mensuel avec les répertoires donnés (atomiquement).
+
+    Les entrées existantes des autres dates sont recopiées; celles des
+    dates réarchivées sont remplacées.
+
+    Returns:
+        int: Nombre de fichiers ajoutés
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    replaced = {report_dir.name for report_dir in report_dirs}
+    added = 0
+
+    fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        with zipfile.ZipFile(tmp_name, "w") as pack:
+            if path.exists():
+                with zipfile.ZipFile(path) as previous:
+                    for info in previous.infolist():
+                        if info.filename.split("/", 1)[0] in replaced:
+                            continue
+                        copied = zipfile.ZipInfo(info.filename, info.date_time)
+                        copied.compress_type = info.compress_type
+                        copied.external_attr = info.external_attr
+                        with previous.open(info) as source, pack.open(copied, "w") as target:
+                            shutil.copyfileobj(source, target)
+
+            for report_dir in sorted(report_dirs):
+                for file_path in sorted(report_dir.rglob("*")):
+                    # Fichiers temporaires d'une écriture en cours ignorés
+                    if not file_path.is_file() or file_path.name.startswith("."):
+                        continue
+                    arcname = f"{report_dir.name}/{file_path.relative_to(report_dir).as_posix()}"
+                    compress_type = (
+                        zipfile.ZIP_STORED
+                        if file_path.suffix in _PRECOMPRESSED_SUFFIXES
+                        else zipfile.ZIP_DEFLATED
+                    )
+                    pack.write(file_path, arcname, compress_type=compress_type)
+                    added += 1
+
+        os.chmod(tmp_name, 0o644)
+        replace_file(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+    return added
+
+
+def archive_reports(
+    older_than_days: int,
+    reports_root: Optional[Path] = None,
+    today: Optional[date] = None,
+) -> Dict[str, List[str]]:
+    """
+    Range les rapports de plus de `older_than_days` jours dans les packs mensuels.
+
+    Les répertoires ne sont supprimés qu'une fois le pack écrit. Un rapport
+    régénéré après archivage (répertoire de nouveau présent) est servi en
+    priorité, puis remplace son ancienne version au prochain archivage.
+
+    Args:
+        older_than_days: Âge minimal (en jours) des rapports à archiver
+        reports_root: Racine des rapports (défaut: data/reports)
+        today: Date de référence (défaut: aujourd'hui)
+
+    Returns:
+        Dict[str, List[str]]: Mois (YYYY-MM) -> dates archivées
+    """
+    reports_root = reports_root or REPORTS_ROOT
+    if not reports_root.exists():
+        return {}
+
+    cutoff = ((today or date.today()) - timedelta(days=older_than_days)).isoformat()
+    by_month: Dict[str, List[Path]] = defaultdict(list)
+    for entry in reports_root.iterdir():
+        if entry.is_dir() and _DATE_RE.fullmatch(entry.name) and entry.name < cutoff:
+            by_month[entry.name[:7]].append(entry)
+
+    archived: Dict[str, List[str]] = {}
+    # Packs écrits et répertoires supprimés: une seule mise à jour du compteur disque
+    with storage_ledger.batch():
+        for month, report_dirs in sorted(by_month.items()):
+            path = archive_dir(reports_root) / f"{month}.zip"
+            _write_pack(path, report_dirs)
+            for report_dir in report_dirs:
+                remove_tree(report_dir)
+            archived[month] = sorted(report_dir.name for report_dir in report_dirs)
+    return archived
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive les anciens rapports en packs mensuels")
+    parser.add_argument(
+        "--days", type=int, default=int(os.getenv("REPORTS_ARCHIVE_DAYS", "90")),
+        help="Âge minimal des rapports à archiver (défaut: REPORTS_ARCHIVE_DAYS ou 90)",
+    )
+    args = parser.parse_args()
+
+    result = archive_reports(args.days)
+    total = sum(len(dates) for dates in result.values())
+    print(f"[OK] {total} rapports archives dans {len(result)} packs")
@@ -3,16 +3,26 @@
 """
 Gestionnaire de configuration pour l'interface d'administration.
 Centralise la lecture/écriture de depenses_recurrentes.json et des variables .env.
+
+depenses_recurrentes.json est gardé en mémoire et relu seulement quand sa
+signature (inode, date de modification, taille) change. Les écritures se
+font sous le verrou partagé avec Config._load_depenses_config (voir
+config.config_file_lock), par fichier temporaire + os.replace, et
+incrémentent la version de la configuration (version()).
 """
 
 import json
 import os
+import threading
+from contextlib import contextmanager
 from copy import deepcopy
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from dotenv import load_dotenv, set_key
 
+from linxo_agent.config import config_file_lock, config_version, write_json_config
+
 BASE_DIR = Path(__file__).parent.parent.parent.parent
 ENV_FILE = BASE_DIR / ".env"
 EXPENSES_FILE = BASE_DIR / "linxo_agent" / "depenses_recurrentes.json"
@@ -24,29 +34,81 @@ DEFAULT_COLLECTIONS = {
 }
 
 
+def _copy_json(value: Any) -> Any:
+    """Copie d'une valeur JSON (plus rapide que deepcopy)."""
+    if isinstance(value, dict):
+        return {key: _copy_json(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_json(item) for item in value]
+    return value
+
+
 class ConfigManager:
     """Gestionnaire de configuration."""
 
     def __init__(self) -> None:
         self.env_file = ENV_FILE
         self.expenses_file = EXPENSES_FILE
+        # (signature du fichier, contenu) du dernier chargement
+        self._cache: Optional[Tuple[Tuple[int, int, int], Dict[str, Any]]] = None
+        self._cache_lock = threading.Lock()
         load_dotenv()
 
     # ------------------------------------------------------------------ #
     # Helpers                                                            #
     # ------------------------------------------------------------------ #
 
-    def _load_data(self) -> Dict[str, Any]:
-        """Charge le contenu du fichier JSON principal."""
-        if not self.expenses_file.exists():
-            return deepcopy(DEFAULT_COLLECTIONS)
+    def file_signature(self) -> Optional[Tuple[int, int, int]]:
+        """Inode, date de modification et taille du fichier JSON (None si absent)."""
+        try:
+            st = self.expenses_file.stat()
+        except OSError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _read_cached(self, locked: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Contenu du fichier JSON, relu seulement si sa signature a changé.
+
+        Le résultat est partagé: ne pas le modifier (voir _load_data).
+
+        Args:
+            locked: Verrou déjà pris par l'appelant (_edit)
+        """
+        signature = self.file_signature()
+        if signature is None:
+            return None
+        with self._cache_lock:
+            if self._cache is not None and self._cache[0] == signature:
+                return self._cache[1]
 
         try:
-            with open(self.expenses_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            if locked:
+                data = self._parse()
+            else:
+                with config_file_lock(self.expenses_file):
+                    signature = self.file_signature()
+                    data = self._parse()
         except (OSError, json.JSONDecodeError):
+            return None
+        if not isinstance(data, dict) or signature is None:
+            return None
+
+        with self._cache_lock:
+            self._cache = (signature, data)
+        return data
+
+    def _parse(self) -> Any:
+        with open(self.expenses_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _load_data(self, locked: bool = False) -> Dict[str, Any]:
+        """Charge le contenu du fichier JSON principal (copie modifiable)."""
+        cached = self._read_cached(locked)
+        if cached is None:
             return deepcopy(DEFAULT_COLLECTIONS)
 
+        data = _copy_json(cached)
         # S'assurer que les collections essentielles existent
         for key, default_value in DEFAULT_COLLECTIONS.items():
             if key not in data or not isinstance(data[key], list):
@@ -54,10 +116,32 @@ class ConfigManager:
 
         return data
 
-    def _save_data(self, data: Dict[str, Any]) -> None:
-        """Écrit le JSON sur disque."""
-        with open(self.expenses_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+    def _save_data(self, data: Dict[str, Any], lock_file: Optional[Any] = None) -> int:
+        """Écrit le JSON sur disque (atomique) et retourne la nouvelle version."""
+        version = write_json_config(self.expenses_file, data, lock_file)
+        with self._cache_lock:
+            # Relu une fois au prochain accès, avec la signature du nouveau fichier
+            self._cache = None
+        return version
+
+    @contextmanager
+    def _edit(self) -> Iterator[Dict[str, Any]]:
+        """
+        Lecture-modification-écriture sous verrou exclusif.
+
+        Le fichier n'est réécrit que si le contenu a changé; une exception
+        dans le bloc annule la modification.
+        """
+        with config_file_lock(self.expenses_file, exclusive=True) as lock_file:
+            data = self._load_data(locked=True)
+            original = _copy_json(data)
+            yield data
+            if data != original:
+                self._save_data(data, lock_file)
+
+    def version(self) -> int:
+        """Version de depenses_recurrentes.json (incrémentée à chaque écriture)."""
+        return config_version(self.expenses_file)
 
     @staticmethod
     def _next_id(items: List[Dict[str, Any]]) -> int:
@@ -202,18 +286,18 @@ class ConfigManager:
         """Retourne la configuration complète (dépenses, revenus, ajustements)."""
         data = self._load_data()
         if self._ensure_ids(data):
-            self._save_data(data)
+            with self._edit() as data:
+                self._ensure_ids(data)
         return data
 
     def add_expense(self, expense: Dict[str, Any]) -> bool:
         """Ajoute une dépense récurrente."""
         try:
-            data = self._load_data()
-            expenses = data.get("depenses_fixes", [])
-            expense["id"] = self._next_id(expenses)
-            expenses.append(expense)
-            data["depenses_fixes"] = expenses
-            self._save_data(data)
+            with self._edit() as data:
+                expenses = data.get("depenses_fixes", [])
+                expense["id"] = self._next_id(expenses)
+                expenses.append(expense)
+                data["depenses_fixes"] = expenses
             return True
         except Exception:
             return False
@@ -221,15 +305,14 @@ class ConfigManager:
     def update_expense(self, expense_id: int, expense: Dict[str, Any]) -> bool:
         """Met à jour une dépense récurrente."""
         try:
-            data = self._load_data()
-            expenses = data.get("depenses_fixes", [])
-            index = self._find_index(expenses, expense_id)
-            if index is None:
-                return False
-            expense["id"] = expense_id
-            expenses[index] = expense
-            data["depenses_fixes"] = expenses
-            self._save_data(data)
+            with self._edit() as data:
+                expenses = data.get("depenses_fixes", [])
+                index = self._find_index(expenses, expense_id)
+                if index is None:
+                    return False
+                expense["id"] = expense_id
+                expenses[index] = expense
+                data["depenses_fixes"] = expenses
             return True
         except Exception:
             return False
@@ -237,14 +320,13 @@ class ConfigManager:
     def delete_expense(self, expense_id: int) -> bool:
         """Supprime une dépense récurrente."""
         try:
-            data = self._load_data()
-            expenses = data.get("depenses_fixes", [])
-            index = self._find_index(expenses, expense_id)
-            if index is None:
-                return False
-            expenses.pop(index)
-            data["depenses_fixes"] = expenses
-            self._save_data(data)
+            with self._edit() as data:
+                expenses = data.get("depenses_fixes", [])
+                index = self._find_index(expenses, expense_id)
+                if index is None:
+                    return False
+                expenses.pop(index)
+                data["depenses_fixes"] = expenses
             return True
         except Exception:
             return False
@@ -254,12 +336,11 @@ class ConfigManager:
     def add_income(self, income: Dict[str, Any]) -> bool:
         """Ajoute un revenu."""
         try:
-            data = self._load_data()
-            revenus = data.get("revenus", [])
-            income["id"] = self._next_id(revenus)
-            revenus.append(income)
-            data["revenus"] = revenus
-            self._save_data(data)
+            with self._edit() as data:
+                revenus = data.get("revenus", [])
+                income["id"] = self._next_id(revenus)
+                revenus.append(income)
+                data["revenus"] = revenus
             return True
         except Exception:
             return False
@@ -267,15 +348,14 @@ class ConfigManager:
     def update_income(self, income_id: int, income: Dict[str, Any]) -> bool:
         """Met à jour un revenu."""
         try:
-            data = self._load_data()
-            revenus = data.get("revenus", [])
-            index = self._find_index(revenus, income_id)
-            if index is None:
-                return False
-            income["id"] = income_id
-            revenus[index] = income
-            data["revenus"] = revenus
-            self._save_data(data)
+            with self._edit() as data:
+                revenus = data.get("revenus", [])
+                index = self._find_index(revenus, income_id)
+                if index is None:
+                    return False
+                income["id"] = income_id
+                revenus[index] = income
+                data["revenus"] = revenus
             return True
         except Exception:
             return False
@@ -283,14 +363,13 @@ class ConfigManager:
     def delete_income(self, income_id: int) -> bool:
         """Supprime un revenu."""
         try:
-            data = self._load_data()
-            revenus = data.get("revenus", [])
-            index = self._find_index(revenus, income_id)
-            if index is None:
-                return False
-            revenus.pop(index)
-            data["revenus"] = revenus
-            self._save_data(data)
+            with self._edit() as data:
+                revenus = data.get("revenus", [])
+                index = self._find_index(revenus, income_id)
+                if index is None:
+                    return False
+                revenus.pop(index)
+                data["revenus"] = revenus
             return True
         except Exception:
             return False
@@ -300,12 +379,11 @@ class ConfigManager:
     def add_budget_adjustment(self, adjustment: Dict[str, Any]) -> bool:
         """Ajoute un ajustement manuel de budget."""
         try:
-            data = self._load_data()
-            adjustments = data.get("ajustements_budget", [])
-            adjustment["id"] = self._next_id(adjustments)
-            adjustments.append(adjustment)
-            data["ajustements_budget"] = adjustments
-            self._save_data(data)
+            with self._edit() as data:
+                adjustments = data.get("ajustements_budget", [])
+                adjustment["id"] = self._next_id(adjustments)
+                adjustments.append(adjustment)
+                data["ajustements_budget"] = adjustments
             return True
         except Exception:
             return False
@@ -313,15 +391,14 @@ class ConfigManager:
     def update_budget_adjustment(self, adjustment_id: int, adjustment: Dict[str, Any]) -> bool:
         """Met à jour un ajustement de budget."""
         try:
-            data = self._load_data()
-            adjustments = data.get("ajustements_budget", [])
-            index = self._find_index(adjustments, adjustment_id)
-            if index is None:
-                return False
-            adjustment["id"] = adjustment_id
-            adjustments[index] = adjustment
-            data["ajustements_budget"] = adjustments
-            self._save_data(data)
+            with self._edit() as data:
+                adjustments = data.get("ajustements_budget", [])
+                index = self._find_index(adjustments, adjustment_id)
+                if index is None:
+                    return False
+                adjustment["id"] = adjustment_id
+                adjustments[index] = adjustment
+                data["ajustements_budget"] = adjustments
             return True
         except Exception:
             return False
@@ -329,14 +406,13 @@ class ConfigManager:
     def delete_budget_adjustment(self, adjustment_id: int) -> bool:
         """Supprime un ajustement de budget."""
         try:
-            data = self._load_data()
-            adjustments = data.get("ajustements_budget", [])
-            index = self._find_index(adjustments, adjustment_id)
-            if index is None:
-                return False
-            adjustments.pop(index)
-            data["ajustements_budget"] = adjustments
-            self._save_data(data)
+            with self._edit() as data:
+                adjustments = data.get("ajustements_budget", [])
+                index = self._find_index(adjustments, adjustment_id)
+                if index is None:
+                    return False
+                adjustments.pop(index)
+                data["ajustements_budget"] = adjustments
             return True
         except Exception:
             return False
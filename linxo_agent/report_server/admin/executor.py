@@ -2,17 +2,65 @@
 # -*- coding: utf-8 -*-
 """
 Gestionnaire d'exécution asynchrone pour les actions administratives
+
+Ordonnancement:
+- File d'attente bornée, nombre de tâches simultanées plafonné
+- Ressources exclusives (navigateur, CSV, rapports): deux tâches qui
+  partagent une ressource ne tournent jamais en même temps
+- Priorités, puis ordre d'arrivée; une commande identique déjà en
+  attente n'est pas ajoutée deux fois
+- Analyses sans téléchargement exécutées par un processus préchargé
+  (warm_worker.py) plutôt que par un nouvel interpréteur
+- État des tâches dans une base SQLite partagée (data/tasks/tasks.db,
+  voir task_store.py): le serveur peut tourner avec plusieurs processus
+  (uvicorn --workers N), chacun voit et suit les tâches des autres; les
+  tâches en attente repartent après un redémarrage du serveur
+
+La sortie d'une tâche est numérotée (séquence à partir de 1): les clients
+ne demandent que les lignes après le dernier numéro reçu. Les lignes
+récentes restent en mémoire (tampon circulaire), la sortie complète est
+écrite dans data/tasks/<id>.log. Un autre processus suit la tâche en
+relisant ce fichier.
 """
 
 import asyncio
+import os
+import sqlite3
 import subprocess
 import uuid
-from datetime import datetime
+from collections import deque
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, Optional, List
-from enum import Enum
+from typing import Dict, Iterable, Optional, List, Tuple
+from enum import Enum, IntEnum
+
+from fastapi import HTTPException
+
+from .log_index import LineIndex
+from .offload import worker_pool
+from .task_store import TaskQueueFullError, TaskStore  # noqa: F401 - réexportée pour les routes
+from .warm_worker import WarmWorker, warm_worker
 
 BASE_DIR = Path(__file__).parent.parent.parent.parent
+TASKS_OUTPUT_DIR = BASE_DIR / "data" / "tasks"
+TASKS_DB_FILE = TASKS_OUTPUT_DIR / "tasks.db"
+TASK_OUTPUT_BUFFER_LINES = int(os.getenv('TASK_OUTPUT_BUFFER_LINES', '2000'))
+TASK_MAX_CONCURRENT = int(os.getenv('TASK_MAX_CONCURRENT', '2'))
+TASK_QUEUE_SIZE = int(os.getenv('TASK_QUEUE_SIZE', '20'))
+# Période de lecture de la base partagée (tâches des autres processus)
+TASK_STORE_POLL_INTERVAL = float(os.getenv('TASK_STORE_POLL_INTERVAL', '0.5'))
+# Tâches terminées conservées dans l'historique
+TASK_HISTORY_SIZE = 200
+# Tentatives d'écriture de l'état final d'une tâche (base verrouillée)
+FINAL_STATE_ATTEMPTS = 5
+
+# Gestionnaires de ce processus (plusieurs possibles, tests compris)
+_LOCAL_OWNERS = set()
+
+# Ressources exclusives
+RESOURCE_BROWSER = "browser"   # Chrome / Selenium (Linxo, WhatsApp)
+RESOURCE_CSV = "csv"           # data/latest.csv
+RESOURCE_REPORTS = "reports"   # data/reports/
 
 
 class TaskStatus(str, Enum):
@@ -21,29 +69,254 @@ class TaskStatus(str, Enum):
     RUNNING = "running"
     SUCCESS = "success"
     ERROR = "error"
+    CANCELLED = "cancelled"
+
+
+class TaskPriority(IntEnum):
+    """Priorité d'une tâche (la plus petite valeur passe en premier)"""
+    HIGH = 0
+    NORMAL = 5
+    LOW = 10
+
+
+class TaskOutput:
+    """
+    Sortie d'une tâche: tampon circulaire en mémoire + fichier complet sur disque
+
+    La ligne n° `seq` (à partir de 1) se lit dans le tampon si elle est
+    récente, sinon dans le fichier via son index de lignes.
+    """
+
+    def __init__(self, spill_path: Optional[Path] = None, max_lines: int = TASK_OUTPUT_BUFFER_LINES):
+        """
+        Args:
+            spill_path: Fichier de la sortie complète (None: tampon seul)
+            max_lines: Nombre de lignes gardées en mémoire
+        """
+        self.spill_path = spill_path
+        self._buffer: deque = deque(maxlen=max(1, max_lines))
+        self._count = 0
+        self._spill = None
+        self._spill_index: Optional[LineIndex] = None
+        self._changed = asyncio.Event()
+        if spill_path is not None:
+            try:
+                spill_path.parent.mkdir(parents=True, exist_ok=True)
+                # Ligne par ligne: lisible aussitôt par les autres processus
+                self._spill = open(spill_path, 'w', encoding='utf-8', errors='replace', buffering=1)
+                self._spill_index = LineIndex(spill_path)
+            except OSError:
+                self.spill_path = None
+
+    @classmethod
+    def reader(cls, spill_path: Optional[Path], count: int = 0) -> "TaskOutput":
+        """
+        Sortie écrite par un autre processus (ou avant un redémarrage),
+        lue depuis son fichier
+
+        Args:
+            spill_path: Fichier de la sortie
+            count: Nombre de lignes déjà connues
+        """
+        output = cls(None, max_lines=1)
+        output._count = count
+        output._buffer.clear()
+        if spill_path is not None:
+            output.spill_path = spill_path
+            output._spill_index = LineIndex(spill_path)
+        return output
+
+    def refresh_from_file(self) -> bool:
+        """
+        Lecteur: prend en compte les lignes complètes ajoutées au fichier
+
+        Returns:
+            bool: True si de nouvelles lignes sont disponibles
+        """
+        if self._spill is not None or self._spill_index is None:
+            return False
+        try:
+            count, _ = self._spill_index.locate()
+        except OSError:
+            return False
+        if count <= self._count:
+            return False
+        self._count = count
+        self._changed.set()
+        self._changed = asyncio.Event()
+        return True
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def last_seq(self) -> int:
+        """Numéro de la dernière ligne écrite (0 si aucune)"""
+        return self._count
+
+    @property
+    def first_buffered_seq(self) -> int:
+        """Numéro de la plus ancienne ligne encore en mémoire"""
+        return self._count - len(self._buffer) + 1
+
+    def append(self, line: str) -> None:
+        # Une ligne de sortie = une ligne du fichier
+        line = line.replace('\n', ' ')
+        self._buffer.append(line)
+        self._count += 1
+        if self._spill is not None:
+            try:
+                self._spill.write(line + '\n')
+            except OSError:
+                self._spill.close()
+                self._spill = None
+                self.spill_path = None
+        # Réveille les flux en attente
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def close(self) -> None:
+        """Fin de la tâche: fichier complété, flux réveillés"""
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+        self._changed.set()
+
+    async def wait_for_lines(self, after: int, timeout: float) -> None:
+        """Attend une ligne après `after` (ou la fin de la tâche), au plus `timeout` secondes"""
+        if self._count > after:
+            return
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def read_buffered(self, after: int, limit: int) -> Optional[Tuple[List[str], int]]:
+        """
+        Lignes après `after` si elles sont encore en mémoire
+
+        Returns:
+            Optional[Tuple[List[str], int]]: (lignes, numéro de la dernière
+            ligne renvoyée), None s'il faut relire le fichier
+        """
+        after = max(0, after)
+        if after + 1 < self.first_buffered_seq:
+            return None
+        start = after + 1 - self.first_buffered_seq
+        lines = [self._buffer[i] for i in range(start, min(len(self._buffer), start + limit))]
+        return lines, after + len(lines)
+
+    def _read_spilled(self, after: int, count: int) -> Tuple[List[str], int]:
+        """Lignes déjà écrites sur disque, lues dans le fichier (bloquant)"""
+        lines, _ = self._spill_index.read_lines(after, count)
+        return lines, after + len(lines)
+
+    async def read(self, after: int = 0, limit: int = 1000) -> Tuple[List[str], int]:
+        """
+        Lignes écrites après le numéro `after`
+
+        Args:
+            after: Numéro de la dernière ligne déjà reçue (0: depuis le début)
+            limit: Nombre maximum de lignes
+
+        Returns:
+            Tuple[List[str], int]: (lignes, curseur à renvoyer au prochain appel)
+        """
+        after = max(0, after)
+        buffered = self.read_buffered(after, limit)
+        if buffered is not None:
+            return buffered
+        if self._spill_index is None or self.spill_path is None:
+            # Fichier indisponible: lignes perdues sautées, reprise au début du tampon
+            return self.read_buffered(self.first_buffered_seq - 1, limit)
+
+        # Lignes antérieures au tampon uniquement: vidées sur disque ici, dans
+        # la boucle qui écrit, avant la lecture dans un thread
+        count = min(limit, self.first_buffered_seq - 1 - after)
+        if self._spill is not None:
+            try:
+                self._spill.flush()
+            except OSError:
+                pass
+        return await worker_pool.run_io(self._read_spilled, after, count)
 
 
 class Task:
     """Représente une tâche en cours d'exécution"""
 
-    def __init__(self, task_id: str, name: str, command: List[str]):
+    def __init__(self, task_id: str, name: str, command: List[str],
+                 output_file: Optional[Path] = None,
+                 resources: Iterable[str] = (),
+                 priority: int = TaskPriority.NORMAL):
         self.id = task_id
         self.name = name
         self.command = command
+        self.resources = frozenset(resources)
+        self.priority = int(priority)
         self.status = TaskStatus.PENDING
-        self.output: List[str] = []
+        self.output_file = output_file
+        # Écriture dans le processus qui exécute la tâche (voir TaskExecutor._start)
+        self.output = TaskOutput.reader(output_file)
         self.error: Optional[str] = None
+        self.queued_at = datetime.now()
+        # Ordre d'arrivée (départage à priorité égale)
+        self.order = 0
         self.start_time: Optional[datetime] = None
         self.end_time: Optional[datetime] = None
         self.exit_code: Optional[int] = None
 
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (TaskStatus.SUCCESS, TaskStatus.ERROR, TaskStatus.CANCELLED)
+
+    def to_state(self) -> dict:
+        """État enregistré dans la base partagée (sortie: chemin du fichier)"""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "command": self.command,
+            "resources": sorted(self.resources),
+            "priority": self.priority,
+            "status": self.status.value,
+            "queued_at": self.queued_at.isoformat(),
+            "output_file": str(self.output_file) if self.output_file else None,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "Task":
+        """Tâche lue dans la base partagée (sortie lue depuis son fichier)"""
+        output_file = state.get("output_file")
+        task = cls(
+            state["id"], state["name"], state["command"],
+            output_file=Path(output_file) if output_file else None,
+            resources=state.get("resources", ()),
+            priority=state.get("priority", TaskPriority.NORMAL),
+        )
+        task.order = state.get("order", 0)
+        task.queued_at = datetime.fromisoformat(state["queued_at"])
+        task.update_from_state(state)
+        return task
+
+    def update_from_state(self, state: dict) -> None:
+        """Statut et horaires mis à jour par le processus qui exécute la tâche"""
+        self.status = TaskStatus(state["status"])
+        self.error = state.get("error")
+        self.exit_code = state.get("exit_code")
+        self.start_time = datetime.fromisoformat(state["start_time"]) if state.get("start_time") else None
+        self.end_time = datetime.fromisoformat(state["end_time"]) if state.get("end_time") else None
+        if state.get("output_seq", 0) > self.output._count:
+            self.output._count = state["output_seq"]
+
     def to_dict(self) -> dict:
-        """Convertit la tâche en dictionnaire"""
+        """Convertit la tâche en dictionnaire (sans la sortie, lue par curseur)"""
         return {
             "id": self.id,
             "name": self.name,
             "status": self.status.value,
-            "output": self.output,
+            "priority": self.priority,
+            "resources": sorted(self.resources),
+            "queued_at": self.queued_at.isoformat(),
+            "output_seq": self.output.last_seq,
             "error": self.error,
             "start_time": self.start_time.isoformat() if self.start_time else None,
             "end_time": self.end_time.isoformat() if self.end_time else None,
@@ -56,48 +329,207 @@ class Task:
         }
 
 
+def _remove_output_files(output_files: Iterable[str]) -> None:
+    """Supprime les fichiers de sortie des tâches retirées de la base"""
+    for output_file in output_files:
+        try:
+            Path(output_file).unlink()
+        except OSError:
+            pass
+
+
 class TaskExecutor:
     """Gestionnaire de tâches asynchrones"""
 
-    def __init__(self):
-        self.tasks: Dict[str, Task] = {}
+    def __init__(
+        self,
+        db_path: Path = TASKS_DB_FILE,
+        output_dir: Optional[Path] = TASKS_OUTPUT_DIR,
+        max_concurrent: int = TASK_MAX_CONCURRENT,
+        queue_size: int = TASK_QUEUE_SIZE,
+        poll_interval: float = TASK_STORE_POLL_INTERVAL,
+        warm: Optional[WarmWorker] = None
+    ):
+        """
+        Args:
+            db_path: Base SQLite partagée des tâches
+            output_dir: Répertoire des sorties de tâches (None: mémoire seule,
+                sortie invisible des autres processus)
+            max_concurrent: Nombre maximum de tâches simultanées (tous processus)
+            queue_size: Nombre maximum de tâches en attente
+            poll_interval: Période de lecture de la base (tâches des autres processus)
+            warm: Processus préchargé pour les analyses (None: sous-processus seulement)
+        """
+        self.store = TaskStore(db_path)
+        self.output_dir = output_dir
+        self.max_concurrent = max(1, max_concurrent)
+        self.queue_size = max(1, queue_size)
+        self.poll_interval = poll_interval
+        self.warm = warm
         self._lock = asyncio.Lock()
-
-    async def execute_task(self, name: str, command: List[str]) -> str:
+        # Tâches exécutées par ce processus
+        self._local: Dict[str, Task] = {}
+        self._running: Dict[str, asyncio.Task] = {}
+        # Tâches non terminées d'autres processus, suivies par le notificateur
+        self._views: Dict[str, Task] = {}
+        self._notifier: Optional[asyncio.Task] = None
+        self._version: Optional[int] = None
+        # Propriétaire des tâches lancées ici ("pid:jeton")
+        self.owner = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        _LOCAL_OWNERS.add(self.owner)
+
+    # ------------------------------------------------------------------
+    # Ordonnancement
+    # ------------------------------------------------------------------
+
+    async def _schedule(self) -> None:
+        """Démarre les tâches en attente que la base attribue à ce processus"""
+        for state in await worker_pool.run_io(self.store.claim, self.max_concurrent, self.owner):
+            task = Task.from_state(state)
+            task.output = TaskOutput(task.output_file)
+            self._local[task.id] = task
+            self._running[task.id] = asyncio.create_task(self._run_task(task))
+
+    def _owner_alive(self, task_id: str, owner: Optional[str]) -> bool:
+        if owner == self.owner:
+            return task_id in self._running
+        try:
+            pid = int(owner.split(':')[0])
+        except (AttributeError, ValueError):
+            return False
+        if pid == os.getpid():
+            # Même PID qu'un serveur précédent (conteneur redémarré): jeton inconnu
+            return owner in _LOCAL_OWNERS
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    async def _poll(self) -> None:
+        """
+        Une lecture de la base: tâches de processus disparus terminées,
+        tâches libérées démarrées, vues des autres processus rafraîchies
+        """
+        await worker_pool.run_io(self.store.reap, self._owner_alive, "Interrompue: processus serveur arrêté")
+        version = await worker_pool.run_io(self.store.version)
+        if version != self._version:
+            self._version = version
+            await self._schedule()
+            states = await worker_pool.run_io(self.store.get_many, list(self._views))
+        else:
+            states = None
+
+        for task_id, task in list(self._views.items()):
+            task.output.refresh_from_file()
+            if states is None:
+                continue
+            state = states.get(task_id)
+            if state is not None:
+                task.update_from_state(state)
+            if state is None or task.is_finished:
+                # Dernières lignes écrites avant la fin, puis flux réveillés
+                task.output.refresh_from_file()
+                task.output.close()
+                del self._views[task_id]
+
+    async def _notify_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                async with self._lock:
+                    await self._poll()
+            except (sqlite3.Error, HTTPException) as e:
+                print(f"[WARN] Base des taches indisponible: {e}")
+
+    async def _ensure_started(self) -> None:
+        """Dans la boucle du serveur: notificateur lancé, tâches en attente démarrées"""
+        loop = asyncio.get_running_loop()
+        if self._notifier is None or self._notifier.done() or self._notifier.get_loop() is not loop:
+            await self._poll()
+            self._notifier = loop.create_task(self._notify_loop())
+            if self.warm is not None:
+                self.warm.prestart()
+
+    async def submit_task(
+        self,
+        name: str,
+        command: List[str],
+        resources: Iterable[str] = (),
+        priority: int = TaskPriority.NORMAL
+    ) -> Tuple[str, bool]:
         """
-        Lance l'exécution d'une tâche en arrière-plan
+        Ajoute une tâche à la file d'attente
 
         Args:
             name: Nom de la tâche
             command: Commande à exécuter (liste)
+            resources: Ressources exclusives utilisées (RESOURCE_*)
+            priority: Priorité (TaskPriority)
 
         Returns:
-            str: ID de la tâche
+            Tuple[str, bool]: (ID de la tâche, True si une commande identique
+            était déjà en attente: son ID est renvoyé)
+
+        Raises:
+            TaskQueueFullError: Si la file d'attente est pleine
         """
         task_id = str(uuid.uuid4())
-        task = Task(task_id, name, command)
+        output_file = self.output_dir / f"{task_id}.log" if self.output_dir else None
+        task = Task(task_id, name, command, output_file, resources, priority)
 
         async with self._lock:
-            self.tasks[task_id] = task
-
-        # Lancer l'exécution en arrière-plan
-        asyncio.create_task(self._run_task(task))
+            await self._ensure_started()
+            task_id, created = await worker_pool.run_io(self.store.enqueue, task.to_state(), self.queue_size)
+            if created:
+                await self._schedule()
+        return task_id, not created
+
+    async def execute_task(
+        self,
+        name: str,
+        command: List[str],
+        resources: Iterable[str] = (),
+        priority: int = TaskPriority.NORMAL
+    ) -> str:
+        """
+        Ajoute une tâche à la file d'attente (voir submit_task)
 
+        Returns:
+            str: ID de la tâche (celui de la tâche identique déjà en attente, le cas échéant)
+        """
+        task_id, _ = await self.submit_task(name, command, resources, priority)
         return task_id
 
+    async def cancel_task(self, task_id: str) -> bool:
+        """
+        Annule une tâche en attente
+
+        Returns:
+            bool: True si la tâche était en attente et a été annulée
+        """
+        async with self._lock:
+            await self._ensure_started()
+            cancelled = await worker_pool.run_io(self.store.cancel, task_id)
+            if cancelled and task_id in self._views:
+                self._version = None
+                await self._poll()
+            return cancelled
+
     async def _run_task(self, task: Task):
         """
         Exécute une tâche (méthode interne)
 
         Args:
-            task: Tâche à exécuter
+            task: Tâche à exécuter (déjà marquée en cours dans la base)
         """
-        task.status = TaskStatus.RUNNING
-        task.start_time = datetime.now()
+        process = None
+        interrupted = False
 
         try:
             # Préparer l'environnement : utiliser le venv si disponible
-            import os
             env = os.environ.copy()
 
             # Chercher le venv dans le projet
@@ -116,35 +548,52 @@ class TaskExecutor:
                     task.output.append(f"[INFO] Utilisation du venv: {venv_path}")
                     break
 
-            # Exécuter la commande
-            process = await asyncio.create_subprocess_exec(
-                *task.command,
-                stdin=asyncio.subprocess.DEVNULL,  # Fermer stdin pour éviter les blocages
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd=str(BASE_DIR),
-                env=env
-            )
-
-            # Lire la sortie en temps réel
-            stdout_task = asyncio.create_task(
-                self._read_stream(process.stdout, task.output)
-            )
-            stderr_task = asyncio.create_task(
-                self._read_stream(process.stderr, task.output)
-            )
-
-            # Attendre la fin de l'exécution
-            await asyncio.gather(stdout_task, stderr_task)
-            await process.wait()
-
-            task.exit_code = process.returncode
-
-            if process.returncode == 0:
+            # Analyse sans téléchargement: processus préchargé si disponible
+            returncode = None
+            warm_args = self.warm.job_args(task.command) if self.warm is not None else None
+            if warm_args is not None:
+                returncode = await self.warm.run(warm_args, task.output, env)
+
+            if returncode is None:
+                # Exécuter la commande
+                process = await asyncio.create_subprocess_exec(
+                    *task.command,
+                    stdin=asyncio.subprocess.DEVNULL,  # Fermer stdin pour éviter les blocages
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    cwd=str(BASE_DIR),
+                    env=env
+                )
+
+                # Lire la sortie en temps réel
+                stdout_task = asyncio.create_task(
+                    self._read_stream(process.stdout, task.output)
+                )
+                stderr_task = asyncio.create_task(
+                    self._read_stream(process.stderr, task.output)
+                )
+
+                # Attendre la fin de l'exécution
+                await asyncio.gather(stdout_task, stderr_task)
+                await process.wait()
+                returncode = process.returncode
+
+            task.exit_code = returncode
+
+            if returncode == 0:
                 task.status = TaskStatus.SUCCESS
             else:
                 task.status = TaskStatus.ERROR
-                task.error = f"Exit code: {process.returncode}"
+                task.error = f"Exit code: {returncode}"
+
+        except asyncio.CancelledError:
+            # Arrêt du serveur: processus arrêté, tâches en attente gardées pour le redémarrage
+            interrupted = True
+            if process is not None and process.returncode is None:
+                process.kill()
+            task.status = TaskStatus.ERROR
+            task.error = "Interrompue par l'arrêt du serveur"
+            raise
 
         except Exception as e:
             task.status = TaskStatus.ERROR
@@ -153,14 +602,61 @@ class TaskExecutor:
 
         finally:
             task.end_time = datetime.now()
+            fields = dict(
+                status=task.status.value,
+                error=task.error,
+                exit_code=task.exit_code,
+                end_time=task.end_time.isoformat(),
+                output_seq=task.output.last_seq
+            )
+            if interrupted:
+                # Arrêt du serveur: la boucle se termine, écriture directe
+                try:
+                    self.store.update(task.id, **fields)
+                except sqlite3.Error as e:
+                    print(f"[WARN] Base des taches indisponible: {e}")
+            else:
+                await self._store_final_state(task.id, fields)
+            # Retirée d'ici une fois terminée dans la base: les lecteurs
+            # réveillés par close() la relisent terminée
+            task.output.close()
+            self._running.pop(task.id, None)
+            self._local.pop(task.id, None)
+            if not interrupted:
+                try:
+                    output_files = await worker_pool.run_io(self.store.prune, keep=TASK_HISTORY_SIZE)
+                    await worker_pool.run_io(_remove_output_files, output_files)
+                    # Sous le verrou: une tâche prise en charge mais pas encore
+                    # dans _running serait vue comme orpheline par reap()
+                    async with self._lock:
+                        await self._schedule()
+                except (sqlite3.Error, HTTPException) as e:
+                    print(f"[WARN] Base des taches indisponible: {e}")
+
+    async def _store_final_state(self, task_id: str, fields: dict) -> None:
+        """
+        Enregistre l'état final d'une tâche avant de la retirer de _running
 
-    async def _read_stream(self, stream, output_list: List[str]):
+        Hors du pool borné (qui refuse le travail quand il est saturé): sinon
+        reap() verrait une tâche terminée encore "en cours" sans exécutant
+        et la marquerait en erreur. Réessayé si la base est verrouillée.
+        """
+        for attempt in range(1, FINAL_STATE_ATTEMPTS + 1):
+            try:
+                await asyncio.to_thread(self.store.update, task_id, **fields)
+                return
+            except sqlite3.Error as e:
+                print(f"[WARN] Base des taches indisponible ({attempt}/{FINAL_STATE_ATTEMPTS}): {e}")
+                if attempt < FINAL_STATE_ATTEMPTS:
+                    await asyncio.sleep(attempt * 0.5)
+
+    async def _read_stream(self, stream, output: TaskOutput):
         """
         Lit un flux (stdout/stderr) ligne par ligne
 
         Args:
             stream: Flux à lire
-            output_list: Liste où stocker les lignes
+            output: Sortie de la tâche où stocker les lignes
         """
         while True:
             line = await stream.readline()
@@ -175,27 +671,57 @@ class TaskExecutor:
                 except:
                     decoded = str(line)
 
-            output_list.append(decoded)
+            output.append(decoded)
+
+    async def get_task(self, task_id: str) -> Optional[Task]:
+        """
+        Tâche par son ID (None si inconnue)
+
+        Une tâche exécutée par un autre processus est renvoyée sous forme de
+        vue, tenue à jour par le notificateur tant qu'elle n'est pas terminée.
+        """
+        async with self._lock:
+            await self._ensure_started()
+            task = self._local.get(task_id) or self._views.get(task_id)
+            if task is not None:
+                return task
+            state = await worker_pool.run_io(self.store.get, task_id)
+            if state is None:
+                return None
+            task = Task.from_state(state)
+            if task.is_finished:
+                task.output.close()
+            else:
+                task.output.refresh_from_file()
+                self._views[task_id] = task
+            return task
 
-    async def get_task_status(self, task_id: str) -> Optional[dict]:
+    async def get_task_status(self, task_id: str, after: int = 0, limit: int = 1000) -> Optional[dict]:
         """
-        Récupère le statut d'une tâche
+        Récupère le statut d'une tâche et sa sortie après un curseur
 
         Args:
             task_id: ID de la tâche
+            after: Numéro de la dernière ligne déjà reçue (0: depuis le début)
+            limit: Nombre maximum de lignes de sortie
 
         Returns:
-            dict: Statut de la tâche ou None si non trouvée
+            dict: Statut de la tâche ou None si non trouvée. "output" contient
+            les lignes après `after`, "next_seq" le curseur suivant
         """
-        async with self._lock:
-            task = self.tasks.get(task_id)
-            if task:
-                return task.to_dict()
+        task = await self.get_task(task_id)
+        if task is None:
             return None
 
+        status = task.to_dict()
+        lines, next_seq = await task.output.read(after, limit)
+        status["output"] = lines
+        status["next_seq"] = next_seq
+        return status
+
     async def list_tasks(self, limit: int = 50) -> List[dict]:
         """
-        Liste les tâches récentes
+        Liste les tâches récentes (tous processus)
 
         Args:
             limit: Nombre maximum de tâches à retourner
@@ -204,12 +730,12 @@ class TaskExecutor:
             List[dict]: Liste des tâches
         """
         async with self._lock:
-            tasks = sorted(
-                self.tasks.values(),
-                key=lambda t: t.start_time or datetime.min,
-                reverse=True
-            )
-            return [t.to_dict() for t in tasks[:limit]]
+            await self._ensure_started()
+            tasks = []
+            for state in await worker_pool.run_io(self.store.recent, limit):
+                task = self._local.get(state["id"]) or self._views.get(state["id"])
+                tasks.append((task or Task.from_state(state)).to_dict())
+            return tasks
 
     async def cleanup_old_tasks(self, max_age_hours: int = 24):
         """
@@ -218,18 +744,11 @@ class TaskExecutor:
         Args:
             max_age_hours: Age maximum en heures
         """
-        now = datetime.now()
+        finished_before = datetime.now() - timedelta(hours=max_age_hours)
         async with self._lock:
-            to_remove = []
-            for task_id, task in self.tasks.items():
-                if task.end_time:
-                    age = (now - task.end_time).total_seconds() / 3600
-                    if age > max_age_hours:
-                        to_remove.append(task_id)
-
-            for task_id in to_remove:
-                del self.tasks[task_id]
+            output_files = await worker_pool.run_io(self.store.prune, finished_before=finished_before)
+        await worker_pool.run_io(_remove_output_files, output_files)
 
 
 # Instance globale du gestionnaire de tâches
-executor = TaskExecutor()
+executor = TaskExecutor(warm=warm_worker)
@@ -4,6 +4,7 @@
 Gestionnaire SQLite pour stocker les retours de classification utilisateur.
 """
 
+import os
 import sqlite3
 from datetime import datetime
 from pathlib import Path
@@ -11,14 +12,17 @@ from typing import Any, Dict, List
 
 BASE_DIR = Path(__file__).parent.parent.parent.parent
 DATA_DIR = BASE_DIR / "data" / "ml"
+FEEDBACK_DB_FILE = Path(
+    os.getenv("FEEDBACK_DB_FILE", str(DATA_DIR / "classification_feedback.db"))
+)
 
 
 class FeedbackManager:
     """Gère l'historique des corrections/validations de classification."""
 
     def __init__(self) -> None:
-        DATA_DIR.mkdir(parents=True, exist_ok=True)
-        self.db_path = DATA_DIR / "classification_feedback.db"
+        FEEDBACK_DB_FILE.parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = FEEDBACK_DB_FILE
         self._ensure_tables()
 
     def _connect(self) -> sqlite3.Connection:
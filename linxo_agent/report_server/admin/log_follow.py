@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Suivi en direct d'un fichier de log (Server-Sent Events)
+
+- Réveil sur écriture par inotify (Linux, via la libc), sinon
+  vérification périodique de la taille du fichier
+- Seules les lignes complètes ajoutées depuis la dernière position sont
+  lues et envoyées
+- Rotation (renommage puis nouveau fichier) ou troncature: fin de
+  l'ancien fichier envoyée, puis reprise au début du nouveau
+- Chaque envoi porte un identifiant "inode:position:ligne": le navigateur
+  le renvoie (Last-Event-ID) à la reconnexion pour reprendre sans perte
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import errno
+import json
+import os
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from .log_index import LineIndex
+from .logs_manager import LogEntry
+from .offload import worker_pool
+
+FOLLOW_POLL_INTERVAL = float(os.getenv('LOG_FOLLOW_POLL_INTERVAL', '1.0'))
+FOLLOW_HEARTBEAT = 15.0
+# Lecture maximale par envoi: un gros rattrapage part en plusieurs événements
+FOLLOW_CHUNK_SIZE = 256 * 1024
+
+# Événements inotify utiles (écriture, création, renommage, suppression)
+_IN_MODIFY = 0x00000002
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_WATCH_MASK = _IN_MODIFY | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+
+
+def _load_libc() -> Optional[ctypes.CDLL]:
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1  # noqa: B018 - absent hors Linux
+        libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+_libc = _load_libc()
+
+
+class LogWatcher:
+    """Attente d'une modification dans le répertoire d'un log"""
+
+    def __init__(self, directory: Path, poll_interval: float = FOLLOW_POLL_INTERVAL):
+        """
+        Args:
+            directory: Répertoire surveillé (le répertoire, pour voir les rotations)
+            poll_interval: Période de vérification sans inotify (secondes)
+        """
+        self.poll_interval = poll_interval
+        self._fd: Optional[int] = None
+        self._event: Optional[asyncio.Event] = None
+        if _libc is not None:
+            fd = _libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd >= 0:
+                if _libc.inotify_add_watch(fd, os.fsencode(str(directory)), _IN_WATCH_MASK) >= 0:
+                    self._fd = fd
+                else:
+                    os.close(fd)
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._fd is not None
+
+    def _drain(self) -> None:
+        try:
+            while os.read(self._fd, 4096):
+                pass
+        except OSError as e:
+            if e.errno != errno.EAGAIN:
+                raise
+
+    async def wait(self, timeout: float) -> None:
+        """Rend la main à la prochaine modification, ou après `timeout` secondes"""
+        if self._fd is None:
+            await asyncio.sleep(min(timeout, self.poll_interval))
+            return
+
+        if self._event is None:
+            self._event = asyncio.Event()
+            asyncio.get_running_loop().add_reader(self._fd, self._event.set)
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._event.clear()
+        self._drain()
+
+    def close(self) -> None:
+        if self._fd is None:
+            return
+        if self._event is not None:
+            try:
+                asyncio.get_running_loop().remove_reader(self._fd)
+            except RuntimeError:
+                pass
+        os.close(self._fd)
+        self._fd = None
+
+
+def parse_resume_id(value: Optional[str]) -> Optional[Tuple[int, int, int]]:
+    """Décode un identifiant d'événement "inode:position:ligne" (None si invalide)"""
+    if not value:
+        return None
+    try:
+        inode, offset, line = (int(part) for part in value.split(':'))
+    except ValueError:
+        return None
+    return inode, offset, line
+
+
+def _read_new_lines(fd: int, position: int, line_number: int) -> Tuple[List[Dict], int, int]:
+    """
+    Lignes complètes écrites après `position` (au plus FOLLOW_CHUNK_SIZE octets)
+
+    Une ligne plus longue que FOLLOW_CHUNK_SIZE (page HTML copiée dans le log)
+    est envoyée par morceaux marqués "partial", sous le numéro de la ligne en
+    cours: le numéro n'avance qu'au saut de ligne, le suivi ne bloque pas.
+    """
+    data = os.pread(fd, FOLLOW_CHUNK_SIZE, position)
+    last_newline = data.rfind(b'\n')
+    if last_newline < 0:
+        if len(data) < FOLLOW_CHUNK_SIZE:
+            return [], position, line_number
+        entry = LogEntry(data.decode('utf-8', errors='replace'), line_number + 1).to_dict()
+        entry['partial'] = True
+        return [entry], position + len(data), line_number
+
+    entries = []
+    for raw in data[:last_newline].split(b'\n'):
+        line_number += 1
+        entries.append(LogEntry(raw.decode('utf-8', errors='replace').rstrip(), line_number).to_dict())
+    return entries, position + last_newline + 1, line_number
+
+
+def _open_log(log_path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        fd = os.open(log_path, os.O_RDONLY)
+    except OSError:
+        return None
+    return fd, os.fstat(fd).st_ino
+
+
+def _stat_inode_size(log_path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat_result = os.stat(log_path)
+    except OSError:
+        return None
+    return stat_result.st_ino, stat_result.st_size
+
+
+async def follow_log(
+    log_path: Path,
+    line_index: LineIndex,
+    resume: Optional[Tuple[int, int, int]] = None,
+    offset: Optional[int] = None,
+    backlog: int = 50,
+    poll_interval: float = FOLLOW_POLL_INTERVAL,
+    heartbeat: float = FOLLOW_HEARTBEAT
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Suit un fichier de log et produit les nouvelles lignes au fil de l'eau
+
+    Args:
+        log_path: Fichier suivi
+        line_index: Index des lignes du fichier (numérotation à la reprise)
+        resume: (inode, position, ligne) du dernier événement reçu
+        offset: Position de reprise en octets (sans identifiant d'événement)
+        backlog: Sans position de reprise, nombre de lignes déjà écrites à envoyer
+        poll_interval: Période de vérification sans inotify (secondes)
+        heartbeat: Délai maximal sans message (commentaire keep-alive)
+
+    Yields:
+        Dict: {'event': 'lines' | 'rotated' | 'ping', 'id': ..., 'lines': [...]}
+    """
+    opened = await worker_pool.run_io(_open_log, log_path)
+    if opened is None:
+        return
+    fd, inode = opened
+    watcher = LogWatcher(log_path.parent, poll_interval)
+
+    def event(kind: str, lines: Optional[List[Dict]] = None) -> Dict[str, Any]:
+        return {
+            'event': kind,
+            'id': f'{inode}:{position}:{line_number}',
+            'lines': lines or [],
+        }
+
+    loop = asyncio.get_running_loop()
+    try:
+        rotated = resume is not None and resume[0] != inode
+        if rotated:
+            # Fichier remplacé depuis la déconnexion: nouveau fichier lu depuis le début
+            position, line_number = 0, 0
+        elif resume is not None:
+            _, position, line_number = resume
+        else:
+            # Reprise par position (alignée sur un début de ligne) ou fin du fichier
+            line_number, position = await worker_pool.run_io(line_index.locate, offset)
+
+        if rotated:
+            yield event('rotated')
+        elif resume is None and offset is None and backlog > 0 and line_number > 0:
+            lines, _ = await worker_pool.run_io(
+                line_index.read_lines, max(0, line_number - backlog), min(backlog, line_number)
+            )
+            first = max(0, line_number - backlog)
+            entries = [LogEntry(line, first + i + 1).to_dict() for i, line in enumerate(lines)]
+            yield event('lines', entries)
+
+        last_sent = loop.time()
+        while True:
+            entries, position, line_number = await worker_pool.run_io(
+                _read_new_lines, fd, position, line_number
+            )
+            if entries:
+                yield event('lines', entries)
+                last_sent = loop.time()
+                continue
+
+            current = await worker_pool.run_io(_stat_inode_size, log_path)
+            if current is not None and (current[0] != inode or current[1] < position):
+                # Dernières lignes écrites dans l'ancien fichier avant la rotation
+                entries, position, line_number = await worker_pool.run_io(
+                    _read_new_lines, fd, position, line_number
+                )
+                if entries:
+                    yield event('lines', entries)
+                    last_sent = loop.time()
+                    continue
+
+                reopened = await worker_pool.run_io(_open_log, log_path)
+                if reopened is not None:
+                    os.close(fd)
+                    fd, inode = reopened
+                    position, line_number = 0, 0
+                    yield event('rotated')
+                    last_sent = loop.time()
+                    continue
+
+            await watcher.wait(heartbeat)
+            if loop.time() - last_sent >= heartbeat:
+                yield event('ping')
+                last_sent = loop.time()
+    finally:
+        watcher.close()
+        os.close(fd)
+
+
+def format_sse(message: Dict[str, Any]) -> str:
+    """Sérialise un événement au format text/event-stream"""
+    if message['event'] == 'ping':
+        return ': ping\n\n'
+    payload = json.dumps({'lines': message['lines']}, ensure_ascii=False)
+    return f"id: {message['id']}\nevent: {message['event']}\ndata: {payload}\n\n"
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Index des fins de ligne des fichiers de logs
+
+- Fichier annexe logs/.index/<nom>.idx: en-tête (inode) puis la position
+  (octet suivant le saut de ligne) de chaque ligne complète, en uint64
+- Étendu à chaque consultation avec les seuls octets ajoutés depuis
+- Reconstruit si le log a été remplacé (inode) ou tronqué (rotation)
+
+Une page de log se lit alors par un seek direct sur la plage demandée,
+sans relire ni décoder tout le fichier.
+"""
+
+import os
+import struct
+import threading
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+INDEX_DIR_NAME = ".index"
+READ_BLOCK_SIZE = 1024 * 1024
+TAIL_BLOCK_SIZE = 64 * 1024
+
+_MAGIC = b"LXLIDX01"
+_HEADER = struct.Struct("<8sQ")
+_ITEM_SIZE = array("Q").itemsize
+
+
+def _decode(raw: bytes) -> str:
+    return raw.decode("utf-8", errors="replace").rstrip()
+
+
+class LineIndex:
+    """Positions des fins de ligne d'un fichier de log"""
+
+    def __init__(self, log_path: Path, index_path: Optional[Path] = None):
+        """
+        Args:
+            log_path: Fichier de log indexé
+            index_path: Fichier annexe (None: index en mémoire seulement)
+        """
+        self.log_path = log_path
+        self.index_path = index_path
+        self._ends = array("Q")
+        self._inode = -1
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    # ------------------------------------------------------------------
+    # Fichier annexe
+    # ------------------------------------------------------------------
+
+    def _load(self) -> None:
+        self._loaded = True
+        if self.index_path is None:
+            return
+        try:
+            with open(self.index_path, "rb") as f:
+                header = f.read(_HEADER.size)
+                body = f.read()
+        except OSError:
+            return
+        if len(header) != _HEADER.size:
+            return
+        magic, inode = _HEADER.unpack(header)
+        if magic != _MAGIC:
+            return
+        # Écriture interrompue: dernière entrée incomplète ignorée
+        body = body[:len(body) - len(body) % _ITEM_SIZE]
+        self._ends = array("Q")
+        self._ends.frombytes(body)
+        self._inode = inode
+
+    def _save(self, new_ends: array, rewrite: bool) -> None:
+        if self.index_path is None or not new_ends and not rewrite:
+            return
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            if rewrite:
+                tmp_path = self.index_path.with_name(f".{self.index_path.name}.tmp")
+                with open(tmp_path, "wb") as f:
+                    f.write(_HEADER.pack(_MAGIC, self._inode))
+                    self._ends.tofile(f)
+                os.replace(tmp_path, self.index_path)
+            else:
+                with open(self.index_path, "ab") as f:
+                    new_ends.tofile(f)
+        except OSError:
+            # Répertoire en lecture seule: l'index reste en mémoire
+            self.index_path = None
+
+    # ------------------------------------------------------------------
+    # Mise à jour
+    # ------------------------------------------------------------------
+
+    def _is_valid(self, f, stat_result: os.stat_result) -> bool:
+        if self._inode != stat_result.st_ino:
+            return False
+        if not self._ends:
+            return True
+        last_end = self._ends[-1]
+        if last_end > stat_result.st_size:
+            return False
+        f.seek(last_end - 1)
+        return f.read(1) == b"\n"
+
+    def refresh(self) -> Tuple[int, int]:
+        """
+        Étend l'index avec les lignes ajoutées depuis le dernier appel
+
+        Returns:
+            Tuple[int, int]: (nombre de lignes, taille du fichier en octets).
+            Une dernière ligne sans saut de ligne final est comptée.
+        """
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self) -> Tuple[int, int]:
+        if not self._loaded:
+            self._load()
+        with open(self.log_path, "rb") as f:
+            stat_result = os.fstat(f.fileno())
+            rewrite = False
+            if not self._is_valid(f, stat_result):
+                self._ends = array("Q")
+                self._inode = stat_result.st_ino
+                rewrite = True
+
+            position = self._ends[-1] if self._ends else 0
+            size = stat_result.st_size
+            new_ends = array("Q")
+            f.seek(position)
+            while position < size:
+                block = f.read(min(READ_BLOCK_SIZE, size - position))
+                if not block:
+                    break
+                index = block.find(b"\n")
+                while index >= 0:
+                    new_ends.append(position + index + 1)
+                    index = block.find(b"\n", index + 1)
+                position += len(block)
+
+        self._ends.extend(new_ends)
+        self._save(new_ends, rewrite)
+
+        indexed = self._ends[-1] if self._ends else 0
+        return len(self._ends) + (1 if size > indexed else 0), size
+
+    # ------------------------------------------------------------------
+    # Lecture
+    # ------------------------------------------------------------------
+
+    def locate(self, offset: Optional[int] = None) -> Tuple[int, int]:
+        """
+        Ligne complète la plus proche avant une position
+
+        Args:
+            offset: Position en octets (défaut: fin du fichier)
+
+        Returns:
+            Tuple[int, int]: (nombre de lignes complètes avant la position,
+            position de début de la ligne suivante)
+        """
+        with self._lock:
+            _, size = self._refresh()
+            if offset is None or offset > size:
+                offset = size
+            count = bisect_right(self._ends, max(0, offset))
+            return count, self._ends[count - 1] if count else 0
+
+    def read_lines(self, start: int, count: int) -> Tuple[List[str], int]:
+        """
+        Lit une plage de lignes par accès direct
+
+        Args:
+            start: Index (0) de la première ligne
+            count: Nombre de lignes
+
+        Returns:
+            Tuple[List[str], int]: (lignes sans fin de ligne, nombre total de lignes)
+        """
+        with self._lock:
+            total, size = self._refresh()
+            start = max(0, start)
+            stop = min(total, start + max(0, count))
+            if start >= stop:
+                return [], total
+            begin = self._ends[start - 1] if start > 0 else 0
+            end = self._ends[stop - 1] if stop - 1 < len(self._ends) else size
+
+        with open(self.log_path, "rb") as f:
+            f.seek(begin)
+            raw = f.read(end - begin)
+
+        lines = raw.split(b"\n")
+        if raw.endswith(b"\n"):
+            lines.pop()
+        return [_decode(line) for line in lines[:stop - start]], total
+
+
+def read_last_lines(path: Path, count: int, end: Optional[int] = None,
+                    block_size: int = TAIL_BLOCK_SIZE) -> List[str]:
+    """
+    Lit les `count` dernières lignes en remontant depuis la fin par blocs
+
+    Args:
+        path: Fichier à lire
+        count: Nombre de lignes voulues
+        end: Position de fin de lecture (défaut: taille actuelle du fichier)
+        block_size: Taille des blocs lus
+
+    Returns:
+        List[str]: Dernières lignes (sans fin de ligne)
+    """
+    if count <= 0:
+        return []
+
+    with open(path, "rb") as f:
+        position = os.fstat(f.fileno()).st_size
+        if end is not None:
+            position = min(position, end)
+        data = b""
+        # Une ligne de plus que demandé: la première lue peut être coupée
+        while position > 0 and data.count(b"\n") <= count:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+
+    if not data:
+        return []
+    lines = data.split(b"\n")
+    if data.endswith(b"\n"):
+        lines.pop()
+    if position > 0:
+        lines = lines[1:]
+    return [_decode(line) for line in lines[-count:]]
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Index de recherche plein texte des logs (SQLite FTS5)
+
+- logs/.index/search.db: une ligne de log par enregistrement (fichier,
+  numéro de ligne, niveau, horodatage, texte) et une table FTS5 sur le texte
+- Alimentation incrémentale: seuls les octets ajoutés depuis la dernière
+  synchronisation sont lus; un log remplacé ou tronqué est réindexé
+- Tokenizer trigram: recherche de sous-chaîne sans tenir compte de la
+  casse ("2FA", "[ERROR]"), comme l'ancien filtre en mémoire
+
+Une ligne sans saut de ligne final (écriture en cours) n'est indexée
+qu'une fois complète.
+
+Plusieurs processus (workers uvicorn) peuvent synchroniser le même index:
+chaque bloc est indexé dans une transaction BEGIN IMMEDIATE qui relit la
+position indexée du fichier, et SQLite attribue les identifiants de ligne.
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .log_index import INDEX_DIR_NAME
+from .logs_manager import LOGS_DIR, LogEntry
+
+INGEST_BLOCK_SIZE = 1024 * 1024
+# Le tokenizer trigram n'indexe pas les requêtes plus courtes
+_MIN_FTS_QUERY = 3
+
+
+def _like_pattern(query: str) -> str:
+    escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+class LogSearchIndex:
+    """Index SQLite des lignes de logs, synchronisé à la demande"""
+
+    def __init__(self, logs_dir: Path = LOGS_DIR, db_path: Optional[Path] = None):
+        """
+        Args:
+            logs_dir: Répertoire des fichiers *.log
+            db_path: Base SQLite (défaut: logs/.index/search.db)
+        """
+        self.logs_dir = logs_dir
+        self.db_path = db_path or logs_dir / INDEX_DIR_NAME / "search.db"
+        self.fts_enabled = True
+        self._sync_lock = threading.Lock()
+        self._schema_lock = threading.Lock()
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        # Transactions explicites (BEGIN IMMEDIATE)
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    @contextmanager
+    def _transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+        """Transaction en écriture, verrou pris dès le début (autres processus compris)"""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _ensure_tables(self) -> None:
+        with self._schema_lock:
+            if not self._ready:
+                self._create_tables()
+                self._ready = True
+
+    def _create_tables(self) -> None:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        try:
+            # Lectures pendant une synchronisation
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS log_files (
+                    name TEXT PRIMARY KEY,
+                    inode INTEGER,
+                    indexed_bytes INTEGER,
+                    line_count INTEGER
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS log_lines (
+                    id INTEGER PRIMARY KEY,
+                    file TEXT NOT NULL,
+                    line_number INTEGER NOT NULL,
+                    level TEXT,
+                    timestamp TEXT,
+                    line TEXT
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_log_lines_file ON log_lines(file, line_number)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_log_lines_level ON log_lines(level, file, line_number)"
+            )
+            try:
+                conn.execute(
+                    """
+                    CREATE VIRTUAL TABLE IF NOT EXISTS log_fts USING fts5(
+                        line, content='log_lines', content_rowid='id', tokenize='trigram'
+                    )
+                    """
+                )
+            except sqlite3.OperationalError:
+                # SQLite sans FTS5/trigram: recherche par LIKE sur log_lines
+                self.fts_enabled = False
+        finally:
+            conn.close()
+
+    # ------------------------------------------------------------------ #
+    # Synchronisation                                                    #
+    # ------------------------------------------------------------------ #
+
+    def _purge_file(self, conn: sqlite3.Connection, name: str) -> None:
+        if self.fts_enabled:
+            conn.execute(
+                """
+                INSERT INTO log_fts(log_fts, rowid, line)
+                SELECT 'delete', id, line FROM log_lines WHERE file = ?
+                """,
+                (name,)
+            )
+        conn.execute("DELETE FROM log_lines WHERE file = ?", (name,))
+        conn.execute("DELETE FROM log_files WHERE name = ?", (name,))
+
+    def _ingest_file(self, conn: sqlite3.Connection, log_path: Path) -> int:
+        name = log_path.name
+        added = 0
+        with open(log_path, "rb") as f:
+            stat_result = os.fstat(f.fileno())
+            while True:
+                # Un bloc par transaction: une synchronisation interrompue reprend
+                # au dernier bloc validé, un autre processus à la position relue
+                with self._transaction(conn):
+                    known = conn.execute(
+                        "SELECT * FROM log_files WHERE name = ?", (name,)
+                    ).fetchone()
+                    if known is not None and (
+                        known["inode"] != stat_result.st_ino
+                        or known["indexed_bytes"] > stat_result.st_size
+                    ):
+                        self._purge_file(conn, name)
+                        known = None
+
+                    position = known["indexed_bytes"] if known else 0
+                    line_count = known["line_count"] if known else 0
+                    if position >= stat_result.st_size:
+                        return added
+
+                    f.seek(position)
+                    data = b""
+                    last_newline = -1
+                    while last_newline < 0:
+                        block = f.read(INGEST_BLOCK_SIZE)
+                        if not block:
+                            break
+                        last_newline = block.rfind(b"\n")
+                        if last_newline >= 0:
+                            last_newline += len(data)
+                        data += block
+                    if last_newline < 0:
+                        # Dernière ligne incomplète (écriture en cours)
+                        return added
+
+                    rows = []
+                    for raw in data[:last_newline].split(b"\n"):
+                        line_count += 1
+                        entry = LogEntry(raw.decode("utf-8", errors="replace").rstrip(), line_count)
+                        rows.append((name, line_count, entry.level, entry.timestamp, entry.line))
+                    self._insert_rows(conn, rows)
+                    position += last_newline + 1
+                    added += len(rows)
+
+                    conn.execute(
+                        """
+                        INSERT INTO log_files (name, inode, indexed_bytes, line_count)
+                        VALUES (?, ?, ?, ?)
+                        ON CONFLICT(name) DO UPDATE SET
+                            inode = excluded.inode,
+                            indexed_bytes = excluded.indexed_bytes,
+                            line_count = excluded.line_count
+                        """,
+                        (name, stat_result.st_ino, position, line_count)
+                    )
+
+    def _insert_rows(self, conn: sqlite3.Connection, rows: List[Tuple]) -> None:
+        """Ajoute des lignes consécutives d'un fichier (identifiants attribués par SQLite)"""
+        conn.executemany(
+            "INSERT INTO log_lines (file, line_number, level, timestamp, line) VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
+        if self.fts_enabled:
+            name, first_line = rows[0][0], rows[0][1]
+            conn.execute(
+                """
+                INSERT INTO log_fts (rowid, line)
+                SELECT id, line FROM log_lines WHERE file = ? AND line_number >= ?
+                """,
+                (name, first_line)
+            )
+
+    def sync(self, wait: bool = True) -> int:
+        """
+        Indexe les lignes ajoutées aux fichiers logs/*.log depuis le dernier appel
+
+        Args:
+            wait: Attendre une synchronisation déjà en cours dans ce processus
+                (sinon retour immédiat)
+
+        Returns:
+            int: Nombre de lignes ajoutées à l'index
+        """
+        if not self._sync_lock.acquire(blocking=wait):
+            return 0
+        try:
+            self._ensure_tables()
+            if not self.logs_dir.exists():
+                return 0
+
+            log_paths = {path.name: path for path in self.logs_dir.glob("*.log") if path.is_file()}
+            added = 0
+            conn = self._connect()
+            try:
+                with self._transaction(conn):
+                    for row in conn.execute("SELECT name FROM log_files").fetchall():
+                        if row["name"] not in log_paths:
+                            self._purge_file(conn, row["name"])
+
+                for _, log_path in sorted(log_paths.items()):
+                    try:
+                        added += self._ingest_file(conn, log_path)
+                    except OSError:
+                        continue
+            finally:
+                conn.close()
+            return added
+        finally:
+            self._sync_lock.release()
+
+    # ------------------------------------------------------------------ #
+    # Recherche                                                          #
+    # ------------------------------------------------------------------ #
+
+    def search(
+        self,
+        query: Optional[str] = None,
+        level: Optional[str] = None,
+        file_name: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 100,
+        sync: bool = True
+    ) -> Tuple[List[Dict[str, Any]], int, bool]:
+        """
+        Recherche des lignes de logs avec pagination
+
+        Args:
+            query: Texte recherché (sous-chaîne, sans tenir compte de la casse)
+            level: Filtrer par niveau (SUCCESS, ERROR, WARNING, INFO)
+            file_name: Limiter à un fichier (défaut: tous, plus récents d'abord)
+            offset: Rang du premier résultat
+            limit: Nombre de résultats
+            sync: Indexer d'abord les lignes nouvelles (sauf si une
+                synchronisation est déjà en cours: résultats de l'index actuel)
+
+        Returns:
+            Tuple[List[Dict], int, bool]: (lignes, total, has_more)
+        """
+        if sync:
+            self.sync(wait=False)
+        self._ensure_tables()
+
+        joins = ""
+        conditions = []
+        params: List[Any] = []
+        if query:
+            if self.fts_enabled and len(query) >= _MIN_FTS_QUERY:
+                joins = "JOIN log_fts ON log_fts.rowid = l.id"
+                conditions.append("log_fts MATCH ?")
+                params.append('"' + query.replace('"', '""') + '"')
+            else:
+                conditions.append("l.line LIKE ? ESCAPE '\\'")
+                params.append(_like_pattern(query))
+        if level:
+            conditions.append("l.level = ?")
+            params.append(level)
+        if file_name:
+            conditions.append("l.file = ?")
+            params.append(file_name)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        offset = max(0, offset)
+        conn = self._connect()
+        try:
+            total = conn.execute(
+                f"SELECT COUNT(*) FROM log_lines l {joins} {where}", params
+            ).fetchone()[0]
+            rows = conn.execute(
+                f"""
+                SELECT l.file, l.line_number, l.level, l.timestamp, l.line
+                FROM log_lines l {joins} {where}
+                ORDER BY l.file DESC, l.line_number
+                LIMIT ? OFFSET ?
+                """,
+                params + [limit, offset]
+            ).fetchall()
+        finally:
+            conn.close()
+
+        lines = [
+            {
+                'file': row['file'],
+                'line': row['line'],
+                'line_number': row['line_number'],
+                'level': row['level'],
+                'timestamp': row['timestamp'],
+            }
+            for row in rows
+        ]
+        return lines, total, offset + limit < total
+
+
+# Instance globale
+log_search_index = LogSearchIndex()
@@ -5,10 +5,13 @@ Gestionnaire de logs pour l'interface d'administration
 """
 
 import re
+import threading
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Optional, Tuple
 
+from .log_index import INDEX_DIR_NAME, LineIndex, read_last_lines
+
 BASE_DIR = Path(__file__).parent.parent.parent.parent
 LOGS_DIR = BASE_DIR / "logs"
 
@@ -58,6 +61,31 @@ class LogsManager:
 
     def __init__(self):
         self.logs_dir = LOGS_DIR
+        self._indexes: Dict[Path, LineIndex] = {}
+        self._indexes_lock = threading.Lock()
+
+    def resolve_log_path(self, file_name: str) -> Optional[Path]:
+        """Chemin du log s'il existe et se trouve bien dans logs_dir (sécurité)"""
+        log_path = self.logs_dir / file_name
+
+        if not log_path.exists() or not log_path.is_file():
+            return None
+
+        try:
+            log_path.resolve().relative_to(self.logs_dir.resolve())
+        except ValueError:
+            return None
+
+        return log_path
+
+    def line_index(self, log_path: Path) -> LineIndex:
+        """Index des lignes d'un log (chargé une fois, étendu à chaque lecture)"""
+        with self._indexes_lock:
+            index = self._indexes.get(log_path)
+            if index is None:
+                index_path = self.logs_dir / INDEX_DIR_NAME / f"{log_path.name}.idx"
+                index = self._indexes[log_path] = LineIndex(log_path, index_path)
+            return index
 
     def list_log_files(self) -> List[Dict[str, any]]:
         """
@@ -120,43 +148,47 @@ class LogsManager:
         Returns:
             Tuple[List[Dict], int, bool]: (lignes, total_lignes, has_more)
         """
-        log_path = self.logs_dir / file_name
-
-        if not log_path.exists() or not log_path.is_file():
+        log_path = self.resolve_log_path(file_name)
+        if log_path is None:
             return [], 0, False
 
-        # Vérifier que le fichier est bien dans logs_dir (sécurité)
-        try:
-            log_path.resolve().relative_to(self.logs_dir.resolve())
-        except ValueError:
-            return [], 0, False
+        offset = max(0, offset)
+        end_index = offset + limit
 
-        # Lire le fichier
+        if not level_filter and not search_query:
+            # Accès direct à la plage demandée via l'index des lignes
+            try:
+                lines, total_lines = self.line_index(log_path).read_lines(offset, limit)
+            except Exception:
+                return [], 0, False
+
+            log_entries = [LogEntry(line, offset + i + 1) for i, line in enumerate(lines)]
+            return (
+                [entry.to_dict() for entry in log_entries],
+                total_lines,
+                end_index < total_lines
+            )
+
+        # Filtres: lecture en flux, seules les lignes de la page sont conservées
+        search_lower = search_query.lower() if search_query else None
+        paginated_entries = []
+        total_lines = 0
         try:
-            with open(log_path, 'r', encoding='utf-8', errors='replace') as f:
-                lines = f.readlines()
+            # Binaire: mêmes coupures de ligne (\n) que l'index
+            with open(log_path, 'rb') as f:
+                for i, raw in enumerate(f):
+                    line = raw.decode('utf-8', errors='replace').rstrip()
+                    if search_lower and search_lower not in line.lower():
+                        continue
+                    entry = LogEntry(line, i + 1)
+                    if level_filter and entry.level != level_filter:
+                        continue
+                    if offset <= total_lines < end_index:
+                        paginated_entries.append(entry)
+                    total_lines += 1
         except Exception:
             return [], 0, False
 
-        # Créer des LogEntry
-        log_entries = [LogEntry(line.rstrip(), i + 1) for i, line in enumerate(lines)]
-
-        # Appliquer les filtres
-        if level_filter:
-            log_entries = [entry for entry in log_entries if entry.level == level_filter]
-
-        if search_query:
-            search_lower = search_query.lower()
-            log_entries = [
-                entry for entry in log_entries
-                if search_lower in entry.line.lower()
-            ]
-
-        total_lines = len(log_entries)
-
-        # Appliquer la pagination
-        end_index = offset + limit
-        paginated_entries = log_entries[offset:end_index]
         has_more = end_index < total_lines
 
         return (
@@ -180,22 +212,18 @@ class LogsManager:
         Returns:
             List[Dict]: Dernières lignes
         """
-        log_path = self.logs_dir / file_name
-
-        if not log_path.exists() or not log_path.is_file():
+        log_path = self.resolve_log_path(file_name)
+        if log_path is None:
             return []
 
         try:
-            with open(log_path, 'r', encoding='utf-8', errors='replace') as f:
-                all_lines = f.readlines()
-
-            # Prendre les N dernières lignes
-            last_lines = all_lines[-lines:] if len(all_lines) > lines else all_lines
+            # Numérotation par l'index, contenu lu depuis la fin par blocs
+            total_lines, size = self.line_index(log_path).refresh()
+            last_lines = read_last_lines(log_path, lines, end=size)
 
-            # Créer des LogEntry
-            start_line = max(0, len(all_lines) - lines)
+            start_line = total_lines - len(last_lines)
             log_entries = [
-                LogEntry(line.rstrip(), start_line + i + 1)
+                LogEntry(line, start_line + i + 1)
                 for i, line in enumerate(last_lines)
             ]
 
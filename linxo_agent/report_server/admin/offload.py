@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Exécution des traitements bloquants hors de la boucle asyncio
+
+Les handlers admin sont des coroutines partagées avec le service des
+rapports: un appel bloquant (psutil, lecture de logs, parcours de
+répertoires, SQLite, analyse du CSV) y gèlerait toutes les requêtes.
+
+- E/S bloquantes: pool de threads borné
+- Calcul Python (analyse, classification): pool de processus, le GIL
+  du serveur reste libre
+- Nombre de travaux en vol borné, délai maximal par appel (504)
+"""
+
+import asyncio
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException
+
+ADMIN_IO_WORKERS = int(os.getenv('ADMIN_IO_WORKERS', '4'))
+ADMIN_CPU_WORKERS = int(os.getenv('ADMIN_CPU_WORKERS', '1'))
+ADMIN_IO_TIMEOUT = float(os.getenv('ADMIN_IO_TIMEOUT', '15'))
+ADMIN_CPU_TIMEOUT = float(os.getenv('ADMIN_CPU_TIMEOUT', '120'))
+
+
+class WorkerPool:
+    """Pools de threads et de processus partagés par les routes admin"""
+
+    def __init__(
+        self,
+        io_workers: int = ADMIN_IO_WORKERS,
+        cpu_workers: int = ADMIN_CPU_WORKERS,
+        io_timeout: float = ADMIN_IO_TIMEOUT,
+        cpu_timeout: float = ADMIN_CPU_TIMEOUT,
+    ):
+        """
+        Args:
+            io_workers: Threads pour les E/S bloquantes
+            cpu_workers: Processus pour les calculs
+            io_timeout: Délai maximal d'un appel d'E/S (secondes)
+            cpu_timeout: Délai maximal d'un calcul (secondes)
+        """
+        self.io_workers = max(1, io_workers)
+        self.cpu_workers = max(1, cpu_workers)
+        self.io_timeout = io_timeout
+        self.cpu_timeout = cpu_timeout
+        self._io_pool: Optional[ThreadPoolExecutor] = None
+        self._cpu_pool: Optional[ProcessPoolExecutor] = None
+        # Travaux en vol (en cours + en attente): au-delà, refus immédiat (503).
+        # Sémaphores de threads: libérés depuis le thread qui termine le travail,
+        # indépendamment de la boucle asyncio qui l'a soumis
+        self._io_slots = threading.BoundedSemaphore(self.io_workers * 2)
+        self._cpu_slots = threading.BoundedSemaphore(self.cpu_workers * 2)
+
+    def _get_io_pool(self) -> ThreadPoolExecutor:
+        if self._io_pool is None:
+            self._io_pool = ThreadPoolExecutor(
+                max_workers=self.io_workers, thread_name_prefix="admin-io"
+            )
+        return self._io_pool
+
+    def _get_cpu_pool(self) -> ProcessPoolExecutor:
+        if self._cpu_pool is None:
+            # spawn: pas de fork d'un serveur multi-thread
+            self._cpu_pool = ProcessPoolExecutor(
+                max_workers=self.cpu_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._cpu_pool
+
+    async def run_io(self, func: Callable[..., Any], *args: Any, timeout: Optional[float] = None,
+                     **kwargs: Any) -> Any:
+        """
+        Exécute une fonction bloquante (E/S) dans le pool de threads
+
+        Raises:
+            HTTPException: 503 si le pool est saturé, 504 si le délai est dépassé
+        """
+        pool = self._get_io_pool()
+        return await self._run(
+            pool, self._io_slots, functools.partial(func, *args, **kwargs),
+            timeout or self.io_timeout,
+        )
+
+    async def run_cpu(self, func: Callable[..., Any], *args: Any, timeout: Optional[float] = None,
+                      **kwargs: Any) -> Any:
+        """
+        Exécute un calcul dans le pool de processus
+
+        `func` et ses arguments doivent être importables/sérialisables
+        (fonction définie au niveau d'un module).
+
+        Raises:
+            HTTPException: 503 si le pool est saturé ou cassé, 504 si le délai est dépassé
+        """
+        pool = self._get_cpu_pool()
+        try:
+            return await self._run(
+                pool, self._cpu_slots, functools.partial(func, *args, **kwargs),
+                timeout or self.cpu_timeout,
+            )
+        except BrokenProcessPool:
+            # Processus tué (mémoire, signal): repartir d'un pool neuf
+            self._cpu_pool = None
+            raise HTTPException(status_code=503, detail="Pool de calcul indisponible, réessayez")
+
+    async def _run(self, pool, slots: threading.BoundedSemaphore, call: Callable[[], Any],
+                   timeout: float) -> Any:
+        if not slots.acquire(blocking=False):
+            raise HTTPException(status_code=503, detail="Serveur occupé, réessayez")
+
+        try:
+            future: Future = pool.submit(call)
+        except BaseException:
+            slots.release()
+            raise
+        # Place libérée à la fin réelle du travail, même après un délai dépassé
+        future.add_done_callback(lambda _: slots.release())
+
+        # asyncio.wait plutôt que wait_for: sous Python 3.11, wait_for peut
+        # absorber une annulation arrivée au moment où le travail se termine
+        # (la tâche appelante, ex. une boucle de fond, ne s'arrêterait plus)
+        waiter = asyncio.wrap_future(future)
+        try:
+            done, _ = await asyncio.wait((waiter,), timeout=timeout)
+        except asyncio.CancelledError:
+            waiter.cancel()
+            raise
+        if not done:
+            waiter.cancel()
+            raise HTTPException(status_code=504, detail="Traitement trop long, réessayez plus tard")
+        return waiter.result()
+
+    def shutdown(self, wait: bool = False) -> None:
+        """
+        Arrête les pools (fin de processus / tests)
+
+        Args:
+            wait: Attendre la fin des travaux en cours
+        """
+        if self._io_pool is not None:
+            self._io_pool.shutdown(wait=wait)
+            self._io_pool = None
+        if self._cpu_pool is not None:
+            self._cpu_pool.shutdown(wait=wait, cancel_futures=True)
+            self._cpu_pool = None
+
+
+worker_pool = WorkerPool()
@@ -6,26 +6,37 @@ Routes de l'interface d'administration
 
 import calendar
 import hashlib
+import json
 import os
 import platform
 import psutil
 import re
+import sqlite3
 import subprocess
 from difflib import SequenceMatcher
 from pathlib import Path
 from datetime import datetime, date
-from typing import Optional, List, Dict, Any
-from fastapi import APIRouter, Depends, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+from typing import Optional, List, Dict, Any, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 
 from .auth import verify_admin_auth
-from .executor import executor
+from .executor import (
+    executor, TaskPriority, TaskQueueFullError,
+    RESOURCE_BROWSER, RESOURCE_CSV, RESOURCE_REPORTS
+)
 from .logs_manager import logs_manager
+from .log_search import log_search_index
+from .log_follow import follow_log, format_sse, parse_resume_id
 from .config_manager import config_manager
 from .feedback_manager import feedback_manager
-from linxo_agent.analyzer import lire_csv_linxo, analyser_transactions
+from .offload import worker_pool
+from .system_metrics import system_sampler
+from linxo_agent.analyzer import lire_depenses_variables
 from linxo_agent.config import get_config
+from linxo_agent.reports import latest_report_manifest
+from linxo_agent.storage_accounting import storage_ledger
 
 # Configuration
 router = APIRouter(prefix="/admin", tags=["admin"])
@@ -222,6 +233,25 @@ def _find_expense_by_id(expenses: List[Dict[str, Any]], expense_id: int) -> Opti
     return None
 
 
+# Libellés normalisés des dépenses récurrentes, reconstruits quand
+# depenses_recurrentes.json change (version, ou fichier modifié à la main)
+_recurring_label_index: Dict[str, Any] = {'version': None, 'entries': []}
+
+
+def _recurring_labels() -> List[Tuple[Dict[str, Any], List[str], List[str]]]:
+    """Dépenses récurrentes avec leurs libellés bruts et normalisés."""
+    version = (config_manager.version(), config_manager.file_signature())
+    if _recurring_label_index['version'] != version:
+        entries = []
+        for expense in config_manager.get_expenses().get('depenses_fixes', []):
+            labels = _ensure_label_list(expense.get('libelle'))
+            if labels:
+                normalized = [_normalize_libelle_pattern(lbl) for lbl in labels]
+                entries.append((expense, labels, [n for n in normalized if n]))
+        _recurring_label_index.update(version=version, entries=entries)
+    return _recurring_label_index['entries']
+
+
 def _suggest_recurring_candidates(libelle: str, montant: float, limit: int = 5) -> List[Dict[str, Any]]:
     """Propose des dépenses récurrentes proches du libellé donné."""
     pattern = _normalize_libelle_pattern(libelle)
@@ -229,23 +259,15 @@ def _suggest_recurring_candidates(libelle: str, montant: float, limit: int = 5)
         return []
 
     try:
-        finance_data = config_manager.get_expenses()
+        recurring = _recurring_labels()
     except Exception:
         return []
 
-    expenses = finance_data.get('depenses_fixes', [])
     suggestions: List[Dict[str, Any]] = []
 
-    for expense in expenses:
-        labels = _ensure_label_list(expense.get('libelle'))
-        if not labels:
-            continue
-
+    for expense, labels, normalized_labels in recurring:
         best_label_score = 0.0
-        for lbl in labels:
-            normalized = _normalize_libelle_pattern(lbl)
-            if not normalized:
-                continue
+        for normalized in normalized_labels:
             score = SequenceMatcher(None, normalized, pattern).ratio()
             if normalized in pattern or pattern in normalized:
                 score += 0.2
@@ -426,52 +448,63 @@ def get_system_status() -> Dict[str, Any]:
     """
     Récupère le statut système complet
 
+    Disque, processus Chrome et cron viennent du dernier relevé du thread
+    de métriques (system_sampler), la taille des répertoires des compteurs
+    de storage_ledger: aucun parcours de répertoire.
+
     Returns:
         dict: Informations système
     """
-    # Espace disque
-    disk_usage = psutil.disk_usage(str(BASE_DIR))
+    snapshot = system_sampler.latest()
+    storage_ledger.start_reconciler()
+    storage = storage_ledger.usage()
 
-    # Processus Chrome
-    chrome_processes = []
-    for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_info']):
-        try:
-            if 'chrome' in proc.info['name'].lower():
-                chrome_processes.append({
-                    'pid': proc.info['pid'],
-                    'name': proc.info['name'],
-                    'cpu': proc.info['cpu_percent'],
-                    'memory_mb': proc.info['memory_info'].rss / (1024 * 1024)
-                })
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            pass
-
-    # Dernier log cron
-    last_cron_status = get_last_cron_status()
+    # Synthèse du dernier rapport (manifest.json, sans relancer l'analyse)
+    last_report = get_last_report_summary()
 
     return {
         'system': {
             'platform': platform.system(),
             'hostname': platform.node(),
             'python_version': platform.python_version(),
+            'cpu_percent': snapshot['cpu_percent'],
+            'memory_percent': snapshot['memory_percent'],
         },
-        'disk': {
-            'total_gb': round(disk_usage.total / (1024**3), 2),
-            'used_gb': round(disk_usage.used / (1024**3), 2),
-            'free_gb': round(disk_usage.free / (1024**3), 2),
-            'percent': disk_usage.percent
-        },
-        'chrome': {
-            'process_count': len(chrome_processes),
-            'processes': chrome_processes
-        },
-        'cron': last_cron_status,
+        'disk': snapshot['disk'],
+        'chrome': snapshot['chrome'],
+        'cron': snapshot.get('cron') or {'status': 'unknown', 'message': 'Statut indisponible'},
+        'last_report': last_report,
         'directories': {
             'data_exists': DATA_DIR.exists(),
             'logs_exists': LOGS_DIR.exists(),
             'reports_exists': REPORTS_DIR.exists(),
-            'logs_size_mb': get_directory_size(LOGS_DIR) if LOGS_DIR.exists() else 0
-        }
+            'logs_size_mb': storage['logs']['size_mb'] if LOGS_DIR.exists() else 0
+        },
+        'storage': storage,
+        'sampled_at': snapshot['timestamp']
+    }
+
+
+def get_last_report_summary() -> Optional[Dict[str, Any]]:
+    """
+    Récupère la synthèse du dernier rapport généré depuis son manifeste
+
+    Returns:
+        Optional[dict]: Date, totaux, budget et prédiction, ou None
+    """
+    manifest = latest_report_manifest(REPORTS_DIR)
+    if manifest is None:
+        return None
+
+    return {
+        'report_date': manifest.get('report_date'),
+        'generated_at': manifest.get('generated_at'),
+        'grand_total': manifest.get('grand_total', 0),
+        'total_transactions': manifest.get('total_transactions', 0),
+        'families': manifest.get('families', []),
+        'totals': manifest.get('totals'),
+        'budget': manifest.get('budget'),
+        'prediction': manifest.get('prediction'),
     }
 
 
@@ -494,13 +527,13 @@ def get_last_cron_status() -> Dict[str, Any]:
     last_log = log_files[0]
 
     try:
-        # Lire les dernières lignes du log
-        with open(last_log, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+        # Lire les dernières lignes du log (depuis la fin, sans tout relire)
+        last_entries = logs_manager.tail_log_file(last_log.name, 20)
+        lines = [entry['line'] for entry in last_entries]
 
         # Analyser le contenu pour détecter succès/erreur
-        has_success = any('[SUCCESS]' in line for line in lines[-20:])
-        has_error = any('[ERROR]' in line for line in lines[-20:])
+        has_success = any('[SUCCESS]' in line for line in lines)
+        has_error = any('[ERROR]' in line for line in lines)
 
         # Extraire la date de modification du fichier
         mtime = datetime.fromtimestamp(last_log.stat().st_mtime)
@@ -521,7 +554,7 @@ def get_last_cron_status() -> Dict[str, Any]:
             'message': message,
             'timestamp': mtime.isoformat(),
             'log_file': last_log.name,
-            'lines_count': len(lines)
+            'lines_count': last_entries[-1]['line_number'] if last_entries else 0
         }
 
     except Exception as e:
@@ -532,25 +565,29 @@ def get_last_cron_status() -> Dict[str, Any]:
         }
 
 
-def get_directory_size(directory: Path) -> float:
+def kill_chrome_processes() -> tuple:
     """
-    Calcule la taille d'un répertoire en Mo
-
-    Args:
-        directory: Chemin du répertoire
+    Tue les processus Chrome restants
 
     Returns:
-        float: Taille en Mo
+        tuple: (nombre de processus tués, erreurs rencontrées)
     """
-    total_size = 0
-    try:
-        for file in directory.rglob('*'):
-            if file.is_file():
-                total_size += file.stat().st_size
-    except Exception:
-        pass
+    killed_count = 0
+    errors = []
+
+    for proc in psutil.process_iter(['pid', 'name']):
+        try:
+            if 'chrome' in proc.info['name'].lower():
+                proc.kill()
+                killed_count += 1
+        except (psutil.NoSuchProcess, psutil.AccessDenied) as e:
+            errors.append(str(e))
+
+    return killed_count, errors
 
-    return round(total_size / (1024 * 1024), 2)
+
+# Mesures relevées en arrière-plan avec les métriques système
+system_sampler.add_collector('cron', get_last_cron_status)
 
 
 @router.get("/", response_class=HTMLResponse)
@@ -568,7 +605,7 @@ async def admin_dashboard(
     Returns:
         HTMLResponse: Page HTML du dashboard
     """
-    system_status = get_system_status()
+    system_status = await worker_pool.run_io(get_system_status)
 
     return templates.TemplateResponse(
         "dashboard.html",
@@ -594,7 +631,64 @@ async def api_system_status(
     Returns:
         JSONResponse: Statut système en JSON
     """
-    return JSONResponse(content=get_system_status())
+    return JSONResponse(content=await worker_pool.run_io(get_system_status))
+
+
+@router.get("/api/status/history")
+async def api_system_status_history(
+    limit: int = 60,
+    authenticated: bool = Depends(verify_admin_auth)
+):
+    """
+    API endpoint retournant l'historique court des métriques (mini-graphiques)
+
+    Args:
+        limit: Nombre maximum de points (les plus récents)
+        authenticated: Dépendance d'authentification
+
+    Returns:
+        JSONResponse: Intervalle entre relevés et points du plus ancien au plus récent
+    """
+    return JSONResponse(content={
+        'interval': system_sampler.interval,
+        'points': system_sampler.history(max(0, limit))
+    })
+
+
+@router.post("/api/storage/reconcile")
+async def api_reconcile_storage(
+    authenticated: bool = Depends(verify_admin_auth)
+):
+    """
+    Reparcourt les répertoires suivis et corrige leurs compteurs de taille
+
+    Args:
+        authenticated: Dépendance d'authentification
+
+    Returns:
+        JSONResponse: Utilisation des répertoires après rapprochement
+    """
+    storage = await worker_pool.run_io(storage_ledger.reconcile)
+    return JSONResponse(content={'success': True, 'storage': storage})
+
+
+@router.get("/api/reports/latest")
+async def api_latest_report(
+    authenticated: bool = Depends(verify_admin_auth)
+):
+    """
+    API endpoint retournant le manifeste du dernier rapport
+
+    Args:
+        authenticated: Dépendance d'authentification
+
+    Returns:
+        JSONResponse: Manifeste du rapport (404 si aucun rapport)
+    """
+    manifest = await worker_pool.run_io(latest_report_manifest, REPORTS_DIR)
+    if manifest is None:
+        return JSONResponse(status_code=404, content={'error': 'Aucun rapport disponible'})
+    return JSONResponse(content=manifest)
 
 
 @router.post("/api/cleanup-chrome")
@@ -610,16 +704,9 @@ async def api_cleanup_chrome(
     Returns:
         JSONResponse: Résultat de l'opération
     """
-    killed_count = 0
-    errors = []
-
-    for proc in psutil.process_iter(['pid', 'name']):
-        try:
-            if 'chrome' in proc.info['name'].lower():
-                proc.kill()
-                killed_count += 1
-        except (psutil.NoSuchProcess, psutil.AccessDenied) as e:
-            errors.append(str(e))
+    killed_count, errors = await worker_pool.run_io(kill_chrome_processes)
+    # Relevé à jour pour le prochain rafraîchissement du dashboard
+    await worker_pool.run_io(system_sampler.sample_now)
 
     return JSONResponse(content={
         'success': True,
@@ -837,6 +924,37 @@ async def admin_classification(
 # ENDPOINTS D'ACTIONS MANUELLES (Phase 3)
 # ============================================================================
 
+async def _launch_task(
+    name: str,
+    command: List[str],
+    message: str,
+    resources: tuple = (),
+    priority: int = TaskPriority.NORMAL
+) -> JSONResponse:
+    """
+    Met une tâche en file d'attente et construit la réponse de l'endpoint
+
+    Returns:
+        JSONResponse: ID de la tâche (429 si la file d'attente est pleine)
+    """
+    try:
+        task_id, deduplicated = await executor.submit_task(
+            name, command, resources=resources, priority=priority
+        )
+    except TaskQueueFullError as e:
+        return JSONResponse(status_code=429, content={'success': False, 'error': str(e)})
+
+    task = await executor.get_task(task_id)
+    return JSONResponse(content={
+        'success': True,
+        'task_id': task_id,
+        'status': task.status.value if task else None,
+        # Commande identique déjà en attente: tâche existante renvoyée
+        'deduplicated': deduplicated,
+        'message': message
+    })
+
+
 @router.post("/api/execute")
 async def api_execute_full(
     authenticated: bool = Depends(verify_admin_auth)
@@ -858,13 +976,12 @@ async def api_execute_full(
         str(BASE_DIR / "linxo_agent.py")
     ]
 
-    task_id = await executor.execute_task("Exécution complète", command)
-
-    return JSONResponse(content={
-        'success': True,
-        'task_id': task_id,
-        'message': 'Exécution complète lancée en arrière-plan'
-    })
+    return await _launch_task(
+        "Exécution complète",
+        command,
+        'Exécution complète lancée en arrière-plan',
+        resources=(RESOURCE_BROWSER, RESOURCE_CSV, RESOURCE_REPORTS)
+    )
 
 
 @router.post("/api/download-csv")
@@ -889,13 +1006,12 @@ async def api_download_csv(
         "--skip-notifications"
     ]
 
-    task_id = await executor.execute_task("Téléchargement CSV", command)
-
-    return JSONResponse(content={
-        'success': True,
-        'task_id': task_id,
-        'message': 'Téléchargement CSV lancé en arrière-plan'
-    })
+    return await _launch_task(
+        "Téléchargement CSV",
+        command,
+        'Téléchargement CSV lancé en arrière-plan',
+        resources=(RESOURCE_BROWSER, RESOURCE_CSV)
+    )
 
 
 @router.post("/api/analyze")
@@ -931,13 +1047,13 @@ async def api_analyze_only(
         "--skip-download"
     ]
 
-    task_id = await executor.execute_task("Analyse du CSV", command)
-
-    return JSONResponse(content={
-        'success': True,
-        'task_id': task_id,
-        'message': 'Analyse lancée en arrière-plan'
-    })
+    # Notifications WhatsApp envoyées via Chrome: navigateur réservé aussi
+    return await _launch_task(
+        "Analyse du CSV",
+        command,
+        'Analyse lancée en arrière-plan',
+        resources=(RESOURCE_BROWSER, RESOURCE_CSV, RESOURCE_REPORTS)
+    )
 
 
 @router.post("/api/diagnostic")
@@ -961,13 +1077,13 @@ async def api_diagnostic(
         str(BASE_DIR / "diagnostic_linxo_html.py")
     ]
 
-    task_id = await executor.execute_task("Diagnostic auto-réparation", command)
-
-    return JSONResponse(content={
-        'success': True,
-        'task_id': task_id,
-        'message': 'Diagnostic lancé en arrière-plan'
-    })
+    return await _launch_task(
+        "Diagnostic auto-réparation",
+        command,
+        'Diagnostic lancé en arrière-plan',
+        resources=(RESOURCE_BROWSER,),
+        priority=TaskPriority.LOW
+    )
 
 
 @router.post("/api/test-email")
@@ -1003,13 +1119,12 @@ print(f'Email envoyé avec succès' if result else 'Échec envoi email')
 """
     ]
 
-    task_id = await executor.execute_task("Test email", command)
-
-    return JSONResponse(content={
-        'success': True,
-        'task_id': task_id,
-        'message': 'Test email lancé'
-    })
+    return await _launch_task(
+        "Test email",
+        command,
+        'Test email lancé',
+        priority=TaskPriority.HIGH
+    )
 
 
 @router.post("/api/test-sms")
@@ -1041,13 +1156,12 @@ print(f'SMS envoyé avec succès' if result else 'Échec envoi SMS')
 """
     ]
 
-    task_id = await executor.execute_task("Test SMS", command)
-
-    return JSONResponse(content={
-        'success': True,
-        'task_id': task_id,
-        'message': 'Test SMS lancé'
-    })
+    return await _launch_task(
+        "Test SMS",
+        command,
+        'Test SMS lancé',
+        priority=TaskPriority.HIGH
+    )
 
 
 @router.post("/api/test-whatsapp")
@@ -1104,31 +1218,35 @@ else:
 """
     ]
 
-    task_id = await executor.execute_task("Test WhatsApp", command)
-
-    return JSONResponse(content={
-        'success': True,
-        'task_id': task_id,
-        'message': 'Test WhatsApp lancé'
-    })
+    return await _launch_task(
+        "Test WhatsApp",
+        command,
+        'Test WhatsApp lancé',
+        resources=(RESOURCE_BROWSER,),
+        priority=TaskPriority.HIGH
+    )
 
 
 @router.get("/api/task/{task_id}")
 async def api_get_task_status(
     task_id: str,
+    after: int = 0,
+    limit: int = 1000,
     authenticated: bool = Depends(verify_admin_auth)
 ):
     """
-    Récupère le statut d'une tâche
+    Récupère le statut d'une tâche et les lignes de sortie après un curseur
 
     Args:
         task_id: ID de la tâche
+        after: Numéro de la dernière ligne déjà reçue (next_seq de l'appel précédent)
+        limit: Nombre maximum de lignes de sortie
         authenticated: Dépendance d'authentification
 
     Returns:
         JSONResponse: Statut de la tâche
     """
-    task_status = await executor.get_task_status(task_id)
+    task_status = await executor.get_task_status(task_id, after=after, limit=max(1, min(limit, 5000)))
 
     if not task_status:
         return JSONResponse(
@@ -1139,6 +1257,90 @@ async def api_get_task_status(
     return JSONResponse(content=task_status)
 
 
+@router.get("/api/task/{task_id}/stream")
+async def api_stream_task_output(
+    request: Request,
+    task_id: str,
+    after: int = 0,
+    authenticated: bool = Depends(verify_admin_auth)
+):
+    """
+    Sortie d'une tâche en direct (Server-Sent Events)
+
+    Événements "output" (lignes, id = numéro de la dernière ligne) puis un
+    événement "status" final. À la reconnexion, l'en-tête Last-Event-ID
+    reprend après la dernière ligne reçue.
+
+    Args:
+        request: Requête FastAPI (en-tête Last-Event-ID)
+        task_id: ID de la tâche
+        after: Numéro de la dernière ligne déjà reçue
+        authenticated: Dépendance d'authentification
+
+    Returns:
+        StreamingResponse: Flux text/event-stream
+    """
+    task = await executor.get_task(task_id)
+    if task is None:
+        return JSONResponse(status_code=404, content={'error': 'Tâche non trouvée'})
+
+    last_event_id = request.headers.get('last-event-id', '')
+    if last_event_id.isdigit():
+        after = int(last_event_id)
+
+    async def stream():
+        cursor = max(0, after)
+        yield 'retry: 3000\n\n'
+        while True:
+            # Statut lu avant la sortie: aucune ligne perdue en fin de tâche
+            finished = task.is_finished
+            lines, cursor = await task.output.read(cursor, 500)
+            if lines:
+                payload = json.dumps({'lines': lines, 'seq': cursor}, ensure_ascii=False)
+                yield f"id: {cursor}\nevent: output\ndata: {payload}\n\n"
+                continue
+            if finished:
+                payload = json.dumps(task.to_dict(), ensure_ascii=False)
+                yield f"id: {cursor}\nevent: status\ndata: {payload}\n\n"
+                return
+            await task.output.wait_for_lines(cursor, 15.0)
+            if task.output.last_seq <= cursor and not task.is_finished:
+                yield ': ping\n\n'
+
+    return StreamingResponse(
+        stream(),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@router.post("/api/task/{task_id}/cancel")
+async def api_cancel_task(
+    task_id: str,
+    authenticated: bool = Depends(verify_admin_auth)
+):
+    """
+    Annule une tâche encore en file d'attente
+
+    Args:
+        task_id: ID de la tâche
+        authenticated: Dépendance d'authentification
+
+    Returns:
+        JSONResponse: Résultat de l'annulation (409 si la tâche a déjà démarré)
+    """
+    if await executor.get_task(task_id) is None:
+        return JSONResponse(status_code=404, content={'error': 'Tâche non trouvée'})
+
+    if not await executor.cancel_task(task_id):
+        return JSONResponse(
+            status_code=409,
+            content={'success': False, 'error': 'Seule une tâche en attente peut être annulée'}
+        )
+
+    return JSONResponse(content={'success': True, 'message': 'Tâche annulée'})
+
+
 @router.get("/api/tasks")
 async def api_list_tasks(
     authenticated: bool = Depends(verify_admin_auth),
@@ -1166,6 +1368,57 @@ async def api_list_tasks(
 # ENDPOINTS DE GESTION DES LOGS (Phase 4)
 # ============================================================================
 
+@router.get("/api/logs/follow")
+async def api_follow_log(
+    request: Request,
+    file_name: str,
+    offset: Optional[int] = None,
+    backlog: int = 50,
+    authenticated: bool = Depends(verify_admin_auth)
+):
+    """
+    Suit un fichier de log en direct (Server-Sent Events)
+
+    Seules les nouvelles lignes sont envoyées. À la reconnexion, le
+    navigateur renvoie l'en-tête Last-Event-ID et le suivi reprend là où
+    il s'était arrêté, y compris après une rotation du fichier.
+
+    Args:
+        request: Requête FastAPI (en-tête Last-Event-ID)
+        file_name: Nom du fichier de log
+        offset: Position de reprise en octets (défaut: fin du fichier)
+        backlog: Nombre de lignes déjà écrites envoyées au démarrage
+        authenticated: Dépendance d'authentification
+
+    Returns:
+        StreamingResponse: Flux text/event-stream
+    """
+    log_path = await worker_pool.run_io(logs_manager.resolve_log_path, file_name)
+    if log_path is None:
+        return JSONResponse(status_code=404, content={'error': 'Fichier de log introuvable'})
+
+    resume = parse_resume_id(request.headers.get('last-event-id'))
+    line_index = logs_manager.line_index(log_path)
+
+    async def stream():
+        # Délai de reconnexion automatique du navigateur (ms)
+        yield 'retry: 3000\n\n'
+        async for message in follow_log(
+            log_path,
+            line_index,
+            resume=resume,
+            offset=offset,
+            backlog=max(0, min(backlog, 500))
+        ):
+            yield format_sse(message)
+
+    return StreamingResponse(
+        stream(),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
 @router.get("/api/logs/files")
 async def api_list_log_files(
     authenticated: bool = Depends(verify_admin_auth)
@@ -1179,7 +1432,7 @@ async def api_list_log_files(
     Returns:
         JSONResponse: Liste des fichiers de logs
     """
-    files = logs_manager.list_log_files()
+    files = await worker_pool.run_io(logs_manager.list_log_files)
 
     return JSONResponse(content={
         'files': files,
@@ -1210,13 +1463,17 @@ async def api_get_log_content(
     Returns:
         JSONResponse: Contenu du log
     """
-    lines, total, has_more = logs_manager.read_log_file(
-        file_name=file_name,
-        offset=offset,
-        limit=limit,
-        level_filter=level,
-        search_query=search
-    )
+    if level or search:
+        lines, total, has_more = await _search_logs(
+            query=search, level=level, file_name=file_name, offset=offset, limit=limit
+        )
+    else:
+        lines, total, has_more = await worker_pool.run_io(
+            logs_manager.read_log_file,
+            file_name=file_name,
+            offset=offset,
+            limit=limit
+        )
 
     return JSONResponse(content={
         'lines': lines,
@@ -1228,6 +1485,70 @@ async def api_get_log_content(
     })
 
 
+async def _search_logs(
+    query: Optional[str],
+    level: Optional[str],
+    file_name: Optional[str],
+    offset: int,
+    limit: int
+):
+    """Recherche via l'index SQLite, lecture du fichier en flux si l'index est indisponible"""
+    try:
+        return await worker_pool.run_io(
+            log_search_index.search,
+            query=query, level=level, file_name=file_name, offset=offset, limit=limit
+        )
+    except (sqlite3.Error, OSError):
+        if not file_name:
+            return [], 0, False
+        return await worker_pool.run_io(
+            logs_manager.read_log_file,
+            file_name=file_name,
+            offset=offset,
+            limit=limit,
+            level_filter=level,
+            search_query=query
+        )
+
+
+@router.get("/api/logs/search")
+async def api_search_logs(
+    q: Optional[str] = None,
+    level: Optional[str] = None,
+    file_name: Optional[str] = None,
+    offset: int = 0,
+    limit: int = 100,
+    authenticated: bool = Depends(verify_admin_auth)
+):
+    """
+    Recherche dans tous les logs (index plein texte), fichiers récents d'abord
+
+    Args:
+        q: Texte recherché (sans tenir compte de la casse)
+        level: Filtrer par niveau (SUCCESS, ERROR, WARNING, INFO)
+        file_name: Limiter à un fichier
+        offset: Rang du premier résultat (pagination)
+        limit: Nombre de résultats
+        authenticated: Dépendance d'authentification
+
+    Returns:
+        JSONResponse: Lignes trouvées avec leur fichier
+    """
+    limit = max(1, min(limit, 500))
+    lines, total, has_more = await _search_logs(
+        query=q, level=level, file_name=file_name, offset=offset, limit=limit
+    )
+
+    return JSONResponse(content={
+        'lines': lines,
+        'total': total,
+        'offset': offset,
+        'limit': limit,
+        'has_more': has_more,
+        'query': q
+    })
+
+
 @router.get("/api/logs/tail")
 async def api_tail_log(
     file_name: str,
@@ -1245,7 +1566,7 @@ async def api_tail_log(
     Returns:
         JSONResponse: Dernières lignes du log
     """
-    log_lines = logs_manager.tail_log_file(file_name, lines)
+    log_lines = await worker_pool.run_io(logs_manager.tail_log_file, file_name, lines)
 
     return JSONResponse(content={
         'lines': log_lines,
@@ -1570,28 +1891,39 @@ async def api_delete_adjustment(
 # ---------------------------------------------------------------------------
 
 
-def _load_latest_variable_transactions() -> Dict[str, Any]:
-    """Lit le CSV le plus récent et renvoie les transactions variables."""
+async def _load_latest_variable_transactions() -> Dict[str, Any]:
+    """Lit le CSV le plus récent et renvoie les transactions variables.
+
+    L'analyse (lecture + classification ML) tourne dans le pool de calcul:
+    le serveur continue de servir les rapports pendant ce temps.
+    """
     latest_csv = DATA_DIR / "latest.csv"
     if not latest_csv.exists():
         raise FileNotFoundError("Aucun fichier latest.csv trouvé")
 
-    transactions, _ = lire_csv_linxo(str(latest_csv))
-    if not transactions:
-        return {'csv': latest_csv, 'transactions': []}
-
-    analysis = analyser_transactions(
-        transactions,
-        use_ml=True,
-        enable_learning=False,
-        enable_familles=False
-    )
+    transactions = await worker_pool.run_cpu(lire_depenses_variables, str(latest_csv))
     return {
         'csv': latest_csv,
-        'transactions': analysis.get('depenses_variables', [])
+        'transactions': transactions
     }
 
 
+def _record_ml_correction(libelle: str, old_category: str, new_category: str, montant: float) -> bool:
+    """Enregistre une correction dans le classifieur ML (False en cas d'échec)."""
+    try:
+        from linxo_agent.smart_classifier import create_classifier
+        classifier = create_classifier()
+        classifier.record_correction(
+            description=libelle,
+            old_category=old_category,
+            new_category=new_category,
+            montant=montant
+        )
+        return True
+    except Exception:
+        return False
+
+
 @router.get("/api/classification/recurrence-suggestions")
 async def api_get_recurrence_suggestions(
     libelle: str,
@@ -1626,7 +1958,9 @@ async def api_get_classification_transactions(
     """Retourne les dernières transactions variables pour validation."""
     limit = max(1, min(limit, 500))
     try:
-        payload = _load_latest_variable_transactions()
+        payload = await _load_latest_variable_transactions()
+    except HTTPException:
+        raise
     except FileNotFoundError:
         return JSONResponse(
             status_code=404,
@@ -1719,30 +2053,26 @@ async def api_post_classification_feedback(
         'recurrence_target_id': recurrence_target_id,
     }
 
-    feedback_id = feedback_manager.add_feedback(feedback_payload)
+    feedback_id = await worker_pool.run_io(feedback_manager.add_feedback, feedback_payload)
 
     ml_updated = False
     if statut == 'corrige' and feedback_payload['categorie_corrigee'] and (
         feedback_payload['categorie_corrigee'] != feedback_payload['categorie_initiale']
     ):
-        try:
-            from linxo_agent.smart_classifier import create_classifier
-            classifier = create_classifier()
-            classifier.record_correction(
-                description=feedback_payload['libelle'] or '',
-                old_category=feedback_payload['categorie_initiale'] or 'Non classé',
-                new_category=feedback_payload['categorie_corrigee'],
-                montant=montant
-            )
-            ml_updated = True
-        except Exception:
-            ml_updated = False
+        ml_updated = await worker_pool.run_io(
+            _record_ml_correction,
+            feedback_payload['libelle'] or '',
+            feedback_payload['categorie_initiale'] or 'Non classé',
+            feedback_payload['categorie_corrigee'],
+            montant
+        )
 
     recurrence_updated = False
     effective_type_corrige = feedback_payload['type_corrige']
     effective_type_initial = type_initial
     if effective_type_corrige and effective_type_corrige != effective_type_initial:
-        recurrence_updated = _apply_recurrence_change(
+        recurrence_updated = await worker_pool.run_io(
+            _apply_recurrence_change,
             {
                 **data,
                 'categorie_corrigee': feedback_payload['categorie_corrigee']
@@ -1767,7 +2097,7 @@ async def api_get_feedback_history(
 ):
     """Retourne l'historique des corrections."""
     limit = max(1, min(limit, 200))
-    history = feedback_manager.list_feedback(limit)
+    history = await worker_pool.run_io(feedback_manager.list_feedback, limit)
     return JSONResponse(content={
         'success': True,
         'history': history
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Relevé périodique des métriques système (thread d'arrière-plan)
+
+Le dashboard ne parcourt plus les processus, le disque et les logs à chaque
+rafraîchissement: un thread relève ces métriques à intervalle fixe et les
+garde dans un tampon circulaire de taille fixe.
+
+- Dernier relevé: lecture immédiate (O(1))
+- Historique court (CPU, mémoire, disque, Chrome) pour les mini-graphiques
+- Processus suivis d'un relevé à l'autre: le pourcentage CPU est mesuré
+  sur l'intervalle écoulé (psutil renvoie 0 au premier appel; ce premier
+  relevé est enregistré comme "non mesuré", None)
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+import psutil
+
+BASE_DIR = Path(__file__).parent.parent.parent.parent
+
+ADMIN_METRICS_INTERVAL = float(os.getenv('ADMIN_METRICS_INTERVAL', '15'))
+# 240 relevés de 15 s: une heure d'historique
+ADMIN_METRICS_HISTORY = int(os.getenv('ADMIN_METRICS_HISTORY', '240'))
+
+
+class SystemSampler:
+    """Relevés système à intervalle fixe dans un tampon circulaire"""
+
+    def __init__(self, root: Path, interval: float = ADMIN_METRICS_INTERVAL,
+                 history_size: int = ADMIN_METRICS_HISTORY):
+        """
+        Args:
+            root: Répertoire dont on mesure le disque
+            interval: Délai entre deux relevés (secondes)
+            history_size: Nombre de relevés conservés
+        """
+        self.root = root
+        self.interval = max(0.01, interval)
+        self._history: Deque[Dict[str, Any]] = deque(maxlen=max(1, history_size))
+        self._collectors: Dict[str, Callable[[], Any]] = {}
+        # Processus Chrome suivis (PID -> psutil.Process): cpu_percent
+        # mesuré depuis le relevé précédent du même objet
+        self._processes: Dict[int, psutil.Process] = {}
+        self._cpu_primed = False
+        self._sample_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add_collector(self, name: str, collector: Callable[[], Any]) -> None:
+        """
+        Ajoute une mesure au relevé (clé `name` du relevé)
+
+        Args:
+            name: Clé du résultat dans le relevé
+            collector: Fonction appelée à chaque relevé (depuis le thread)
+        """
+        self._collectors[name] = collector
+
+    # ------------------------------------------------------------------
+    # Cycle de vie
+    # ------------------------------------------------------------------
+
+    def ensure_started(self) -> None:
+        """Démarre le thread de relevé s'il ne tourne pas"""
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="admin-metrics", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout: float = 5) -> None:
+        """Arrête le thread de relevé"""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.sample_now()
+            except Exception as e:  # pylint: disable=broad-except
+                print(f"[WARN] Releve des metriques systeme en echec: {e}")
+            self._stop.wait(self.interval)
+
+    # ------------------------------------------------------------------
+    # Relevés
+    # ------------------------------------------------------------------
+
+    def _chrome_processes(self) -> List[Dict[str, Any]]:
+        processes = []
+        seen = {}
+        for proc in psutil.process_iter(['pid', 'name']):
+            try:
+                if 'chrome' not in (proc.info['name'] or '').lower():
+                    continue
+                pid = proc.info['pid']
+                known = self._processes.get(pid)
+                # Même PID mais autre processus (réutilisé): nouvelle mesure
+                tracked = known if known is not None and known == proc else proc
+                cpu = tracked.cpu_percent(None)
+                seen[pid] = tracked
+                processes.append({
+                    'pid': pid,
+                    'name': proc.info['name'],
+                    'cpu': cpu if tracked is known else None,
+                    'memory_mb': tracked.memory_info().rss / (1024 * 1024)
+                })
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        self._processes = seen
+        return processes
+
+    def sample_now(self) -> Dict[str, Any]:
+        """
+        Effectue un relevé immédiatement et l'ajoute à l'historique
+
+        Returns:
+            dict: Relevé
+        """
+        with self._sample_lock:
+            cpu = psutil.cpu_percent(None)
+            if not self._cpu_primed:
+                cpu = None
+                self._cpu_primed = True
+            memory = psutil.virtual_memory()
+            disk_usage = psutil.disk_usage(str(self.root))
+            chrome_processes = self._chrome_processes()
+
+            snapshot = {
+                'timestamp': datetime.now().isoformat(),
+                'time': time.time(),
+                'cpu_percent': cpu,
+                'memory_percent': memory.percent,
+                'disk': {
+                    'total_gb': round(disk_usage.total / (1024**3), 2),
+                    'used_gb': round(disk_usage.used / (1024**3), 2),
+                    'free_gb': round(disk_usage.free / (1024**3), 2),
+                    'percent': disk_usage.percent
+                },
+                'chrome': {
+                    'process_count': len(chrome_processes),
+                    'processes': chrome_processes,
+                    'memory_mb': round(sum(p['memory_mb'] for p in chrome_processes), 1)
+                },
+            }
+            for name, collector in self._collectors.items():
+                try:
+                    snapshot[name] = collector()
+                except Exception as e:  # pylint: disable=broad-except
+                    snapshot[name] = None
+                    print(f"[WARN] Mesure '{name}' en echec: {e}")
+
+            self._history.append(snapshot)
+            return snapshot
+
+    def latest(self) -> Dict[str, Any]:
+        """
+        Dernier relevé (relevé immédiat s'il n'y en a pas encore)
+
+        Returns:
+            dict: Relevé
+        """
+        self.ensure_started()
+        try:
+            return self._history[-1]
+        except IndexError:
+            return self.sample_now()
+
+    def history(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Séries des derniers relevés, du plus ancien au plus récent
+
+        Args:
+            limit: Nombre maximum de points (tous si None)
+
+        Returns:
+            List[dict]: Points {timestamp, cpu_percent, memory_percent,
+            disk_percent, chrome_count, chrome_memory_mb}
+        """
+        snapshots = list(self._history)
+        if limit is not None:
+            snapshots = snapshots[-limit:] if limit > 0 else []
+        return [
+            {
+                'timestamp': snapshot['timestamp'],
+                'cpu_percent': snapshot['cpu_percent'],
+                'memory_percent': snapshot['memory_percent'],
+                'disk_percent': snapshot['disk']['percent'],
+                'chrome_count': snapshot['chrome']['process_count'],
+                'chrome_memory_mb': snapshot['chrome']['memory_mb'],
+            }
+            for snapshot in snapshots
+        ]
+
+
+# Instance globale (mesures du cron et des logs ajoutées par les routes)
+system_sampler = SystemSampler(BASE_DIR)
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Stockage partagé des tâches admin (SQLite, mode WAL)
+
+Tous les processus du serveur (uvicorn --workers N) partagent la même
+base data/tasks/tasks.db:
+- une ligne par tâche: métadonnées, statut, processus propriétaire et
+  chemin du fichier de sortie (la sortie elle-même reste dans le fichier)
+- mise en file, prise en charge et annulation dans des transactions
+  BEGIN IMMEDIATE: une tâche n'est démarrée que par un seul processus,
+  les ressources exclusives et la limite de tâches valent pour tous
+- compteur de version incrémenté à chaque écriture: les autres processus
+  le surveillent (lecture périodique) pour rafraîchir leurs vues
+"""
+
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+PENDING = "pending"
+RUNNING = "running"
+# Statuts terminaux
+FINISHED = ("success", "error", "cancelled")
+
+
+class TaskQueueFullError(Exception):
+    """File d'attente des tâches pleine"""
+
+
+def _row_to_state(row: sqlite3.Row) -> Dict[str, Any]:
+    state = dict(row)
+    state["order"] = state.pop("position")
+    state["command"] = json.loads(state["command"])
+    state["resources"] = json.loads(state["resources"])
+    return state
+
+
+class TaskStore:
+    """Table des tâches partagée entre les processus du serveur"""
+
+    def __init__(self, db_path: Path):
+        """
+        Args:
+            db_path: Base SQLite (créée au premier accès)
+        """
+        self.db_path = db_path
+        self._schema_lock = threading.Lock()
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        # Transactions explicites (BEGIN IMMEDIATE)
+        conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _ensure_tables(self) -> None:
+        with self._schema_lock:
+            if not self._ready:
+                self._create_tables()
+                self._ready = True
+
+    def _create_tables(self) -> None:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tasks (
+                    position INTEGER PRIMARY KEY AUTOINCREMENT,
+                    id TEXT UNIQUE NOT NULL,
+                    name TEXT NOT NULL,
+                    command TEXT NOT NULL,
+                    resources TEXT NOT NULL,
+                    priority INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    error TEXT,
+                    exit_code INTEGER,
+                    queued_at TEXT NOT NULL,
+                    start_time TEXT,
+                    end_time TEXT,
+                    output_file TEXT,
+                    output_seq INTEGER NOT NULL DEFAULT 0,
+                    owner TEXT
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status, priority, position)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS task_store_version (id INTEGER PRIMARY KEY CHECK (id = 1), value INTEGER)"
+            )
+            conn.execute("INSERT OR IGNORE INTO task_store_version (id, value) VALUES (1, 0)")
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Transaction en écriture (verrou pris dès le début)
+
+        La version n'est incrémentée que si des lignes ont changé: une
+        transaction sans effet (rien à prendre en charge, rien à supprimer)
+        ne réveille pas les notificateurs des autres processus.
+        """
+        self._ensure_tables()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                changes = conn.total_changes
+                yield conn
+                if conn.total_changes != changes:
+                    conn.execute("UPDATE task_store_version SET value = value + 1 WHERE id = 1")
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _reader(self) -> Iterator[sqlite3.Connection]:
+        self._ensure_tables()
+        conn = self._connect()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    # ------------------------------------------------------------------ #
+    # File d'attente                                                     #
+    # ------------------------------------------------------------------ #
+
+    def enqueue(self, state: Dict[str, Any], queue_size: int) -> Tuple[str, bool]:
+        """
+        Ajoute une tâche en attente
+
+        Args:
+            state: État initial de la tâche (Task.to_state)
+            queue_size: Nombre maximum de tâches en attente
+
+        Returns:
+            Tuple[str, bool]: (ID, True si créée; False: ID de la tâche
+            identique déjà en attente)
+
+        Raises:
+            TaskQueueFullError: Si la file d'attente est pleine
+        """
+        command = json.dumps(state["command"])
+        with self._transaction() as conn:
+            existing = conn.execute(
+                "SELECT id FROM tasks WHERE status = ? AND command = ? ORDER BY position LIMIT 1",
+                (PENDING, command)
+            ).fetchone()
+            if existing is not None:
+                return existing["id"], False
+
+            pending = conn.execute("SELECT COUNT(*) FROM tasks WHERE status = ?", (PENDING,)).fetchone()[0]
+            if pending >= queue_size:
+                raise TaskQueueFullError(f"File d'attente pleine ({queue_size} tâches en attente)")
+
+            conn.execute(
+                """
+                INSERT INTO tasks (id, name, command, resources, priority, status, queued_at, output_file)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    state["id"], state["name"], command, json.dumps(state["resources"]),
+                    state["priority"], PENDING, state["queued_at"], state["output_file"]
+                )
+            )
+        return state["id"], True
+
+    def claim(self, max_concurrent: int, owner: str) -> List[Dict[str, Any]]:
+        """
+        Prend en charge les tâches en attente qui peuvent démarrer
+
+        Priorité puis ordre d'arrivée. Une tâche bloquée réserve ses
+        ressources: les tâches arrivées après elle sur les mêmes ressources
+        attendent leur tour (pas de famine).
+
+        Args:
+            max_concurrent: Nombre maximum de tâches en cours (tous processus)
+            owner: Identifiant "pid:jeton" du gestionnaire qui exécutera les tâches
+
+        Returns:
+            List[Dict]: États des tâches passées en cours pour ce processus
+        """
+        claimed = []
+        with self._transaction() as conn:
+            running = conn.execute("SELECT resources FROM tasks WHERE status = ?", (RUNNING,)).fetchall()
+            busy = set()
+            for row in running:
+                busy.update(json.loads(row["resources"]))
+            slots = max_concurrent - len(running)
+
+            reserved = set()
+            pending = conn.execute(
+                "SELECT * FROM tasks WHERE status = ? ORDER BY priority, position", (PENDING,)
+            ).fetchall()
+            for row in pending:
+                if slots <= 0:
+                    break
+                state = _row_to_state(row)
+                resources = set(state["resources"])
+                if resources & (busy | reserved):
+                    reserved |= resources
+                    continue
+                busy |= resources
+                slots -= 1
+                state.update(status=RUNNING, start_time=datetime.now().isoformat(), owner=owner)
+                conn.execute(
+                    "UPDATE tasks SET status = ?, start_time = ?, owner = ? WHERE id = ?",
+                    (RUNNING, state["start_time"], owner, state["id"])
+                )
+                claimed.append(state)
+        return claimed
+
+    def update(self, task_id: str, **fields: Any) -> None:
+        """Met à jour des colonnes d'une tâche (statut, erreur, fin...)"""
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._transaction() as conn:
+            conn.execute(f"UPDATE tasks SET {assignments} WHERE id = ?", (*fields.values(), task_id))
+
+    def cancel(self, task_id: str) -> bool:
+        """Annule une tâche encore en attente (False si elle a démarré ou n'existe pas)"""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = 'cancelled', end_time = ? WHERE id = ? AND status = ?",
+                (datetime.now().isoformat(), task_id, PENDING)
+            )
+            return cursor.rowcount > 0
+
+    def reap(self, is_alive: Callable[[str, Optional[str]], bool], error: str) -> List[str]:
+        """
+        Termine en erreur les tâches en cours dont le processus a disparu
+
+        Args:
+            is_alive: (ID de tâche, propriétaire) -> propriétaire toujours actif
+            error: Message d'erreur enregistré
+
+        Returns:
+            List[str]: IDs des tâches terminées
+        """
+        with self._reader() as conn:
+            rows = conn.execute("SELECT id, owner FROM tasks WHERE status = ?", (RUNNING,)).fetchall()
+        lost = [row["id"] for row in rows if not is_alive(row["id"], row["owner"])]
+        if not lost:
+            return []
+
+        with self._transaction() as conn:
+            now = datetime.now().isoformat()
+            for task_id in lost:
+                conn.execute(
+                    "UPDATE tasks SET status = 'error', error = ?, end_time = ? WHERE id = ? AND status = ?",
+                    (error, now, task_id, RUNNING)
+                )
+        return lost
+
+    # ------------------------------------------------------------------ #
+    # Lecture                                                            #
+    # ------------------------------------------------------------------ #
+
+    def version(self) -> int:
+        """Compteur des écritures (change dès qu'un processus modifie une tâche)"""
+        with self._reader() as conn:
+            return conn.execute("SELECT value FROM task_store_version WHERE id = 1").fetchone()[0]
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        with self._reader() as conn:
+            row = conn.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return _row_to_state(row) if row is not None else None
+
+    def get_many(self, task_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        if not task_ids:
+            return {}
+        placeholders = ", ".join("?" for _ in task_ids)
+        with self._reader() as conn:
+            rows = conn.execute(f"SELECT * FROM tasks WHERE id IN ({placeholders})", task_ids).fetchall()
+        return {row["id"]: _row_to_state(row) for row in rows}
+
+    def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Tâches les plus récentes d'abord"""
+        with self._reader() as conn:
+            rows = conn.execute("SELECT * FROM tasks ORDER BY position DESC LIMIT ?", (limit,)).fetchall()
+        return [_row_to_state(row) for row in rows]
+
+    # ------------------------------------------------------------------ #
+    # Nettoyage                                                          #
+    # ------------------------------------------------------------------ #
+
+    def prune(self, keep: Optional[int] = None, finished_before: Optional[datetime] = None) -> List[str]:
+        """
+        Supprime des tâches terminées
+
+        Args:
+            keep: Nombre de tâches terminées conservées (les plus récentes)
+            finished_before: Supprimer les tâches terminées avant cette date
+
+        Returns:
+            List[str]: Fichiers de sortie des tâches supprimées
+        """
+        finished = ", ".join(f"'{status}'" for status in FINISHED)
+        conditions = []
+        params: List[Any] = []
+        if keep is not None:
+            conditions.append(
+                f"""position NOT IN (
+                    SELECT position FROM tasks WHERE status IN ({finished})
+                    ORDER BY position DESC LIMIT ?
+                )"""
+            )
+            params.append(keep)
+        if finished_before is not None:
+            conditions.append("end_time < ?")
+            params.append(finished_before.isoformat())
+        if not conditions:
+            return []
+
+        where = f"status IN ({finished}) AND ({' OR '.join(conditions)})"
+        with self._transaction() as conn:
+            rows = conn.execute(f"SELECT output_file FROM tasks WHERE {where}", params).fetchall()
+            if rows:
+                conn.execute(f"DELETE FROM tasks WHERE {where}", params)
+        return [row["output_file"] for row in rows if row["output_file"]]
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Processus d'analyse préchargé (côté serveur)
+
+Les analyses sans téléchargement ("python linxo_agent.py --skip-download")
+ne lancent plus un nouvel interpréteur: elles sont confiées à un processus
+démarré à l'avance (linxo_agent/warm_runner.py) qui garde chargés le
+script principal, l'analyseur, le classificateur et les templates.
+
+- Travaux envoyés par un tube (stdin/stdout, un objet JSON par ligne),
+  un à la fois
+- Chaque ligne affichée par le travail est ajoutée à la sortie de la
+  tâche, comme la sortie d'un sous-processus
+- Processus arrêté ou introuvable: relancé au travail suivant; en cas
+  d'échec du démarrage, la tâche repasse par un sous-processus classique
+"""
+
+import asyncio
+import json
+import os
+import signal
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+BASE_DIR = Path(__file__).parent.parent.parent.parent
+MAIN_SCRIPT = BASE_DIR / "linxo_agent.py"
+
+WARM_WORKER_ENABLED = os.getenv('ADMIN_WARM_WORKER', 'true').lower() in ('1', 'true', 'yes')
+# Chargement initial (imports, modèle, templates)
+WARM_START_TIMEOUT = 120.0
+# Pas de nouvel essai de démarrage avant ce délai après un échec
+WARM_RETRY_DELAY = 60.0
+# Options du script principal compatibles (pas de navigateur)
+_WARM_FLAGS = {"--skip-download", "--skip-notifications"}
+# Taille maximale d'une ligne du protocole
+_STREAM_LIMIT = 16 * 1024 * 1024
+
+
+class WarmWorker:
+    """Processus préchargé qui exécute les analyses sans téléchargement"""
+
+    def __init__(self, script: Path = MAIN_SCRIPT, enabled: bool = WARM_WORKER_ENABLED,
+                 preload: bool = True):
+        """
+        Args:
+            script: Script principal exécuté par le processus
+            enabled: False: toutes les tâches passent par un sous-processus
+            preload: Charger classificateur et templates au démarrage
+        """
+        self.script = script
+        self.enabled = enabled
+        self.preload = preload
+        self.pid: Optional[int] = None
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._failed_at: Optional[float] = None
+        self._prestart: Optional[asyncio.Task] = None
+
+    def job_args(self, command: List[str]) -> Optional[List[str]]:
+        """
+        Arguments du script principal si la commande peut tourner dans le
+        processus préchargé (None sinon)
+        """
+        if not self.enabled or len(command) < 2:
+            return None
+        if command[0] != sys.executable or command[1] != str(self.script):
+            return None
+        args = command[2:]
+        if "--skip-download" not in args or not set(args) <= _WARM_FLAGS:
+            return None
+        return args
+
+    # ------------------------------------------------------------------
+    # Cycle de vie
+    # ------------------------------------------------------------------
+
+    def _bind_loop(self) -> None:
+        """Processus et verrou liés à la boucle courante (une seule en production)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._kill()
+        self._loop = loop
+        self._lock = asyncio.Lock()
+        self._prestart = None
+
+    def _alive(self) -> bool:
+        return self._process is not None and self._process.returncode is None
+
+    def _kill(self) -> None:
+        if self._process is None:
+            return
+        if self._process.returncode is None:
+            try:
+                self._process.kill()
+            except (ProcessLookupError, RuntimeError):
+                # Transport déjà fermé (boucle terminée): signal direct
+                try:
+                    os.kill(self._process.pid, getattr(signal, 'SIGKILL', signal.SIGTERM))
+                except OSError:
+                    pass
+        self._process = None
+        self.pid = None
+
+    async def _spawn(self) -> bool:
+        if self._failed_at is not None and time.monotonic() - self._failed_at < WARM_RETRY_DELAY:
+            return False
+
+        command = [sys.executable, "-m", "linxo_agent.warm_runner", "--script", str(self.script)]
+        if not self.preload:
+            command.append("--no-preload")
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                cwd=str(BASE_DIR),
+                limit=_STREAM_LIMIT
+            )
+        except OSError as e:
+            print(f"[WARN] Processus d'analyse precharge non demarre: {e}")
+            self._failed_at = time.monotonic()
+            return False
+
+        self._process = process
+        try:
+            raw = await asyncio.wait_for(process.stdout.readline(), WARM_START_TIMEOUT)
+            message = json.loads(raw) if raw else {}
+        except (asyncio.TimeoutError, ValueError):
+            message = {}
+        if message.get("event") != "ready":
+            print("[WARN] Processus d'analyse precharge non demarre (chargement en echec)")
+            self._kill()
+            self._failed_at = time.monotonic()
+            return False
+
+        self.pid = message.get("pid", process.pid)
+        self._failed_at = None
+        return True
+
+    async def start(self) -> bool:
+        """Démarre le processus s'il ne tourne pas (True s'il est prêt)"""
+        if not self.enabled:
+            return False
+        self._bind_loop()
+        async with self._lock:
+            return self._alive() or await self._spawn()
+
+    def prestart(self) -> None:
+        """Démarrage en arrière-plan: le chargement est fait avant la première analyse"""
+        if not self.enabled:
+            return
+        self._bind_loop()
+        if self._prestart is None:
+            self._prestart = asyncio.get_running_loop().create_task(self.start())
+
+    async def shutdown(self) -> None:
+        """Ferme le processus (fin de stdin), arrêt forcé au bout de 5 s"""
+        if not self._alive():
+            return
+        try:
+            self._process.stdin.close()
+            await asyncio.wait_for(self._process.wait(), 5)
+        except (asyncio.TimeoutError, OSError):
+            pass
+        self._kill()
+
+    # ------------------------------------------------------------------
+    # Travaux
+    # ------------------------------------------------------------------
+
+    async def run(self, args: List[str], output, env: dict) -> Optional[int]:
+        """
+        Exécute le script principal avec `args` dans le processus préchargé
+
+        Args:
+            args: Arguments du script (voir job_args)
+            output: Sortie de la tâche (TaskOutput) où ajouter les lignes
+            env: Variables d'environnement du travail
+
+        Returns:
+            Optional[int]: Code de sortie, None si le processus n'a pas pu
+            démarrer (la tâche passe alors par un sous-processus)
+        """
+        if not self.enabled:
+            return None
+        self._bind_loop()
+        async with self._lock:
+            if not self._alive() and not await self._spawn():
+                return None
+
+            process = self._process
+            try:
+                process.stdin.write((json.dumps({"args": args, "env": env}) + "\n").encode("utf-8"))
+                await process.stdin.drain()
+                while True:
+                    raw = await process.stdout.readline()
+                    if not raw:
+                        output.append("[ERROR] Processus d'analyse precharge arrete en cours de tache")
+                        self._kill()
+                        return -1
+                    message = json.loads(raw)
+                    if message.get("event") == "line":
+                        output.append(message.get("line", ""))
+                    elif message.get("event") == "exit":
+                        return int(message.get("code", 1))
+            except asyncio.CancelledError:
+                # Travail interrompu: le processus est dans un état inconnu
+                self._kill()
+                raise
+            except (OSError, ValueError) as e:
+                output.append(f"[ERROR] Processus d'analyse precharge: {e}")
+                self._kill()
+                return -1
+
+
+# Instance globale
+warm_worker = WarmWorker()
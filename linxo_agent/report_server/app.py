@@ -12,11 +12,12 @@ import hmac
 import hashlib
 import time
 import secrets
+from email.utils import parsedate_to_datetime
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 
 from fastapi import FastAPI, HTTPException, Depends, Request
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi.responses import FileResponse, HTMLResponse, RedirectResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from starlette.status import HTTP_401_UNAUTHORIZED
@@ -25,6 +26,21 @@ from dotenv import load_dotenv
 # Charger les variables d'environnement
 load_dotenv()
 
+try:
+    from .file_cache import CachedFile, ReportFileCache
+    from .metrics import (
+        LatencyHistogram, render_cache_metrics, render_pipeline_metrics,
+    )
+    from ..pipeline_metrics import load_pipeline_metrics
+    from ..report_archive import read_archived_file
+except ImportError:
+    from linxo_agent.report_server.file_cache import CachedFile, ReportFileCache
+    from linxo_agent.report_server.metrics import (
+        LatencyHistogram, render_cache_metrics, render_pipeline_metrics,
+    )
+    from linxo_agent.pipeline_metrics import load_pipeline_metrics
+    from linxo_agent.report_archive import read_archived_file
+
 # Import du routeur admin
 try:
     from .admin import router as admin_router
@@ -46,6 +62,27 @@ REPORTS_BASIC_USER = os.getenv('REPORTS_BASIC_USER', 'linxo')
 REPORTS_BASIC_PASS = os.getenv('REPORTS_BASIC_PASS')
 REPORTS_SIGNING_KEY = os.getenv('REPORTS_SIGNING_KEY')
 
+# Variantes pré-compressées écrites par le générateur (ordre de préférence)
+PRECOMPRESSED_VARIANTS = (('br', '.br'), ('gzip', '.gz'))
+
+# Cache mémoire des fichiers de rapport (LRU borné en octets)
+REPORTS_CACHE_MAX_BYTES = int(os.getenv('REPORTS_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+REPORTS_CACHE_REVALIDATE = float(os.getenv('REPORTS_CACHE_REVALIDATE', '2'))
+# Fichiers plus gros (exports CSV, zip): diffusés depuis le disque sans cache
+REPORTS_CACHE_MAX_ENTRY_BYTES = int(os.getenv('REPORTS_CACHE_MAX_ENTRY_BYTES', str(4 * 1024 * 1024)))
+
+report_cache = ReportFileCache(
+    max_bytes=REPORTS_CACHE_MAX_BYTES,
+    revalidate_seconds=REPORTS_CACHE_REVALIDATE,
+    max_entry_bytes=REPORTS_CACHE_MAX_ENTRY_BYTES,
+)
+
+# Latence des requêtes par route (exposée sur /metrics)
+request_latency = LatencyHistogram(
+    "linxo_http_request_duration_seconds",
+    "Durée de traitement des requêtes HTTP",
+)
+
 if not REPORTS_BASIC_PASS:
     raise ValueError(
         "REPORTS_BASIC_PASS doit être défini dans le fichier .env pour sécuriser le serveur"
@@ -156,6 +193,158 @@ async def verify_auth(
     return True
 
 
+def parse_accept_encoding(header: Optional[str]) -> dict:
+    """
+    Analyse un en-tête Accept-Encoding
+
+    Args:
+        header: Valeur brute (ex: "gzip, deflate, br;q=0.9")
+
+    Returns:
+        dict: Encodage -> qualité (les encodages refusés, q=0, sont exclus)
+    """
+    encodings = {}
+    if not header:
+        return encodings
+
+    for part in header.split(','):
+        token, _, params = part.strip().partition(';')
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if quality > 0:
+            encodings[token] = quality
+    return encodings
+
+
+def get_report_file(full_path: Path, stream_large: bool = False) -> Optional[CachedFile]:
+    """
+    Retourne un fichier de rapport depuis le cache, ou le charge après contrôle
+
+    Un fichier n'entre en cache qu'après vérification qu'il se trouve bien
+    dans REPORTS_BASE_DIR: les requêtes servies depuis le cache n'accèdent
+    pas au disque. Un fichier absent du disque est cherché dans le pack
+    d'archive de son mois (report_archive.py).
+
+    Args:
+        full_path: Chemin du fichier demandé
+        stream_large: Ne pas lire un fichier trop gros pour le cache
+
+    Returns:
+        Optional[CachedFile]: Fichier (entry.exists False s'il n'existe pas),
+        None si stream_large et le fichier dépasse la taille d'une entrée
+        (à diffuser depuis le disque)
+
+    Raises:
+        HTTPException: Si le chemin sort de REPORTS_BASE_DIR
+    """
+    entry = report_cache.lookup(full_path)
+    if entry is not None:
+        return entry
+
+    # Vérifier que le chemin résolu est bien dans REPORTS_BASE_DIR (éviter path traversal)
+    try:
+        full_path.resolve().relative_to(REPORTS_BASE_DIR.resolve())
+    except ValueError:
+        if not full_path.is_file():
+            raise HTTPException(status_code=404, detail="Rapport non trouvé")
+        raise HTTPException(status_code=403, detail="Accès interdit")
+
+    if stream_large:
+        try:
+            if full_path.is_file() and not report_cache.fits(full_path.stat().st_size):
+                return None
+        except OSError:
+            pass
+
+    entry = report_cache.load(full_path)
+    if not entry.exists:
+        relative = full_path.relative_to(REPORTS_BASE_DIR)
+        if len(relative.parts) > 1:
+            archived = read_archived_file(
+                REPORTS_BASE_DIR, relative.parts[0], Path(*relative.parts[1:]).as_posix()
+            )
+            if archived is not None:
+                entry = report_cache.put_archived(
+                    full_path, archived.data, archived.mtime_ns,
+                    archived.pack_path, archived.pack_stat,
+                )
+    return entry
+
+
+def select_precompressed(
+    page: CachedFile,
+    accept_encoding: Optional[str]
+) -> Tuple[CachedFile, Optional[str]]:
+    """
+    Choisit la variante pré-compressée à servir pour une page
+
+    Args:
+        page: Page HTML demandée
+        accept_encoding: En-tête Accept-Encoding du client
+
+    Returns:
+        Tuple[CachedFile, Optional[str]]: (fichier à servir, Content-Encoding ou None)
+    """
+    accepted = parse_accept_encoding(accept_encoding)
+    candidates = []
+    for rank, (encoding, suffix) in enumerate(PRECOMPRESSED_VARIANTS):
+        quality = accepted.get(encoding, accepted.get('*', 0))
+        if quality > 0:
+            candidates.append((-quality, rank, encoding, suffix))
+
+    for _, _, encoding, suffix in sorted(candidates):
+        variant = get_report_file(page.path.with_name(page.path.name + suffix))
+        # Variante ignorée si plus ancienne que la page (écriture interrompue)
+        if variant.exists and variant.mtime_ns >= page.mtime_ns:
+            return variant, encoding
+
+    return page, None
+
+
+def is_not_modified(request: Request, served: CachedFile) -> bool:
+    """
+    Évalue les en-têtes conditionnels (If-None-Match prioritaire sur If-Modified-Since)
+
+    Args:
+        request: Requête FastAPI
+        served: Fichier qui serait servi
+
+    Returns:
+        bool: True si le client possède déjà cette version (réponse 304)
+    """
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        if if_none_match.strip() == '*':
+            return True
+        for tag in if_none_match.split(','):
+            tag = tag.strip()
+            if tag.startswith('W/'):
+                tag = tag[2:]
+            if tag == served.etag:
+                return True
+        return False
+
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since is None:
+            return False
+        return served.mtime <= int(since.timestamp())
+
+    return False
+
+
 # Middleware pour ajouter des en-têtes de sécurité
 @app.middleware("http")
 async def add_security_headers(request: Request, call_next):
@@ -171,6 +360,26 @@ async def add_security_headers(request: Request, call_next):
     return response
 
 
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """Mesure la durée de chaque requête, étiquetée par modèle de route"""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Modèle de route (ex: /reports/{date_path}/{file_path:path}) pour borner les séries
+        route = request.scope.get("route")
+        request_latency.observe(
+            getattr(route, "path", "unmatched"),
+            request.method,
+            status,
+            time.perf_counter() - start,
+        )
+
+
 @app.get("/healthz")
 async def health_check():
     """
@@ -186,6 +395,27 @@ async def health_check():
     }
 
 
+@app.get("/metrics")
+async def metrics(authenticated: bool = Depends(verify_auth)):
+    """
+    Métriques au format texte Prometheus
+
+    - Latence des requêtes par route
+    - Cache mémoire des rapports
+    - Dernière exécution du pipeline (fichier écrit par le cron)
+
+    Returns:
+        Response: Exposition texte (text/plain; version=0.0.4)
+    """
+    lines = request_latency.render()
+    lines += render_cache_metrics(report_cache)
+    lines += render_pipeline_metrics(load_pipeline_metrics())
+    return Response(
+        content="\n".join(lines) + "\n",
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
 @app.get("/")
 async def root(authenticated: bool = Depends(verify_auth)):
     """
@@ -240,22 +470,46 @@ async def root(authenticated: bool = Depends(verify_auth)):
     return HTMLResponse(content=html_content)
 
 
+@app.get("/reports/rollups")
+@app.get("/reports/rollups/")
+async def get_rollups_index(authenticated: bool = Depends(verify_auth)):
+    """
+    Point d'entrée des synthèses mensuelles et annuelles
+
+    Les pages sont générées dans data/reports/rollups/ (linxo_agent/rollups.py)
+    et servies par get_report.
+
+    Returns:
+        RedirectResponse: Redirection vers l'index des synthèses
+    """
+    return RedirectResponse(url="/reports/rollups/index.html")
+
+
 @app.get("/reports/{date_path}/{file_path:path}")
 async def get_report(
     date_path: str,
     file_path: str,
+    request: Request,
     authenticated: bool = Depends(verify_auth)
 ):
     """
     Sert un fichier de rapport HTML ou une ressource statique
 
+    Les pages HTML sont servies depuis leur variante pré-compressée
+    (.br ou .gz, écrite par le générateur) si le client l'accepte.
+    Les fichiers sont servis depuis un cache mémoire LRU, avec ETag et
+    Last-Modified (réponse 304 si le client a déjà la bonne version).
+    Les ressources plus grosses qu'une entrée du cache sont diffusées
+    depuis le disque.
+
     Args:
         date_path: Date du rapport (YYYY-MM-DD)
         file_path: Chemin du fichier dans le répertoire de la date
+        request: Requête FastAPI (négociation Accept-Encoding)
         authenticated: Dépendance d'authentification
 
     Returns:
-        FileResponse: Fichier demandé
+        Response: Fichier demandé (ou 304 Not Modified)
 
     Raises:
         HTTPException: Si fichier non trouvé
@@ -263,16 +517,6 @@ async def get_report(
     # Construire le chemin complet
     full_path = REPORTS_BASE_DIR / date_path / file_path
 
-    # Vérifier que le fichier existe et est dans le bon répertoire (sécurité)
-    if not full_path.exists() or not full_path.is_file():
-        raise HTTPException(status_code=404, detail="Rapport non trouvé")
-
-    # Vérifier que le chemin résolu est bien dans REPORTS_BASE_DIR (éviter path traversal)
-    try:
-        full_path.resolve().relative_to(REPORTS_BASE_DIR.resolve())
-    except ValueError:
-        raise HTTPException(status_code=403, detail="Accès interdit")
-
     # Déterminer le type MIME
     if file_path.endswith('.html'):
         media_type = 'text/html'
@@ -283,12 +527,41 @@ async def get_report(
     else:
         media_type = 'application/octet-stream'
 
-    return FileResponse(
-        full_path,
+    headers = {
+        "Cache-Control": "private, max-age=3600"
+    }
+
+    # Fichier depuis le cache (contrôle d'existence et de chemin au chargement);
+    # les ressources trop grosses pour le cache sont diffusées depuis le disque
+    page = get_report_file(full_path, stream_large=media_type != 'text/html')
+    if page is None:
+        return FileResponse(path=full_path, media_type=media_type, headers=headers)
+    if not page.exists:
+        raise HTTPException(status_code=404, detail="Rapport non trouvé")
+
+    # Variante pré-compressée (aucune compression à la volée)
+    if media_type == 'text/html':
+        served, content_encoding = select_precompressed(
+            page, request.headers.get('accept-encoding')
+        )
+        headers["Vary"] = "Accept-Encoding"
+        if content_encoding:
+            headers["Content-Encoding"] = content_encoding
+    else:
+        served = page
+
+    # Validateurs propres à la variante servie
+    headers["ETag"] = served.etag
+    headers["Last-Modified"] = served.last_modified
+
+    if is_not_modified(request, served):
+        headers.pop("Content-Encoding", None)
+        return Response(status_code=304, headers=headers)
+
+    return Response(
+        content=served.data,
         media_type=media_type,
-        headers={
-            "Cache-Control": "private, max-age=3600"
-        }
+        headers=headers
     )
 
 
@@ -320,8 +593,10 @@ Configuration:
 
 Endpoints:
   - GET /healthz          : Health check (non authentifie)
+  - GET /metrics          : Metriques Prometheus (authentifie)
   - GET /                 : Page d'accueil
   - GET /reports/...      : Rapports HTML (authentifie)
+  - GET /reports/rollups/ : Syntheses mensuelles et annuelles
   - GET /admin            : Interface admin (authentifie)
 
 Appuyez sur Ctrl+C pour arreter le serveur
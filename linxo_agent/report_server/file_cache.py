@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache LRU en mémoire des fichiers de rapport servis
+- Borné en octets (les fichiers les moins récemment servis sont évincés)
+- Fichiers au-delà de la taille maximale d'une entrée jamais mis en cache
+- Invalidé par mtime/taille, vérifiés au plus une fois par intervalle
+- ETag fort (empreinte du contenu) et Last-Modified calculés au chargement
+- Fichiers lus depuis un pack d'archive: invalidés par mtime/taille du pack
+"""
+
+import hashlib
+import stat
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import formatdate
+from pathlib import Path
+from typing import Optional, Tuple
+
+
+@dataclass
+class CachedFile:
+    """Fichier chargé en mémoire avec ses métadonnées HTTP"""
+    path: Path
+    data: Optional[bytes]
+    mtime_ns: int
+    size: int
+    etag: str
+    last_modified: str
+    checked_at: float
+    # Pack d'archive d'où provient le contenu, et son (mtime_ns, taille)
+    source: Optional[Path] = None
+    source_stat: Tuple[int, int] = (-1, -1)
+
+    @property
+    def exists(self) -> bool:
+        return self.data is not None
+
+    @property
+    def mtime(self) -> int:
+        """mtime en secondes entières (précision de Last-Modified)"""
+        return self.mtime_ns // 1_000_000_000
+
+
+class ReportFileCache:
+    """
+    Cache LRU des fichiers de rapport, borné en octets
+
+    Les fichiers absents sont aussi mémorisés (entrée sans contenu) pour
+    éviter de re-tester les variantes .br/.gz inexistantes à chaque requête.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 32 * 1024 * 1024,
+        revalidate_seconds: float = 2.0,
+        max_entries: int = 4096,
+        max_entry_bytes: int = 4 * 1024 * 1024,
+    ):
+        """
+        Args:
+            max_bytes: Taille maximale cumulée des contenus en cache
+            revalidate_seconds: Délai pendant lequel une entrée est servie sans stat()
+            max_entries: Nombre maximal d'entrées (y compris fichiers absents)
+            max_entry_bytes: Taille maximale d'un fichier mis en cache
+        """
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.max_entries = max_entries
+        self.revalidate_seconds = revalidate_seconds
+        self._entries: "OrderedDict[Path, CachedFile]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def size(self) -> int:
+        """Taille cumulée des contenus en cache (octets)"""
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def fits(self, size: int) -> bool:
+        """Indique si un contenu de cette taille peut entrer en cache"""
+        return size <= min(self.max_bytes, self.max_entry_bytes)
+
+    def clear(self) -> None:
+        """Vide le cache"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def lookup(self, path: Path) -> Optional[CachedFile]:
+        """
+        Retourne l'entrée en cache si elle est toujours valide
+
+        Sans accès disque tant que l'entrée a été vérifiée il y a moins de
+        revalidate_seconds; sinon un stat() confirme mtime et taille.
+
+        Args:
+            path: Chemin du fichier
+
+        Returns:
+            Optional[CachedFile]: Entrée valide (éventuellement "absente"), ou None
+        """
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None:
+                self.misses += 1
+                return None
+            now = time.monotonic()
+            if now - entry.checked_at < self.revalidate_seconds:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry
+
+        # Revalidation hors verrou (accès disque)
+        if entry.source is not None:
+            # Contenu archivé: valide tant que le pack est inchangé et le fichier non régénéré
+            valid = _stat(entry.source) == entry.source_stat and _stat(path) == (-1, -1)
+        else:
+            valid = _stat(path) == (entry.mtime_ns, entry.size)
+        with self._lock:
+            if valid and self._entries.get(path) is entry:
+                entry.checked_at = time.monotonic()
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry
+            self._remove(path)
+            self.misses += 1
+        return None
+
+    def load(self, path: Path) -> CachedFile:
+        """
+        Lit un fichier depuis le disque et le met en cache si sa taille le permet
+
+        Args:
+            path: Chemin du fichier
+
+        Returns:
+            CachedFile: Entrée chargée (data=None si le fichier n'existe pas)
+        """
+        mtime_ns, size = _stat(path)
+        data = None
+        if mtime_ns >= 0:
+            try:
+                data = path.read_bytes()
+            except OSError:
+                mtime_ns, size = -1, -1
+        # Fichier remplacé pendant la lecture: servi mais pas mis en cache
+        cacheable = data is None or len(data) == size
+
+        entry = _make_entry(path, data, mtime_ns, size)
+        if cacheable:
+            self._insert(entry)
+        return entry
+
+    def put_archived(
+        self,
+        path: Path,
+        data: bytes,
+        mtime_ns: int,
+        source: Path,
+        source_stat: Tuple[int, int],
+    ) -> CachedFile:
+        """
+        Met en cache un fichier lu depuis un pack d'archive
+
+        Args:
+            path: Chemin (virtuel) du fichier dans l'arborescence des rapports
+            data: Contenu
+            mtime_ns: Date de modification enregistrée dans le pack
+            source: Pack d'origine
+            source_stat: (mtime_ns, taille) du pack au moment de la lecture
+
+        Returns:
+            CachedFile: Entrée créée
+        """
+        entry = _make_entry(path, data, mtime_ns, len(data))
+        entry.source = source
+        entry.source_stat = source_stat
+        self._insert(entry)
+        return entry
+
+    def get(self, path: Path) -> CachedFile:
+        """Retourne le fichier depuis le cache, ou le charge depuis le disque"""
+        entry = self.lookup(path)
+        if entry is None:
+            entry = self.load(path)
+        return entry
+
+    def _insert(self, entry: CachedFile) -> None:
+        """Ajoute une entrée et évince les plus anciennes au-delà des limites"""
+        content_size = len(entry.data) if entry.data is not None else 0
+        if not self.fits(content_size):
+            return
+        with self._lock:
+            self._remove(entry.path)
+            self._entries[entry.path] = entry
+            self._size += content_size
+            while self._entries and (
+                self._size > self.max_bytes or len(self._entries) > self.max_entries
+            ):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def _remove(self, path: Path) -> None:
+        """Retire une entrée (appelé sous verrou)"""
+        entry = self._entries.pop(path, None)
+        if entry is not None and entry.data is not None:
+            self._size -= len(entry.data)
+
+
+def _make_entry(path: Path, data: Optional[bytes], mtime_ns: int, size: int) -> CachedFile:
+    """Construit une entrée avec ses validateurs HTTP"""
+    return CachedFile(
+        path=path,
+        data=data,
+        mtime_ns=mtime_ns,
+        size=size,
+        etag=f'"{hashlib.sha256(data).hexdigest()[:32]}"' if data is not None else "",
+        last_modified=formatdate(mtime_ns / 1e9, usegmt=True) if data is not None else "",
+        checked_at=time.monotonic(),
+    )
+
+
+def _stat(path: Path) -> tuple:
+    """(mtime_ns, taille) d'un fichier régulier, (-1, -1) sinon"""
+    try:
+        stat_result = path.stat()
+    except OSError:
+        return -1, -1
+    if not stat.S_ISREG(stat_result.st_mode):
+        return -1, -1
+    return stat_result.st_mtime_ns, stat_result.st_size
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Métriques au format texte Prometheus pour /metrics
+- Histogrammes de latence des requêtes par route
+- Cache mémoire des rapports (hits, misses, taux de succès, taille)
+- Dernière exécution du pipeline (durée et lignes par étape), lue depuis
+  le fichier écrit par les scripts du cron (pipeline_metrics.py)
+
+Implémentation sans dépendance (pas de prometheus_client).
+"""
+
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, List, Tuple
+
+# Bornes des histogrammes de latence (secondes)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class LatencyHistogram:
+    """Histogramme de latence par (route, méthode, statut)"""
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, str, str], List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, route: str, method: str, status: int, seconds: float) -> None:
+        key = (route, method, str(status))
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # [compteurs par borne, somme, total]
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += seconds
+            series[2] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {key: (list(s[0]), s[1], s[2]) for key, s in self._series.items()}
+        for (route, method, status), (counts, total_sum, count) in sorted(snapshot.items()):
+            labels = {"route": route, "method": method, "status": status}
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(
+                    f"{self.name}_bucket{_labels({**labels, 'le': _number(bound)})} {cumulative}"
+                )
+            lines.append(f"{self.name}_bucket{_labels({**labels, 'le': '+Inf'})} {count}")
+            lines.append(f"{self.name}_sum{_labels(labels)} {_number(total_sum)}")
+            lines.append(f"{self.name}_count{_labels(labels)} {count}")
+        return lines
+
+
+def render_gauge(name: str, help_text: str, samples: List[Tuple[Dict[str, str], float]],
+                 metric_type: str = "gauge") -> List[str]:
+    """Bloc texte d'une métrique simple (gauge ou counter)"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(labels)} {_number(value)}")
+    return lines
+
+
+def render_cache_metrics(cache: Any) -> List[str]:
+    """Métriques d'un ReportFileCache"""
+    lookups = cache.hits + cache.misses
+    lines = []
+    lines += render_gauge("linxo_report_cache_hits_total", "Fichiers servis depuis le cache",
+                          [({}, cache.hits)], "counter")
+    lines += render_gauge("linxo_report_cache_misses_total", "Fichiers absents du cache ou périmés",
+                          [({}, cache.misses)], "counter")
+    lines += render_gauge("linxo_report_cache_hit_ratio", "Part des lectures servies par le cache",
+                          [({}, cache.hits / lookups if lookups else 0.0)])
+    lines += render_gauge("linxo_report_cache_bytes", "Taille des contenus en cache",
+                          [({}, cache.size)])
+    lines += render_gauge("linxo_report_cache_entries", "Entrées en cache",
+                          [({}, len(cache))])
+    return lines
+
+
+def render_pipeline_metrics(metrics: Dict[str, Any]) -> List[str]:
+    """Métriques de la dernière exécution du pipeline (une série par étape)"""
+    stages = metrics.get("stages", {})
+    durations, rows, success, finished = [], [], [], []
+    for stage in sorted(stages):
+        data = stages[stage]
+        labels = {"stage": stage}
+        if data.get("duration_seconds") is not None:
+            durations.append((labels, float(data["duration_seconds"])))
+        if data.get("rows") is not None:
+            rows.append((labels, int(data["rows"])))
+        success.append((labels, 1 if data.get("success") else 0))
+        if data.get("finished_at") is not None:
+            finished.append((labels, float(data["finished_at"])))
+
+    lines = []
+    lines += render_gauge("linxo_pipeline_stage_duration_seconds",
+                          "Durée de l'étape lors de la dernière exécution", durations)
+    lines += render_gauge("linxo_pipeline_stage_rows",
+                          "Lignes traitées par l'étape lors de la dernière exécution", rows)
+    lines += render_gauge("linxo_pipeline_stage_success",
+                          "1 si la dernière exécution de l'étape a réussi", success)
+    lines += render_gauge("linxo_pipeline_stage_last_run_timestamp_seconds",
+                          "Fin de la dernière exécution de l'étape (epoch)", finished)
+    return lines
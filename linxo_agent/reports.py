@@ -9,24 +9,49 @@ Module de génération de rapports HTML par famille de dépenses.
 
 from __future__ import annotations
 
+import gzip
 import hashlib
 import hmac
+import json
+import os
 import re
+import sys
+import tempfile
+import threading
 import time
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import date, datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
-try:
-    from jinja2 import Environment, FileSystemLoader, select_autoescape
+if TYPE_CHECKING:
     import pandas as pd
+
+try:
+    from jinja2 import Environment
+    import numpy as np
 except ImportError as exc:
     raise ImportError(
         "Les dépendances requises ne sont pas installées. "
-        "Installez jinja2 et pandas: pip install jinja2 pandas"
+        "Installez jinja2 et numpy: pip install jinja2 numpy"
     ) from exc
 
+try:
+    import brotli
+except ImportError:
+    brotli = None  # Variantes .br désactivées (pip install brotli)
+
+try:
+    from report_archive import read_archived_file
+    from storage_accounting import remove_file, replace_file
+    from template_registry import get_environment
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from report_archive import read_archived_file
+    from storage_accounting import remove_file, replace_file
+    from template_registry import get_environment
+
 
 @dataclass
 class FamilyReport:
@@ -48,6 +73,8 @@ class ReportIndex:
     families: List[Dict[str, Any]]
     grand_total: float
     total_transactions: int
+    changed_files: List[Path] = field(default_factory=list)
+    render_timings: Dict[str, float] = field(default_factory=dict)
 
 
 def slugify(text: str) -> str:
@@ -67,6 +94,100 @@ def slugify(text: str) -> str:
     return normalized
 
 
+# Règles de classification par famille, évaluées dans l'ordre de priorité.
+# Chaque règle: (famille, mots-clés catégorie, mots-clés libellé)
+FAMILLE_RULES: Tuple[Tuple[str, Tuple[str, ...], Tuple[str, ...]], ...] = (
+    ("Crédits & Emprunts",
+     ("PRET", "CREDIT", "SOFINCO"),
+     ("DIAC", "ONEY", "CONSUMER FINANCE", "ECHEANCE PRET")),
+    ("Épargne & Investissements",
+     ("EPARGNE", "BITCOIN", "CRYPTO"),
+     ("GENERALI VIE", "BITSTACK")),
+    ("Animaux de compagnie",
+     ("ANIMAUX", "VETERINAIRE"),
+     ("VETERI", "GAMM VERT")),
+    ("Énergie & Eau",
+     ("ELECTRICITE", "GAZ", "CHAUFFAGE", "EAU"),
+     ("ENGIE", "EDF", "SGC")),
+    ("Télécommunications",
+     ("INTERNET", "TELECOM"),
+     ("FREE", "BOUYGUES", "ORANGE", "SFR", "DISNEY")),
+    ("Impôts & Taxes",
+     ("IMPOT", "TAXE"),
+     ("DIRECTION GENERALE", "TRESOR PUBLIC")),
+    ("Beauté & Bien-être",
+     ("COIFFEUR", "ESTHETIQUE", "COSMETIQUE", "SOINS", "BEAUTE"),
+     ()),
+    ("Maison & Jardin",
+     ("TRAVAUX", "DECO", "JARDIN", "BRICOLAGE"),
+     ("LEROY MERLIN",)),
+    ("Services & Tech",
+     ("SERVICES",),
+     ("OVH", "SENDINB", "UBER", "PAYPAL")),
+    ("Parking & Péages",
+     ("PARKING", "PEAGE", "GARAGE"),
+     ("APRR", "LPA")),
+    ("Café & Snacks",
+     ("SNACKS", "REPAS AU TRAVAIL"),
+     ("MAXICOFFEE",)),
+    ("Culture & High-tech",
+     ("MUSIQUE", "LIVRES", "FILMS", "ELECTRONIQUE", "MULTIMEDIA"),
+     ("FNAC", "CDISCOUNT")),
+    ("Éducation & Enfants",
+     ("RESTAURATION SCOLAIRE", "CANTINE"),
+     ()),
+    ("Juridique & Syndical",
+     ("CONSEIL JURIDIQUE", "SYNDICAT"),
+     ("CFDT",)),
+    ("Frais bancaires",
+     ("INTERET", "FRAIS", "BANQUE", "AGIOS"),
+     ()),
+    ("Alimentation",
+     ("ALIMENTATION", "SUPERMARCHE"),
+     ()),
+    ("Restaurants & Cafés",
+     ("RESTAURANT", "CAFE"),
+     ()),
+    ("Transports",
+     ("TRANSPORT", "CARBURANT", "ESSENCE"),
+     ()),
+    ("Logement",
+     ("LOGEMENT", "LOYER"),
+     ()),
+    ("Santé",
+     ("SANTE", "PHARMACIE", "MEDECIN"),
+     ()),
+    ("Loisirs & Sports",
+     ("LOISIR", "SPORT", "CINEMA"),
+     ()),
+    ("Shopping & Mode",
+     ("SHOPPING", "VETEMENT", "HABILLEMENT"),
+     ()),
+    ("Abonnements",
+     ("ABONNEMENT",),
+     ("NETFLIX", "SPOTIFY")),
+    ("Assurances",
+     ("ASSURANCE",),
+     ()),
+)
+
+FAMILLE_DEFAUT = "Autres dépenses"
+
+
+def _compile_keywords(keywords: Tuple[str, ...]) -> Optional["re.Pattern[str]"]:
+    """Compile une liste de mots-clés en une alternance regex littérale."""
+    if not keywords:
+        return None
+    return re.compile("|".join(re.escape(k) for k in keywords))
+
+
+# Alternances précompilées pour le moteur vectorisé (même ordre que FAMILLE_RULES)
+_FAMILLE_PATTERNS = tuple(
+    (famille, _compile_keywords(cat_keywords), _compile_keywords(lib_keywords))
+    for famille, cat_keywords, lib_keywords in FAMILLE_RULES
+)
+
+
 def classify_famille(categorie: str, libelle: str) -> str:
     """
     Détermine la famille d'une dépense.
@@ -74,195 +195,67 @@ def classify_famille(categorie: str, libelle: str) -> str:
     categorie_upper = categorie.upper()
     libelle_upper = libelle.upper()
 
-    # Crédits & Emprunts
-    credit_keywords = ("PRET", "CREDIT", "SOFINCO")
-    credit_libelle = ("DIAC", "ONEY", "CONSUMER FINANCE", "ECHEANCE PRET")
-    if any(k in categorie_upper for k in credit_keywords) or any(
-        k in libelle_upper for k in credit_libelle
-    ):
-        return "Crédits & Emprunts"
-
-    # Épargne & Investissements
-    if (
-        "EPARGNE" in categorie_upper
-        or "GENERALI VIE" in libelle_upper
-        or "BITCOIN" in categorie_upper
-        or "BITSTACK" in libelle_upper
-        or "CRYPTO" in categorie_upper
-    ):
-        return "Épargne & Investissements"
-
-    # Animaux
-    if (
-        "ANIMAUX" in categorie_upper
-        or "VETERINAIRE" in categorie_upper
-        or "VETERI" in libelle_upper
-        or "GAMM VERT" in libelle_upper
-    ):
-        return "Animaux de compagnie"
-
-    # Énergie & Eau
-    energie_keywords = ("ELECTRICITE", "GAZ", "CHAUFFAGE", "EAU")
-    energie_libelle = ("ENGIE", "EDF", "SGC")
-    if any(k in categorie_upper for k in energie_keywords) or any(
-        k in libelle_upper for k in energie_libelle
-    ):
-        return "Énergie & Eau"
-
-    # Télécommunications
-    telecom_keywords = ("INTERNET", "TELECOM")
-    telecom_libelle = ("FREE", "BOUYGUES", "ORANGE", "SFR", "DISNEY")
-    if any(k in categorie_upper for k in telecom_keywords) or any(
-        k in libelle_upper for k in telecom_libelle
-    ):
-        return "Télécommunications"
-
-    # Impôts & Taxes
-    if (
-        "IMPOT" in categorie_upper
-        or "TAXE" in categorie_upper
-        or "DIRECTION GENERALE" in libelle_upper
-        or "TRESOR PUBLIC" in libelle_upper
-    ):
-        return "Impôts & Taxes"
-
-    # Beauté & Bien-être
-    if (
-        "COIFFEUR" in categorie_upper
-        or "ESTHETIQUE" in categorie_upper
-        or "COSMETIQUE" in categorie_upper
-        or "SOINS" in categorie_upper
-        or "BEAUTE" in categorie_upper
-    ):
-        return "Beauté & Bien-être"
-
-    # Travaux & Jardin
-    if (
-        "TRAVAUX" in categorie_upper
-        or "DECO" in categorie_upper
-        or "JARDIN" in categorie_upper
-        or "LEROY MERLIN" in libelle_upper
-        or "BRICOLAGE" in categorie_upper
-    ):
-        return "Maison & Jardin"
-
-    # Services & Tech
-    if (
-        "SERVICES" in categorie_upper
-        or "OVH" in libelle_upper
-        or "SENDINB" in libelle_upper
-        or "UBER" in libelle_upper
-        or "PAYPAL" in libelle_upper
-    ):
-        return "Services & Tech"
-
-    # Parking & Péages
-    if (
-        "PARKING" in categorie_upper
-        or "PEAGE" in categorie_upper
-        or "APRR" in libelle_upper
-        or "LPA" in libelle_upper
-        or "GARAGE" in categorie_upper
-    ):
-        return "Parking & Péages"
-
-    # Café & Snacks
-    if (
-        "SNACKS" in categorie_upper
-        or "REPAS AU TRAVAIL" in categorie_upper
-        or "MAXICOFFEE" in libelle_upper
-    ):
-        return "Café & Snacks"
-
-    # Culture & High-tech
-    culture_keywords = ("MUSIQUE", "LIVRES", "FILMS", "ELECTRONIQUE", "MULTIMEDIA")
-    culture_libelle = ("FNAC", "CDISCOUNT")
-    if any(k in categorie_upper for k in culture_keywords) or any(
-        k in libelle_upper for k in culture_libelle
-    ):
-        return "Culture & High-tech"
-
-    # Éducation & Enfants
-    if (
-        "RESTAURATION SCOLAIRE" in categorie_upper
-        or "CANTINE" in categorie_upper
-    ):
-        return "Éducation & Enfants"
-
-    # Juridique & Syndical
-    if (
-        "CONSEIL JURIDIQUE" in categorie_upper
-        or "CFDT" in libelle_upper
-        or "SYNDICAT" in categorie_upper
-    ):
-        return "Juridique & Syndical"
-
-    # Frais bancaires
-    if (
-        "INTERET" in categorie_upper
-        or "FRAIS" in categorie_upper
-        or "BANQUE" in categorie_upper
-        or "AGIOS" in categorie_upper
-    ):
-        return "Frais bancaires"
-
-    # Alimentation
-    if "ALIMENTATION" in categorie_upper or "SUPERMARCHE" in categorie_upper:
-        return "Alimentation"
-
-    # Restaurants & Cafés
-    if "RESTAURANT" in categorie_upper or "CAFE" in categorie_upper:
-        return "Restaurants & Cafés"
-
-    # Transports
-    if (
-        "TRANSPORT" in categorie_upper
-        or "CARBURANT" in categorie_upper
-        or "ESSENCE" in categorie_upper
-    ):
-        return "Transports"
-
-    # Logement (loyer)
-    if "LOGEMENT" in categorie_upper or "LOYER" in categorie_upper:
-        return "Logement"
-
-    # Santé
-    if (
-        "SANTE" in categorie_upper
-        or "PHARMACIE" in categorie_upper
-        or "MEDECIN" in categorie_upper
-    ):
-        return "Santé"
-
-    # Loisirs & Sports
-    if (
-        "LOISIR" in categorie_upper
-        or "SPORT" in categorie_upper
-        or "CINEMA" in categorie_upper
-    ):
-        return "Loisirs & Sports"
-
-    # Shopping & Mode
-    if (
-        "SHOPPING" in categorie_upper
-        or "VETEMENT" in categorie_upper
-        or "HABILLEMENT" in categorie_upper
-    ):
-        return "Shopping & Mode"
-
-    # Abonnements
-    if (
-        "ABONNEMENT" in categorie_upper
-        or "NETFLIX" in libelle_upper
-        or "SPOTIFY" in libelle_upper
-    ):
-        return "Abonnements"
-
-    # Assurances
-    if "ASSURANCE" in categorie_upper:
-        return "Assurances"
-
-    return "Autres dépenses"
+    for famille, cat_keywords, lib_keywords in FAMILLE_RULES:
+        if any(k in categorie_upper for k in cat_keywords) or any(
+            k in libelle_upper for k in lib_keywords
+        ):
+            return famille
+
+    return FAMILLE_DEFAUT
+
+
+def classify_famille_series(categories: "pd.Series", libelles: "pd.Series") -> "pd.Series":
+    """
+    Version vectorisée de classify_famille pour une colonne entière.
+
+    Les relevés répètent les mêmes marchands: seuls les couples
+    (catégorie, libellé) distincts sont classés. Chaque règle est évaluée
+    comme un masque booléen (str.contains sur l'alternance précompilée),
+    puis np.select retient la première règle vraie dans l'ordre de priorité.
+    Résultat identique à classify_famille.
+    """
+    import pandas as pd
+
+    categorie_upper = categories.fillna("").astype(str).str.upper()
+    libelle_upper = libelles.fillna("").astype(str).str.upper()
+
+    codes, uniques = pd.MultiIndex.from_arrays([categorie_upper, libelle_upper]).factorize()
+    unique_categories = pd.Series(uniques.get_level_values(0), dtype=object)
+    unique_libelles = pd.Series(uniques.get_level_values(1), dtype=object)
+
+    conditions = []
+    choices = []
+    for famille, cat_pattern, lib_pattern in _FAMILLE_PATTERNS:
+        mask = np.zeros(len(uniques), dtype=bool)
+        if cat_pattern is not None:
+            mask |= unique_categories.str.contains(cat_pattern, regex=True).to_numpy(dtype=bool)
+        if lib_pattern is not None:
+            mask |= unique_libelles.str.contains(lib_pattern, regex=True).to_numpy(dtype=bool)
+        conditions.append(mask)
+        choices.append(famille)
+
+    familles = np.select(conditions, choices, default=FAMILLE_DEFAUT).astype(object)
+    return pd.Series(familles[codes], index=categories.index, dtype=object)
+
+
+def classify_famille_batch(categories: Sequence[Any], libelles: Sequence[Any]) -> List[str]:
+    """
+    Classification d'une colonne sans pandas (transactions en dicts);
+    un DataFrame passe par classify_famille_series.
+
+    Les relevés répètent les mêmes marchands: chaque couple
+    (catégorie, libellé) distinct n'est classé qu'une fois.
+    Résultat identique à classify_famille.
+    """
+    cache: Dict[Tuple[str, str], str] = {}
+    familles = []
+    for categorie, libelle in zip(categories, libelles):
+        key = (_text(categorie), _text(libelle))
+        famille = cache.get(key)
+        if famille is None:
+            famille = cache[key] = classify_famille(*key)
+        familles.append(famille)
+    return familles
 
 
 def generate_token(url: str, signing_key: str, validity_hours: int = 24) -> str:
@@ -279,17 +272,619 @@ def generate_token(url: str, signing_key: str, validity_hours: int = 24) -> str:
     return f"{signature}:{expiry}"
 
 
+# Répertoire racine des rapports (un sous-répertoire par date)
+REPORTS_ROOT = Path(__file__).parent.parent / "data" / "reports"
+
+# Manifeste par date de rapport: synthèse (totaux, budget, prédiction) et pages
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 1
+
+# Nombre de threads de rendu par défaut (surchargeable via REPORTS_RENDER_WORKERS)
+DEFAULT_RENDER_WORKERS = 4
+
+# Variantes pré-compressées écrites à côté de chaque page HTML
+GZIP_SUFFIX = ".gz"
+BROTLI_SUFFIX = ".br"
+
+# Taille des blocs (caractères) transmis au disque lors du rendu en flux
+PAGE_STREAM_BUFFER = 64 * 1024
+
+# Permissions d'un nouveau fichier (mkstemp crée en 0600)
+DEFAULT_FILE_MODE = 0o644
+
+# Jetons HMAC (?t=signature:expiry) exclus des empreintes: ils changent à chaque exécution
+_TOKEN_RE = re.compile(r"\?t=[0-9a-f]+:(\d+)")
+
+# Page inchangée re-rendue quand ses jetons expirent dans moins de ce délai (secondes)
+TOKEN_RENEW_MARGIN = 12 * 3600
+
+
+def _file_mode(file_path: Path) -> int:
+    """Droits à donner au fichier temporaire: ceux du fichier remplacé, sinon 0644."""
+    try:
+        return file_path.stat().st_mode & 0o777
+    except OSError:
+        return DEFAULT_FILE_MODE
+
+
+def write_atomic(file_path: Path, content: str | bytes) -> None:
+    """
+    Écrit un fichier (texte UTF-8 ou binaire) de manière atomique
+    (fichier temporaire + rename).
+    """
+    fd, tmp_name = tempfile.mkstemp(
+        dir=str(file_path.parent), prefix=f".{file_path.name}.", suffix=".tmp"
+    )
+    try:
+        if isinstance(content, bytes):
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+        else:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(content)
+        os.chmod(tmp_name, _file_mode(file_path))
+        replace_file(tmp_name, file_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def _variant_path(file_path: Path, suffix: str) -> Path:
+    return file_path.with_name(file_path.name + suffix)
+
+
+def write_page_stream(file_path: Path, chunks: Iterable[str]) -> Tuple[str, int]:
+    """
+    Écrit une page HTML rendue par morceaux (template.generate()) et ses
+    variantes pré-compressées (.gz, .br) en une seule passe.
+
+    Les morceaux sont regroupés par blocs de PAGE_STREAM_BUFFER caractères,
+    puis chaque bloc est envoyé au fichier HTML, aux compresseurs et à
+    l'empreinte: la mémoire reste bornée quelle que soit la taille de la page.
+    Chaque fichier est écrit sous un nom temporaire et renommé une fois complet.
+
+    Returns:
+        Tuple[str, int]: (SHA-256 du HTML, taille en octets)
+    """
+    br_path = _variant_path(file_path, BROTLI_SUFFIX)
+    targets = [file_path, _variant_path(file_path, GZIP_SUFFIX)]
+    if brotli is not None:
+        targets.append(br_path)
+
+    temp_files = []
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        for target in targets:
+            fd, tmp_name = tempfile.mkstemp(
+                dir=str(target.parent), prefix=f".{target.name}.", suffix=".tmp"
+            )
+            temp_files.append((os.fdopen(fd, "wb"), tmp_name))
+
+        html_file = temp_files[0][0]
+        gz_file = gzip.GzipFile(
+            filename="", mode="wb", compresslevel=9, fileobj=temp_files[1][0], mtime=0
+        )
+        br_compressor = (
+            brotli.Compressor(mode=brotli.MODE_TEXT, quality=11) if brotli is not None else None
+        )
+
+        def flush(buffer: List[str]) -> None:
+            nonlocal size
+            data = "".join(buffer).encode("utf-8")
+            html_file.write(data)
+            gz_file.write(data)
+            if br_compressor is not None:
+                temp_files[2][0].write(br_compressor.process(data))
+            digest.update(data)
+            size += len(data)
+
+        buffer: List[str] = []
+        buffered = 0
+        for chunk in chunks:
+            buffer.append(chunk)
+            buffered += len(chunk)
+            if buffered >= PAGE_STREAM_BUFFER:
+                flush(buffer)
+                buffer, buffered = [], 0
+        flush(buffer)
+
+        gz_file.close()
+        if br_compressor is not None:
+            temp_files[2][0].write(br_compressor.finish())
+
+        for (temp_file, tmp_name), target in zip(temp_files, targets):
+            temp_file.close()
+            os.chmod(tmp_name, _file_mode(target))
+        for (_, tmp_name), target in zip(temp_files, targets):
+            replace_file(tmp_name, target)
+    except BaseException:
+        for temp_file, tmp_name in temp_files:
+            temp_file.close()
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+        raise
+
+    if brotli is None and br_path.exists():
+        # Variante obsolète: ne jamais servir un contenu différent de la page
+        remove_file(br_path)
+
+    return digest.hexdigest(), size
+
+
+def write_page(file_path: Path, html_content: str) -> None:
+    """
+    Écrit une page HTML et ses variantes pré-compressées (.gz, .br).
+
+    Le serveur de rapports sert directement ces variantes selon
+    Accept-Encoding, sans compresser à chaque requête.
+    """
+    write_page_stream(file_path, (html_content,))
+
+
+def _page_files_exist(file_path: Path) -> bool:
+    """Vérifie qu'une page et ses variantes compressées attendues existent."""
+    suffixes = ["", GZIP_SUFFIX] + ([BROTLI_SUFFIX] if brotli is not None else [])
+    return all(_variant_path(file_path, suffix).exists() for suffix in suffixes)
+
+
+def load_manifest(base_dir: Path) -> Dict[str, Any]:
+    """Charge le manifeste d'un répertoire de rapport (vide si absent ou illisible)."""
+    manifest_path = base_dir / MANIFEST_FILE
+    if not manifest_path.exists():
+        return {}
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def read_report_manifest(
+    report_date: date | str, reports_root: Optional[Path] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Lit le manifeste d'une date de rapport (répertoire, puis pack d'archive).
+
+    Returns:
+        Optional[Dict]: Manifeste, ou None si absent ou sans synthèse
+    """
+    if isinstance(report_date, date):
+        report_date = report_date.strftime("%Y-%m-%d")
+    root = reports_root or REPORTS_ROOT
+    manifest = load_manifest(root / report_date)
+    if not manifest:
+        archived = read_archived_file(root, report_date, MANIFEST_FILE)
+        if archived is not None:
+            try:
+                manifest = json.loads(archived.data.decode("utf-8"))
+            except ValueError:
+                manifest = {}
+    return manifest if isinstance(manifest, dict) and "report_date" in manifest else None
+
+
+def latest_report_manifest(reports_root: Optional[Path] = None) -> Optional[Dict[str, Any]]:
+    """Retourne le manifeste du rapport le plus récent, ou None."""
+    root = reports_root or REPORTS_ROOT
+    if not root.exists():
+        return None
+    report_dates = sorted(
+        (entry.name for entry in root.iterdir() if re.fullmatch(r"\d{4}-\d{2}-\d{2}", entry.name)),
+        reverse=True,
+    )
+    for report_date in report_dates:
+        manifest = read_report_manifest(report_date, root)
+        if manifest is not None:
+            return manifest
+    return None
+
+
+class IncrementalPageWriter:
+    """
+    Écrit les pages d'un rapport seulement si leur contexte de rendu a changé.
+
+    L'empreinte d'une page combine le nom du template, la version des templates
+    (mtime/taille des fichiers) et le contexte sérialisé. Les pages inchangées
+    depuis la dernière exécution ne sont ni rendues ni réécrites, sauf si les
+    liens signés qu'elles contiennent expirent dans moins de TOKEN_RENEW_MARGIN.
+
+    Utilisable depuis plusieurs threads de rendu en parallèle.
+    """
+
+    def __init__(self, base_dir: Path, env: Environment):
+        self.base_dir = base_dir
+        self.env = env
+        self.manifest = load_manifest(base_dir)
+        self.pages: Dict[str, Dict[str, Any]] = dict(self.manifest.get("pages", {}))
+        self.changed_files: List[Path] = []
+        self.unchanged_files: List[Path] = []
+        self.timings: Dict[str, float] = {}
+        self._seen: set = set()
+        self._lock = threading.Lock()
+        self._templates_version = self._compute_templates_version()
+
+    def _compute_templates_version(self) -> str:
+        """Empreinte des fichiers de templates (invalide tout si un template change)."""
+        digest = hashlib.sha256()
+        for search_path in getattr(self.env.loader, "searchpath", []):
+            for template_file in sorted(Path(search_path).glob("*.j2")):
+                stat = template_file.stat()
+                digest.update(f"{template_file.name}:{stat.st_mtime_ns}:{stat.st_size}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _serialize(self, context: Dict[str, Any]) -> str:
+        return json.dumps(context, sort_keys=True, default=str, ensure_ascii=False)
+
+    def context_hash(self, template_name: str, context: Dict[str, Any]) -> str:
+        """Calcule l'empreinte SHA-256 d'un contexte de rendu."""
+        return self._hash(template_name, self._serialize(context))
+
+    def _hash(self, template_name: str, serialized: str) -> str:
+        serialized = _TOKEN_RE.sub("", serialized)
+        digest = hashlib.sha256()
+        digest.update(template_name.encode("utf-8"))
+        digest.update(self._templates_version.encode("utf-8"))
+        digest.update(serialized.encode("utf-8"))
+        return digest.hexdigest()
+
+    @staticmethod
+    def _tokens_fresh(written: Optional[int], current: Optional[int]) -> bool:
+        """
+        Les liens signés de la page écrite restent-ils utilisables ?
+
+        Args:
+            written: Première expiration des jetons de la page écrite
+            current: Première expiration des jetons de ce rendu
+        """
+        if written is None or current is None:
+            # Page écrite sans jetons (ou avant leur suivi): à jour seulement sans jetons
+            return written is None and current is None
+        return written - time.time() > TOKEN_RENEW_MARGIN
+
+    def render(self, template_name: str, context: Dict[str, Any], file_path: Path) -> bool:
+        """
+        Rend et écrit une page si nécessaire.
+
+        Returns:
+            bool: True si la page a été (ré)écrite
+        """
+        start = time.perf_counter()
+        serialized = self._serialize(context)
+        page_hash = self._hash(template_name, serialized)
+        # Première expiration des jetons de la page (None: pas de lien signé)
+        expiries = [int(expiry) for expiry in _TOKEN_RE.findall(serialized)]
+        token_expiry = min(expiries) if expiries else None
+        with self._lock:
+            entry = self.pages.get(file_path.name)
+            self._seen.add(file_path.name)
+        if (
+            entry
+            and entry.get("context_hash") == page_hash
+            and entry.get("content_hash")
+            and self._tokens_fresh(entry.get("token_expiry"), token_expiry)
+            and _page_files_exist(file_path)
+        ):
+            with self._lock:
+                self.unchanged_files.append(file_path)
+                self.timings[file_path.name] = time.perf_counter() - start
+            return False
+
+        template = self.env.get_template(template_name)
+        content_hash, size = write_page_stream(file_path, template.generate(**context))
+        with self._lock:
+            self.pages[file_path.name] = {
+                "template": template_name,
+                "context_hash": page_hash,
+                "content_hash": content_hash,
+                "size": size,
+            }
+            if token_expiry is not None:
+                self.pages[file_path.name]["token_expiry"] = token_expiry
+            self.changed_files.append(file_path)
+            self.timings[file_path.name] = time.perf_counter() - start
+        return True
+
+    def save(self, summary: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Enregistre le manifeste (atomiquement).
+
+        Args:
+            summary: Synthèse du rapport (totaux, budget, prédiction) à inclure
+        """
+        if summary is not None:
+            self.manifest.update(summary)
+        # Pages non générées lors de cette exécution (famille disparue...) retirées
+        self.manifest["pages"] = {
+            name: entry for name, entry in sorted(self.pages.items()) if name in self._seen
+        }
+        write_atomic(
+            self.base_dir / MANIFEST_FILE,
+            json.dumps(self.manifest, indent=2, sort_keys=True, ensure_ascii=False),
+        )
+
+
+def resolve_render_workers(render_workers: Optional[int] = None) -> int:
+    """
+    Détermine le nombre de threads de rendu.
+
+    Priorité: argument explicite, puis REPORTS_RENDER_WORKERS, puis
+    min(DEFAULT_RENDER_WORKERS, nombre de CPU).
+    """
+    if render_workers is None:
+        try:
+            render_workers = int(os.getenv("REPORTS_RENDER_WORKERS", "0") or 0)
+        except ValueError:
+            render_workers = 0
+    if render_workers <= 0:
+        render_workers = min(DEFAULT_RENDER_WORKERS, os.cpu_count() or 1)
+    return render_workers
+
+
+def _is_missing(value: Any) -> bool:
+    """None, NaN ou NaT (seule valeur différente d'elle-même)."""
+    return value is None or value != value
+
+
+def _text(value: Any) -> str:
+    """Valeur texte d'une cellule, chaîne vide si manquante."""
+    return "" if _is_missing(value) else str(value)
+
+
+def _coerce_amounts(values: Sequence[Any]) -> np.ndarray:
+    """
+    Montants en float64; les valeurs non numériques ou manquantes valent 0.
+    """
+    try:
+        amounts = np.array(values, dtype=float)
+    except (TypeError, ValueError):
+        amounts = np.empty(len(values), dtype=float)
+        for i, value in enumerate(values):
+            try:
+                amounts[i] = float(value)
+            except (TypeError, ValueError):
+                amounts[i] = np.nan
+    amounts[np.isnan(amounts)] = 0.0
+    return amounts
+
+
+@dataclass
+class TransactionBatch:
+    """
+    Colonnes nécessaires au rapport journalier, sans dépendance à pandas.
+
+    Les listes sont alignées: la ligne i est décrite par montants[i],
+    libelles[i], categories[i] et dates[i].
+    """
+    montants: np.ndarray
+    libelles: List[Any]
+    categories: List[Any]
+    dates: List[str]
+    familles: Optional[List[Any]] = None
+
+    def __len__(self) -> int:
+        return len(self.libelles)
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> "TransactionBatch":
+        """
+        Construit le lot depuis des transactions (dicts de lire_csv_linxo ou
+        de l'analyse). La date affichée est date_str, à défaut date.
+        """
+        records = list(records)
+        return cls(
+            montants=_coerce_amounts([r.get("montant", 0.0) for r in records]),
+            libelles=[r.get("libelle", "") for r in records],
+            categories=[r.get("categorie", "Non classé") for r in records],
+            dates=[_text(r.get("date_str", r.get("date", ""))) for r in records],
+        )
+
+    @classmethod
+    def from_analysis(cls, analysis_result: Dict[str, Any]) -> "TransactionBatch":
+        """Lot des dépenses fixes puis variables d'un résultat d'analyse."""
+        return cls.from_records(
+            analysis_result.get("depenses_fixes", [])
+            + analysis_result.get("depenses_variables", [])
+        )
+
+    @classmethod
+    def from_dataframe(cls, df: "pd.DataFrame") -> "TransactionBatch":
+        """
+        Construit le lot depuis un DataFrame (colonnes montant, libelle,
+        categorie; date_str/date et famille optionnelles). Sans colonne
+        famille, les lignes sont classées par le moteur vectorisé.
+        Le DataFrame n'est pas modifié.
+        """
+        required = {"montant", "libelle", "categorie"}
+        missing = required - set(df.columns)
+        if missing:
+            raise ValueError(f"Colonnes manquantes dans le DataFrame: {', '.join(sorted(missing))}")
+
+        if "date_str" in df.columns:
+            dates = [_text(value) for value in df["date_str"].tolist()]
+        elif "date" in df.columns:
+            dates = [_text(value) for value in df["date"].tolist()]
+        else:
+            dates = [""] * len(df)
+
+        return cls(
+            montants=_coerce_amounts(df["montant"].tolist()),
+            libelles=df["libelle"].tolist(),
+            categories=df["categorie"].tolist(),
+            dates=dates,
+            familles=(
+                df["famille"].tolist() if "famille" in df.columns
+                else classify_famille_series(df["categorie"], df["libelle"]).tolist()
+            ),
+        )
+
+
+def _as_batch(transactions: Any) -> TransactionBatch:
+    """
+    Normalise l'entrée de build_daily_report.
+
+    pandas n'est jamais importé ici: un DataFrame ne peut exister que si
+    l'appelant l'a déjà chargé.
+    """
+    if isinstance(transactions, TransactionBatch):
+        return transactions
+    pandas = sys.modules.get("pandas")
+    if pandas is not None and isinstance(transactions, pandas.DataFrame):
+        return TransactionBatch.from_dataframe(transactions)
+    return TransactionBatch.from_records(transactions)
+
+
+def _parse_dates_column(values: Iterable[str]) -> np.ndarray:
+    """
+    Convertit une colonne de dates texte en clés de tri numériques.
+
+    Accepte 'dd/mm/YYYY' puis 'YYYY-MM-DD'; les dates invalides ou vides
+    reçoivent -inf (équivalent de datetime.min) pour être classées en dernier.
+    Chaque date distincte n'est analysée qu'une fois.
+    """
+    cache: Dict[str, float] = {}
+    keys = []
+    for value in values:
+        key = cache.get(value)
+        if key is None:
+            key = -np.inf
+            for fmt in ("%d/%m/%Y", "%Y-%m-%d"):
+                try:
+                    ordinal = datetime.strptime(value, fmt).toordinal()
+                except (TypeError, ValueError):
+                    continue
+                # 0001-01-01 vaut datetime.min: même rang que les dates invalides
+                if ordinal > 1:
+                    key = float(ordinal)
+                break
+            cache[value] = key
+        keys.append(key)
+    return np.array(keys, dtype=float)
+
+
+def _partition_by_famille(familles: Iterable[Any]) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    Partitionne les lignes par famille en une seule passe.
+
+    Returns:
+        (noms triés, positions des lignes regroupées par famille, bornes)
+        Les lignes de la famille i sont order[bounds[i]:bounds[i + 1]],
+        dans leur ordre d'origine (tri stable). Les familles manquantes
+        sont ignorées.
+    """
+    familles = list(familles)
+    names = sorted({f for f in familles if not _is_missing(f)})
+    code_of = {name: code for code, name in enumerate(names)}
+    codes = np.array([code_of.get(f, -1) for f in familles], dtype=np.int64)
+
+    order = np.argsort(codes, kind="stable")
+    order = order[codes[order] >= 0]
+    bounds = np.searchsorted(codes[order], np.arange(len(names) + 1))
+    return [str(name) for name in names], order, bounds
+
+
+def compute_budget_state(
+    r_date: date,
+    total_variables: float,
+    total_fixes: float,
+    budget_max: float,
+) -> Dict[str, Any]:
+    """
+    Calcule l'état budgétaire et la prédiction de fin de mois à une date.
+
+    Returns:
+        Dict: Valeurs utilisées par la page index et le manifeste
+    """
+    import calendar
+
+    jour_actuel = r_date.day
+    dernier_jour = calendar.monthrange(r_date.year, r_date.month)[1]
+    avancement_mois = (jour_actuel / dernier_jour) * 100
+
+    reste = budget_max - total_variables
+    pourcentage = (total_variables / budget_max * 100) if budget_max > 0 else 0
+
+    # Déterminer la couleur de la barre selon le statut
+    if reste < 0:
+        couleur_barre_variables = "#dc3545"  # Rouge - dépassement
+    elif pourcentage > avancement_mois + 10:
+        couleur_barre_variables = "#fd7e14"  # Orange - trop en avance
+    else:
+        couleur_barre_variables = "#28a745"  # Vert - dans les clous
+
+    # Calcul de la prédiction de fin de mois
+    jours_restants = dernier_jour - jour_actuel
+    if jour_actuel > 0:
+        depense_quotidienne_moyenne = total_variables / jour_actuel
+        prediction_fin_mois = total_variables + (depense_quotidienne_moyenne * jours_restants)
+        prediction_depassement = prediction_fin_mois - budget_max
+        prediction_pourcentage = (prediction_fin_mois / budget_max * 100) if budget_max > 0 else 0
+
+        # Couleur de la prédiction
+        couleur_prediction = "#28a745"  # Vert = OK
+        if prediction_depassement > 0:
+            couleur_prediction = "#dc3545"  # Rouge = dépassement
+        elif prediction_pourcentage > 90:
+            couleur_prediction = "#fd7e14"  # Orange = attention
+
+        # Message de prédiction
+        if prediction_depassement > 0:
+            message_prediction = f"⚠️ Vous risquez de dépasser de {abs(prediction_depassement):.2f} €"
+        elif prediction_pourcentage > 90:
+            message_prediction = f"⚡ Attention, vous serez à {prediction_pourcentage:.0f}% du budget"
+        else:
+            message_prediction = f"✅ Vous devriez rester sous budget ({prediction_pourcentage:.0f}%)"
+    else:
+        prediction_fin_mois = 0
+        prediction_depassement = 0
+        prediction_pourcentage = 0
+        couleur_prediction = "#6c757d"
+        message_prediction = "⏳ Prédiction disponible après le 1er jour"
+
+    return {
+        "budget_max": budget_max,
+        "total_variables": total_variables,
+        "total_fixes": total_fixes,
+        "reste": reste,
+        "pourcentage": pourcentage,
+        "couleur_barre_variables": couleur_barre_variables,
+        "avancement_mois": avancement_mois,
+        "jour_actuel": jour_actuel,
+        "dernier_jour": dernier_jour,
+        "prediction_fin_mois": prediction_fin_mois,
+        "prediction_depassement": prediction_depassement,
+        "prediction_pourcentage": prediction_pourcentage,
+        "couleur_prediction": couleur_prediction,
+        "message_prediction": message_prediction,
+        "jours_restants": jours_restants,
+    }
+
+
 def build_daily_report(
-    df: "pd.DataFrame",
+    df: "TransactionBatch | Iterable[Dict[str, Any]] | pd.DataFrame",
     report_date: Optional[date | str] = None,
     base_url: Optional[str] = None,
     signing_key: Optional[str] = None,
     budget_max: Optional[float] = None,
     conseil_llm: Optional[str] = None,
     analysis_result: Optional[Dict[str, Any]] = None,
+    render_workers: Optional[int] = None,
 ) -> ReportIndex:
     """
     Construit un rapport journalier HTML avec pages par famille.
+
+    `df` est un TransactionBatch, une liste de transactions (dicts) ou un
+    DataFrame (nom historique du paramètre); seul ce dernier cas fait
+    intervenir pandas.
+
+    Les pages (familles, index, frais fixes, dépenses variables) sont rendues
+    en parallèle sur un pool de `render_workers` threads (voir
+    resolve_render_workers); 1 force un rendu séquentiel.
     """
     if not base_url:
         raise ValueError(
@@ -297,14 +892,8 @@ def build_daily_report(
             "Définissez cette variable dans votre fichier .env."
         )
 
-    # Colonnes requises
-    required = {"montant", "libelle", "categorie"}
-    missing = required - set(df.columns)
-    if missing:
-        raise ValueError(f"Colonnes manquantes dans le DataFrame: {', '.join(sorted(missing))}")
-
-    # Coercition numérique du montant
-    df["montant"] = pd.to_numeric(df["montant"], errors="coerce").fillna(0.0)
+    # Colonnes requises, montants numériques
+    batch = _as_batch(df)
 
     # Normaliser report_date
     if report_date is None:
@@ -317,30 +906,39 @@ def build_daily_report(
     report_date_str = r_date.strftime("%Y-%m-%d")
 
     # Répertoire de sortie
-    project_root = Path(__file__).parent.parent
-    base_dir = project_root / "data" / "reports" / report_date_str
+    base_dir = REPORTS_ROOT / report_date_str
     base_dir.mkdir(parents=True, exist_ok=True)
 
     # Classifier si absent
-    if "famille" not in df.columns:
-        df["famille"] = df.apply(
-            lambda row: classify_famille(
-                row.get("categorie", ""),
-                row.get("libelle", ""),
-            ),
-            axis=1,
-        )
+    familles = batch.familles
+    if familles is None:
+        familles = classify_famille_batch(batch.categories, batch.libelles)
 
     families_data: List[Dict[str, Any]] = []
     family_reports: List[FamilyReport] = []
 
-    # Grouper par famille
-    for famille_name, groupe in df.groupby("famille"):
-        famille_label = str(famille_name)
-        total_famille = float(groupe["montant"].apply(lambda x: abs(x) if x < 0 else 0.0).sum())
-        count = int(len(groupe))
+    # Colonnes préparées une seule fois pour toutes les familles
+    montants = batch.montants
+    depenses = np.where(montants < 0, -montants, 0.0)
+    date_keys = _parse_dates_column(batch.dates)
+    dates_list = batch.dates
+    libelles_list = batch.libelles
+    categories_list = batch.categories
+    depenses_list = depenses.tolist()
+
+    # Grouper par famille (une seule partition)
+    famille_names, order, bounds = _partition_by_famille(familles)
+    family_rows: Dict[str, np.ndarray] = {}
+
+    for i, famille_label in enumerate(famille_names):
+        rows = order[bounds[i]:bounds[i + 1]]
+        total_famille = float(depenses[rows].sum())
+        count = int(len(rows))
         slug = slugify(famille_label)
 
+        # Lignes triées par date décroissante (stable: ordre d'origine à date égale)
+        family_rows[famille_label] = rows[np.argsort(-date_keys[rows], kind="stable")]
+
         # Fichier et URL
         file_name = f"family-{slug}.html"
         file_path = base_dir / file_name
@@ -370,56 +968,32 @@ def build_daily_report(
 
     # Totaux globaux
     grand_total = float(sum(f["total"] for f in families_data))
-    total_transactions = int(len(df))
-
-    # Jinja2
-    templates_dir = project_root / "templates" / "reports"
-    env = Environment(
-        loader=FileSystemLoader(templates_dir),
-        autoescape=select_autoescape(["html", "xml"]),
-    )
+    total_transactions = len(batch)
 
-    # Générer les pages famille
-    family_template = env.get_template("family.html.j2")
+    # Jinja2 (environnement partagé, templates compilés en cache)
+    env = get_environment("reports")
 
-    # Fonction utilitaire pour parser les dates
-    def _parse_date(s: str) -> datetime:
-        if not s:
-            return datetime.min
-        for fmt in ("%d/%m/%Y", "%Y-%m-%d"):
-            try:
-                return datetime.strptime(s, fmt)
-            except (ValueError, TypeError):
-                continue
-        return datetime.min
-
-    for family_report in family_reports:
-        groupe = df[df["famille"] == family_report.name].copy()
-
-        # Préparer transactions (normaliser date en str)
-        transactions: List[Dict[str, Any]] = []
-        for _, row in groupe.iterrows():
-            montant = float(row["montant"])
-            dval = row.get("date_str", row.get("date", ""))
-            dval = "" if pd.isna(dval) else str(dval)
-            transactions.append(
-                {
-                    "date": dval,
-                    "libelle": row.get("libelle", ""),
-                    "montant": abs(montant) if montant < 0 else 0.0,
-                    "categorie": row.get("categorie", "Non classé"),
-                }
-            )
+    # Écriture incrémentale: seules les pages dont le contexte a changé sont réécrites
+    writer = IncrementalPageWriter(base_dir, env)
 
-        # Tri par date décroissante (accepte 'dd/mm/YYYY' puis 'YYYY-MM-DD')
-        transactions.sort(key=lambda x: _parse_date(x["date"]), reverse=True)
+    # URL index
+    index_relative_url = f"/{report_date_str}/index.html"
+    index_url = f"{base_url.rstrip('/')}{index_relative_url}"
+    if signing_key:
+        token_idx = generate_token(index_relative_url, signing_key)
+        index_url = f"{index_url}?t={token_idx}"
 
-        # URL index
-        index_relative_url = f"/{report_date_str}/index.html"
-        index_url = f"{base_url.rstrip('/')}{index_relative_url}"
-        if signing_key:
-            token_idx = generate_token(index_relative_url, signing_key)
-            index_url = f"{index_url}?t={token_idx}"
+    def render_family_page(family_report: FamilyReport) -> FamilyReport:
+        # Transactions déjà triées par date décroissante
+        transactions: List[Dict[str, Any]] = [
+            {
+                "date": dates_list[pos],
+                "libelle": libelles_list[pos],
+                "montant": depenses_list[pos],
+                "categorie": categories_list[pos],
+            }
+            for pos in family_rows[family_report.name]
+        ]
 
         # Contexte de rendu pour la page famille (sans calculs budgétaires)
         render_context = {
@@ -435,17 +1009,10 @@ def build_daily_report(
         if conseil_llm:
             render_context["conseil_llm"] = conseil_llm
 
-        html_content = family_template.render(**render_context)
-        family_report.file_path.write_text(html_content, encoding="utf-8")
+        writer.render("family.html.j2", render_context, family_report.file_path)
+        return family_report
 
     # Générer la page index
-    index_template = env.get_template("index.html.j2")
-    index_relative_url = f"/{report_date_str}/index.html"
-    index_url = f"{base_url.rstrip('/')}{index_relative_url}"
-    if signing_key:
-        token = generate_token(index_relative_url, signing_key)
-        index_url = f"{index_url}?t={token}"
-
     # Préparer les données budgétaires pour l'index
     index_context = {
         "report_date": report_date_str,
@@ -489,102 +1056,47 @@ def build_daily_report(
         index_context['famille_alerts'] = [alert['message'] for alert in famille_alerts]
 
     # Ajouter les données budgétaires si disponibles
+    budget_state: Optional[Dict[str, Any]] = None
     if analysis_result and budget_max:
-        import calendar
-        jour_actuel = r_date.day
-        dernier_jour = calendar.monthrange(r_date.year, r_date.month)[1]
-        avancement_mois = (jour_actuel / dernier_jour) * 100
-
-        total_variables = analysis_result.get("total_variables", 0)
-        total_fixes = analysis_result.get("total_fixes", 0)
-        reste = budget_max - total_variables
-        pourcentage = (total_variables / budget_max * 100) if budget_max > 0 else 0
-
-        # Déterminer la couleur de la barre selon le statut
-        if reste < 0:
-            couleur_barre_variables = "#dc3545"  # Rouge - dépassement
-        elif pourcentage > avancement_mois + 10:
-            couleur_barre_variables = "#fd7e14"  # Orange - trop en avance
-        else:
-            couleur_barre_variables = "#28a745"  # Vert - dans les clous
-
-        # Calcul de la prédiction de fin de mois
-        jours_restants = dernier_jour - jour_actuel
-        if jour_actuel > 0:
-            depense_quotidienne_moyenne = total_variables / jour_actuel
-            prediction_fin_mois = total_variables + (depense_quotidienne_moyenne * jours_restants)
-            prediction_depassement = prediction_fin_mois - budget_max
-            prediction_pourcentage = (prediction_fin_mois / budget_max * 100) if budget_max > 0 else 0
-
-            # Couleur de la prédiction
-            couleur_prediction = "#28a745"  # Vert = OK
-            if prediction_depassement > 0:
-                couleur_prediction = "#dc3545"  # Rouge = dépassement
-            elif prediction_pourcentage > 90:
-                couleur_prediction = "#fd7e14"  # Orange = attention
-
-            # Message de prédiction
-            if prediction_depassement > 0:
-                message_prediction = f"⚠️ Vous risquez de dépasser de {abs(prediction_depassement):.2f} €"
-            elif prediction_pourcentage > 90:
-                message_prediction = f"⚡ Attention, vous serez à {prediction_pourcentage:.0f}% du budget"
-            else:
-                message_prediction = f"✅ Vous devriez rester sous budget ({prediction_pourcentage:.0f}%)"
-        else:
-            prediction_fin_mois = 0
-            prediction_depassement = 0
-            prediction_pourcentage = 0
-            couleur_prediction = "#6c757d"
-            message_prediction = "⏳ Prédiction disponible après le 1er jour"
-
-        index_context.update({
-            "budget_max": budget_max,
-            "total_variables": total_variables,
-            "total_fixes": total_fixes,
-            "reste": reste,
-            "pourcentage": pourcentage,
-            "couleur_barre_variables": couleur_barre_variables,
-            "avancement_mois": avancement_mois,
-            "jour_actuel": jour_actuel,
-            "dernier_jour": dernier_jour,
-            "prediction_fin_mois": prediction_fin_mois,
-            "prediction_depassement": prediction_depassement,
-            "prediction_pourcentage": prediction_pourcentage,
-            "couleur_prediction": couleur_prediction,
-            "message_prediction": message_prediction,
-            "jours_restants": jours_restants,
-        })
+        budget_state = compute_budget_state(
+            r_date,
+            total_variables=analysis_result.get("total_variables", 0),
+            total_fixes=analysis_result.get("total_fixes", 0),
+            budget_max=budget_max,
+        )
+        index_context.update(budget_state)
 
     # Ajouter le conseil LLM si disponible
     if conseil_llm:
         index_context["conseil_llm"] = conseil_llm
 
-    index_html = index_template.render(**index_context)
-    (base_dir / "index.html").write_text(index_html, encoding="utf-8")
+    # Rendu des pages: aucune donnée mutable partagée une fois les familles partitionnées
+    workers = resolve_render_workers(render_workers)
+    render_start = time.perf_counter()
 
-    # Générer les pages dédiées aux frais fixes et dépenses variables
-    frais_fixes_url = None
-    depenses_variables_url = None
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="report-render") as pool:
+        family_futures = [pool.submit(render_family_page, fr) for fr in family_reports]
+        index_future = pool.submit(
+            writer.render, "index.html.j2", index_context, base_dir / "index.html"
+        )
 
-    if analysis_result:
-        # Page frais fixes
-        try:
-            frais_fixes_url = build_frais_fixes_page(
+        # Pages dédiées aux frais fixes et dépenses variables
+        frais_fixes_future = None
+        depenses_variables_future = None
+        if analysis_result:
+            frais_fixes_future = pool.submit(
+                build_frais_fixes_page,
                 base_dir=base_dir,
                 report_date_str=report_date_str,
                 base_url=base_url,
                 signing_key=signing_key,
                 analysis_result=analysis_result,
                 env=env,
+                writer=writer,
             )
-            print(f"[OK] Page frais fixes générée: {frais_fixes_url}")
-        except Exception as e:
-            print(f"[WARN] Erreur génération page frais fixes: {e}")
-
-        # Page dépenses variables
-        if budget_max:
-            try:
-                depenses_variables_url = build_depenses_variables_page(
+            if budget_max:
+                depenses_variables_future = pool.submit(
+                    build_depenses_variables_page,
                     base_dir=base_dir,
                     report_date_str=report_date_str,
                     base_url=base_url,
@@ -592,11 +1104,39 @@ def build_daily_report(
                     analysis_result=analysis_result,
                     env=env,
                     budget_max=budget_max,
+                    writer=writer,
                 )
+
+        # Résultats collectés dans l'ordre de soumission (tri par total conservé)
+        family_reports = [future.result() for future in family_futures]
+        index_future.result()
+
+        if frais_fixes_future is not None:
+            try:
+                frais_fixes_url = frais_fixes_future.result()
+                print(f"[OK] Page frais fixes générée: {frais_fixes_url}")
+            except Exception as e:
+                print(f"[WARN] Erreur génération page frais fixes: {e}")
+
+        if depenses_variables_future is not None:
+            try:
+                depenses_variables_url = depenses_variables_future.result()
                 print(f"[OK] Page dépenses variables générée: {depenses_variables_url}")
             except Exception as e:
                 print(f"[WARN] Erreur génération page dépenses variables: {e}")
 
+    render_duration = time.perf_counter() - render_start
+
+    writer.save(_manifest_summary(
+        report_date_str, family_reports, grand_total, total_transactions,
+        analysis_result, budget_state,
+    ))
+    print(
+        f"[INFO] Pages réécrites: {len(writer.changed_files)}, "
+        f"inchangées: {len(writer.unchanged_files)} "
+        f"({render_duration:.2f}s, {workers} threads)"
+    )
+
     return ReportIndex(
         report_date=report_date_str,
         base_dir=base_dir,
@@ -604,9 +1144,83 @@ def build_daily_report(
         families=families_data,
         grand_total=grand_total,
         total_transactions=total_transactions,
+        changed_files=sorted(writer.changed_files),
+        render_timings=dict(sorted(writer.timings.items())),
     )
 
 
+def _manifest_summary(
+    report_date_str: str,
+    family_reports: List[FamilyReport],
+    grand_total: float,
+    total_transactions: int,
+    analysis_result: Optional[Dict[str, Any]],
+    budget_state: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    Synthèse lisible par machine d'un rapport (écrite dans manifest.json).
+
+    Les URLs signées (à expiration) ne sont pas stockées: seuls les noms
+    de fichiers le sont.
+    """
+    totals = None
+    if analysis_result:
+        totals = {
+            "fixes": float(analysis_result.get("total_fixes", 0) or 0),
+            "variables": float(analysis_result.get("total_variables", 0) or 0),
+        }
+
+    budget = None
+    prediction = None
+    if budget_state:
+        budget = {
+            key: budget_state[key]
+            for key in ("budget_max", "reste", "pourcentage", "avancement_mois",
+                        "jour_actuel", "dernier_jour", "jours_restants")
+        }
+        prediction = {
+            "fin_mois": budget_state["prediction_fin_mois"],
+            "depassement": budget_state["prediction_depassement"],
+            "pourcentage": budget_state["prediction_pourcentage"],
+            "message": budget_state["message_prediction"],
+        }
+
+    return {
+        "version": MANIFEST_VERSION,
+        "report_date": report_date_str,
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "grand_total": grand_total,
+        "total_transactions": total_transactions,
+        "families": [
+            {
+                "name": fr.name,
+                "slug": fr.slug,
+                "total": fr.total,
+                "count": fr.count,
+                "file": fr.file_path.name,
+            }
+            for fr in family_reports
+        ],
+        "totals": totals,
+        "budget": budget,
+        "prediction": prediction,
+    }
+
+
+def _render_page(
+    env: Environment,
+    writer: Optional[IncrementalPageWriter],
+    template_name: str,
+    context: Dict[str, Any],
+    file_path: Path,
+) -> None:
+    """Rend une page via le writer incrémental, ou directement à défaut."""
+    if writer is not None:
+        writer.render(template_name, context, file_path)
+    else:
+        write_page_stream(file_path, env.get_template(template_name).generate(**context))
+
+
 def build_frais_fixes_page(
     base_dir: Path,
     report_date_str: str,
@@ -614,13 +1228,18 @@ def build_frais_fixes_page(
     signing_key: Optional[str],
     analysis_result: Dict[str, Any],
     env: Environment,
+    writer: Optional[IncrementalPageWriter] = None,
 ) -> Optional[str]:
     """
     Génère la page dédiée aux frais fixes.
     Retourne l'URL de la page générée.
+
+    Les transactions sont rattachées aux frais de référence par l'identifiant
+    'depense_fixe_id' posé par analyser_transactions (O(T + F)): la page
+    reprend exactement les correspondances de l'analyse.
     """
     from config import get_config
-    import calendar
+    from analyzer import reference_id
 
     config = get_config()
     depenses_fixes_ref = config.depenses_data.get('depenses_fixes', [])
@@ -636,32 +1255,35 @@ def build_frais_fixes_page(
     en_attente = []
     non_appliques = []
 
-    # Créer un ensemble des identifiants prélevés
-    identifiants_preleves = set()
+    # Index des frais de référence par identifiant de correspondance
+    refs_by_id = {
+        reference_id(frais_ref, depenses_fixes_ref): frais_ref
+        for frais_ref in depenses_fixes_ref
+    }
+
+    # Transactions prélevées (rattachées par l'analyse)
+    ids_preleves = set()
     for trans in depenses_fixes_transactions:
-        # Chercher la correspondance dans la config
-        for frais_ref in depenses_fixes_ref:
-            identifiant = frais_ref.get('identifiant', frais_ref.get('libelle', ''))
-            if identifiant.upper() in trans.get('libelle', '').upper():
-                identifiants_preleves.add(identifiant)
-                preleves.append({
-                    'date': trans.get('date_str', trans.get('date', '')),
-                    'libelle': trans.get('libelle', ''),
-                    'compte': trans.get('compte', ''),
-                    'montant': abs(trans.get('montant', 0.0)),
-                    'commentaire_config': frais_ref.get('commentaire', '')
-                })
-                break
+        ref_id = trans.get('depense_fixe_id')
+        frais_ref = refs_by_id.get(ref_id) if ref_id else None
+        if frais_ref is not None:
+            ids_preleves.add(ref_id)
+        preleves.append({
+            'date': trans.get('date_str', trans.get('date', '')),
+            'libelle': trans.get('libelle', ''),
+            'compte': trans.get('compte', ''),
+            'montant': abs(trans.get('montant', 0.0)),
+            'commentaire_config': frais_ref.get('commentaire', '') if frais_ref else ''
+        })
 
     # Analyser les frais de référence
-    for frais in depenses_fixes_ref:
-        identifiant = frais.get('identifiant', frais.get('libelle', ''))
+    for ref_id, frais in refs_by_id.items():
         mois_occurrence = frais.get('mois_occurrence', list(range(1, 13)))
 
         # Vérifier si applicable ce mois
         if mois_actuel in mois_occurrence:
             # Vérifier si déjà prélevé
-            if identifiant not in identifiants_preleves:
+            if ref_id not in ids_preleves:
                 en_attente.append(frais)
         else:
             non_appliques.append(frais)
@@ -697,7 +1319,6 @@ def build_frais_fixes_page(
         index_url = f"{index_url}?t={token_idx}"
 
     # Générer la page
-    template = env.get_template("frais-fixes.html.j2")
     context = {
         "report_date": report_date_str,
         "index_url": index_url,
@@ -712,9 +1333,7 @@ def build_frais_fixes_page(
         "nb_total": nb_total,
     }
 
-    html_content = template.render(**context)
-    file_path = base_dir / "frais-fixes.html"
-    file_path.write_text(html_content, encoding="utf-8")
+    _render_page(env, writer, "frais-fixes.html.j2", context, base_dir / "frais-fixes.html")
 
     # Retourner l'URL
     relative_url = f"/{report_date_str}/frais-fixes.html"
@@ -734,6 +1353,7 @@ def build_depenses_variables_page(
     analysis_result: Dict[str, Any],
     env: Environment,
     budget_max: float,
+    writer: Optional[IncrementalPageWriter] = None,
 ) -> Optional[str]:
     """
     Génère la page dédiée aux dépenses variables avec filtrage par catégorie.
@@ -798,7 +1418,6 @@ def build_depenses_variables_page(
         index_url = f"{index_url}?t={token_idx}"
 
     # Générer la page
-    template = env.get_template("depenses-variables.html.j2")
     context = {
         "report_date": report_date_str,
         "index_url": index_url,
@@ -815,9 +1434,9 @@ def build_depenses_variables_page(
         "nb_transactions": len(transactions),
     }
 
-    html_content = template.render(**context)
-    file_path = base_dir / "depenses-variables.html"
-    file_path.write_text(html_content, encoding="utf-8")
+    _render_page(
+        env, writer, "depenses-variables.html.j2", context, base_dir / "depenses-variables.html"
+    )
 
     # Retourner l'URL
     relative_url = f"/{report_date_str}/depenses-variables.html"
@@ -831,4 +1450,4 @@ def build_depenses_variables_page(
 
 if __name__ == "__main__":
     print("Module de génération de rapports HTML par famille")
-    print("Utilisez build_daily_report(df, base_url=...) pour générer un rapport.")
+    print("Utilisez build_daily_report(transactions, base_url=...) pour générer un rapport.")
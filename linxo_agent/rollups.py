@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Synthèses mensuelles et annuelles construites à partir des manifestes journaliers.
+
+- data/reports/rollups/<YYYY-MM>.html : situation du mois + évolution jour par jour
+- data/reports/rollups/<YYYY>.html    : mois par mois et familles cumulées
+- data/reports/rollups/index.html     : liste des synthèses
+
+Chaque rapport journalier est une photo du mois en cours: la synthèse d'un
+mois reprend le dernier jour disponible, l'année cumule les mois.
+
+La mise à jour est incrémentale: seul le jour modifié est replié dans l'état
+de son mois (data/rollups_state/), puis le mois dans l'état de son année. Le
+coût ne dépend pas de la taille de l'archive. L'état reste hors de
+data/reports, servi en HTTP et synchronisé vers le serveur distant.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import shutil
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    from report_archive import archived_dates
+    from reports import MANIFEST_FILE, REPORTS_ROOT, read_report_manifest, write_atomic, write_page_stream
+    from template_registry import get_environment
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from report_archive import archived_dates
+    from reports import MANIFEST_FILE, REPORTS_ROOT, read_report_manifest, write_atomic, write_page_stream
+    from template_registry import get_environment
+
+ROLLUPS_DIR_NAME = "rollups"
+ROLLUPS_STATE_DIR = Path(__file__).parent.parent / "data" / "rollups_state"
+# Ancien emplacement de l'état, dans l'arborescence des rapports
+LEGACY_STATE_DIR_NAME = "state"
+
+MOIS_FR = [
+    "Janvier", "Février", "Mars", "Avril", "Mai", "Juin",
+    "Juillet", "Août", "Septembre", "Octobre", "Novembre", "Décembre",
+]
+
+# Champs du manifeste journalier repris dans l'état des synthèses
+_DAY_FIELDS = ("grand_total", "total_transactions", "totals", "budget", "prediction")
+
+
+def month_label(month_key: str) -> str:
+    """'2025-01' -> 'Janvier 2025'"""
+    year, month = month_key.split("-")
+    return f"{MOIS_FR[int(month) - 1]} {year}"
+
+
+def _rollups_dir(reports_root: Path) -> Path:
+    return reports_root / ROLLUPS_DIR_NAME
+
+
+def _state_path(kind: str, key: str) -> Path:
+    return ROLLUPS_STATE_DIR / f"{kind}-{key}.json"
+
+
+def _migrate_legacy_state(reports_root: Path) -> None:
+    """Sort l'état de data/reports/rollups/state/ (publié avec les rapports)."""
+    legacy_dir = _rollups_dir(reports_root) / LEGACY_STATE_DIR_NAME
+    if not legacy_dir.is_dir():
+        return
+    if ROLLUPS_STATE_DIR.exists():
+        shutil.rmtree(legacy_dir, ignore_errors=True)
+    else:
+        ROLLUPS_STATE_DIR.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(legacy_dir), str(ROLLUPS_STATE_DIR))
+
+
+def _read_json(path: Path) -> Dict[str, Any]:
+    if not path.exists():
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _save_state(path: Path, state: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_atomic(path, json.dumps(state, indent=2, sort_keys=True, ensure_ascii=False))
+
+
+def _day_entry(manifest: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Contribution d'un rapport journalier à la synthèse de son mois.
+
+    La signature ignore la date de génération et les pages: un rapport
+    régénéré à l'identique n'invalide pas les synthèses.
+    """
+    entry = {field: manifest.get(field) for field in _DAY_FIELDS}
+    entry["families"] = [
+        {"name": f["name"], "total": f["total"], "count": f["count"]}
+        for f in manifest.get("families", [])
+    ]
+    serialized = json.dumps(entry, sort_keys=True, ensure_ascii=False, default=str)
+    entry["signature"] = hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+    return entry
+
+
+def _month_summary(month_key: str, days: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Synthèse d'un mois: situation au dernier jour disponible."""
+    last_day = max(days)
+    latest = days[last_day]
+    summary = {field: latest.get(field) for field in _DAY_FIELDS}
+    summary.update({
+        "month": month_key,
+        "label": month_label(month_key),
+        "last_day": last_day,
+        "days_count": len(days),
+        "families": latest.get("families", []),
+    })
+    return summary
+
+
+def _year_context(year: str, months: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Contexte de la page annuelle (cumul des synthèses mensuelles)."""
+    ordered = [months[key] for key in sorted(months)]
+
+    families: Dict[str, Dict[str, Any]] = defaultdict(lambda: {"total": 0.0, "count": 0})
+    for month in ordered:
+        for family in month.get("families", []):
+            families[family["name"]]["total"] += family["total"]
+            families[family["name"]]["count"] += family["count"]
+
+    return {
+        "year": year,
+        "months": ordered,
+        "grand_total": sum(m.get("grand_total") or 0 for m in ordered),
+        "total_transactions": sum(m.get("total_transactions") or 0 for m in ordered),
+        "total_fixes": sum((m.get("totals") or {}).get("fixes", 0) for m in ordered),
+        "total_variables": sum((m.get("totals") or {}).get("variables", 0) for m in ordered),
+        "families": sorted(
+            ({"name": name, **data} for name, data in families.items()),
+            key=lambda f: f["total"],
+            reverse=True,
+        ),
+    }
+
+
+def _render(template_name: str, context: Dict[str, Any], file_path: Path) -> None:
+    template = get_environment("reports").get_template(template_name)
+    write_page_stream(file_path, template.generate(**context))
+
+
+def _render_index(reports_root: Path) -> Path:
+    """Page listant les synthèses (une entrée par état d'année)."""
+    rollups_dir = _rollups_dir(reports_root)
+    years = []
+    for state_path in sorted(ROLLUPS_STATE_DIR.glob("year-*.json"), reverse=True):
+        state = _read_json(state_path)
+        months = state.get("months", {})
+        years.append({
+            "year": state_path.stem[len("year-"):],
+            "months": [months[key] for key in sorted(months, reverse=True)],
+        })
+
+    index_path = rollups_dir / "index.html"
+    _render("rollup-index.html.j2", {"years": years}, index_path)
+    return index_path
+
+
+def update_rollups(
+    report_dates: Iterable[str],
+    reports_root: Optional[Path] = None,
+) -> List[Path]:
+    """
+    Replie des rapports journaliers dans les synthèses mensuelles et annuelles.
+
+    Args:
+        report_dates: Dates (YYYY-MM-DD) dont le manifeste a changé
+        reports_root: Racine des rapports (défaut: data/reports)
+
+    Returns:
+        List[Path]: Pages de synthèse réécrites
+    """
+    root = reports_root or REPORTS_ROOT
+    rollups_dir = _rollups_dir(root)
+    rollups_dir.mkdir(parents=True, exist_ok=True)
+    _migrate_legacy_state(root)
+
+    # Mois touchés -> état mis à jour
+    touched_months: Dict[str, Dict[str, Any]] = {}
+    for report_date in sorted(set(report_dates)):
+        manifest = read_report_manifest(report_date, root)
+        if manifest is None:
+            continue
+
+        month_key = report_date[:7]
+        if month_key not in touched_months:
+            touched_months[month_key] = _read_json(_state_path("month", month_key))
+        state = touched_months[month_key]
+        days = state.setdefault("days", {})
+
+        entry = _day_entry(manifest)
+        if days.get(report_date, {}).get("signature") == entry["signature"]:
+            continue
+        days[report_date] = entry
+        state["changed"] = True
+
+    changed_pages: List[Path] = []
+    touched_years: Dict[str, Dict[str, Any]] = {}
+    for month_key, state in sorted(touched_months.items()):
+        month_page = rollups_dir / f"{month_key}.html"
+        if not state.pop("changed", False) and month_page.exists():
+            continue
+
+        summary = _month_summary(month_key, state["days"])
+        state["summary"] = summary
+        _save_state(_state_path("month", month_key), state)
+        _render(
+            "rollup-month.html.j2",
+            {
+                "month_label": summary["label"],
+                "year": month_key[:4],
+                "summary": summary,
+                "days": [{"date": day, **state["days"][day]} for day in sorted(state["days"])],
+            },
+            month_page,
+        )
+        changed_pages.append(month_page)
+
+        year = month_key[:4]
+        if year not in touched_years:
+            touched_years[year] = _read_json(_state_path("year", year))
+        touched_years[year].setdefault("months", {})[month_key] = summary
+
+    for year, state in sorted(touched_years.items()):
+        _save_state(_state_path("year", year), state)
+        year_page = rollups_dir / f"{year}.html"
+        _render("rollup-year.html.j2", _year_context(year, state["months"]), year_page)
+        changed_pages.append(year_page)
+
+    if touched_years:
+        changed_pages.append(_render_index(root))
+
+    return changed_pages
+
+
+def rebuild_rollups(reports_root: Optional[Path] = None) -> List[Path]:
+    """Reconstruit toutes les synthèses à partir des manifestes existants (y compris archivés)."""
+    root = reports_root or REPORTS_ROOT
+    if not root.exists():
+        return []
+    report_dates = [
+        entry.name for entry in root.iterdir()
+        if re.fullmatch(r"\d{4}-\d{2}-\d{2}", entry.name) and (entry / MANIFEST_FILE).exists()
+    ]
+    return update_rollups(report_dates + archived_dates(root), root)
+
+
+if __name__ == "__main__":
+    pages = rebuild_rollups()
+    print(f"[OK] {len(pages)} pages de synthese generees dans {REPORTS_ROOT / ROLLUPS_DIR_NAME}")
@@ -7,9 +7,9 @@ Utilise le système d'analyse moderne avec génération de rapports HTML par fam
 
 import sys
 import os
+import time
 from pathlib import Path
 from datetime import datetime, timedelta
-import pandas as pd
 
 # Add the linxo_agent directory to path
 linxo_agent_dir = Path(__file__).parent
@@ -20,6 +20,8 @@ from analyzer import analyser_csv, lire_csv_linxo
 from notifications import NotificationManager
 from config import get_config
 from reports import build_daily_report
+from pipeline_metrics import track_stage
+from storage_accounting import storage_ledger
 
 
 def should_send_notification(frequency='weekly', notification_file='.last_whatsapp_notification'):
@@ -209,7 +211,6 @@ Action immédiate requise pour rétablir le service.
         print(f"Utilisation du dernier CSV: {csv_file}")
 
         # Vérifier l'âge du fichier et envoyer une alerte si trop ancien
-        import time
         file_age_seconds = time.time() - Path(csv_file).stat().st_mtime
         file_age_days = file_age_seconds / 86400
 
@@ -256,7 +257,7 @@ Action requise pour rétablir le téléchargement automatique.
     print("=" * 80)
 
     try:
-        analysis_result = analyser_csv(csv_file)
+        analysis_result = analyser_csv(csv_file, record_metrics=True)
 
         if not analysis_result:
             print("ERREUR: Echec de l'analyse")
@@ -339,23 +340,9 @@ Une intervention technique est nécessaire pour corriger ce problème.
 
     report_index = None
     try:
-        # Lire le CSV avec la fonction qui ajoute la colonne 'famille'
+        # Transactions du CSV, passées telles quelles (sans DataFrame)
         transactions, exclus = lire_csv_linxo(csv_file)
 
-        # Convertir en DataFrame pour build_daily_report
-        df_data = []
-        for t in transactions:
-            df_data.append({
-                'date': t.get('date_str', ''),
-                'date_str': t.get('date_str', ''),
-                'libelle': t.get('libelle', ''),
-                'montant': t.get('montant', 0.0),
-                'categorie': t.get('categorie', 'Non classe'),
-                'compte': t.get('compte', ''),
-            })
-
-        df = pd.DataFrame(df_data)
-
         # Récupérer les variables d'environnement pour les rapports
         base_url = os.getenv('REPORTS_BASE_URL') or "https://linxo.appliprz.ovh/reports"
         signing_key = os.getenv('REPORTS_SIGNING_KEY')
@@ -372,21 +359,46 @@ Une intervention technique est nécessaire pour corriger ce problème.
 
         # Générer les rapports HTML
         report_date = datetime.now().strftime('%Y-%m-%d')
-        report_index = build_daily_report(
-            df=df,
-            report_date=report_date,
-            base_url=base_url,
-            signing_key=signing_key,
-            budget_max=analysis_result['budget_max'],
-            conseil_llm=conseil_llm,
-            analysis_result=analysis_result
-        )
+        # Variations de taille des pages écrites: une seule mise à jour du compteur disque
+        with track_stage("report") as stage, storage_ledger.batch():
+            report_index = build_daily_report(
+                transactions,
+                report_date=report_date,
+                base_url=base_url,
+                signing_key=signing_key,
+                budget_max=analysis_result['budget_max'],
+                conseil_llm=conseil_llm,
+                analysis_result=analysis_result
+            )
+            stage["rows"] = report_index.total_transactions
 
         print(f"\nRapports HTML generes!")
         print(f"  Repertoire: {report_index.base_dir}")
         print(f"  Familles: {len(report_index.families)}")
         print(f"  Total depenses: {report_index.grand_total:.2f}E")
         print(f"  URL index: {base_url}/{report_date}/index.html")
+        print(f"  Pages modifiees: {len(report_index.changed_files)}")
+
+        # Synthèses mensuelles/annuelles: seul le jour du rapport est replié
+        rollup_pages = []
+        try:
+            from rollups import update_rollups
+            with storage_ledger.batch():
+                rollup_pages = update_rollups([report_index.report_date])
+            print(f"  Syntheses mises a jour: {len(rollup_pages)}")
+        except Exception as rollup_error:
+            print(f"[WARN] Erreur lors de la mise a jour des syntheses: {rollup_error}")
+
+        # Archivage des anciens rapports en packs mensuels (si configuré)
+        archived = {}
+        archive_days = os.getenv('REPORTS_ARCHIVE_DAYS')
+        if archive_days:
+            try:
+                from report_archive import archive_reports
+                archived = archive_reports(int(archive_days))
+                print(f"  Rapports archives: {sum(len(dates) for dates in archived.values())}")
+            except Exception as archive_error:
+                print(f"[WARN] Erreur lors de l'archivage des rapports: {archive_error}")
 
         # Upload vers le VPS
         print("\n" + "=" * 80)
@@ -394,13 +406,32 @@ Une intervention technique est nécessaire pour corriger ce problème.
         print("=" * 80)
 
         try:
-            from upload_reports import upload_reports_to_vps, upload_static_files
+            from upload_reports import (
+                mark_reports_synced, mark_reports_unsynced, reports_unsynced,
+                upload_reports_to_vps, upload_static_files,
+            )
+
+            # Pages du jour, synthèses et packs d'archive modifiés: à synchroniser.
+            # Le marqueur reste posé tant qu'un upload n'a pas réussi (réessai au
+            # prochain lancement, même sans nouvelle modification)
+            changes = (
+                len(report_index.changed_files) + len(rollup_pages)
+                + sum(len(dates) for dates in archived.values())
+            )
+            if changes:
+                mark_reports_unsynced()
 
             # Upload des rapports HTML
             data_reports = Path(__file__).parent.parent / "data" / "reports"
-            if data_reports.exists():
-                success = upload_reports_to_vps(data_reports)
+            if not reports_unsynced():
+                print("\n[SKIP] Aucune page modifiee, synchronisation des rapports inutile")
+            elif data_reports.exists():
+                with track_stage("upload") as stage:
+                    success = upload_reports_to_vps(data_reports)
+                    stage["rows"] = changes
+                    stage["success"] = success
                 if success:
+                    mark_reports_synced()
                     print("\n[OK] Rapports synchronises avec le VPS!")
                 else:
                     print("\n[WARN] Echec de la synchronisation des rapports")
@@ -426,11 +457,14 @@ Une intervention technique est nécessaire pour corriger ce problème.
     print("=" * 80)
 
     try:
-        notification_manager = NotificationManager()
-        notif_results = notification_manager.send_budget_notification(
-            analysis_result,
-            report_index=report_index
-        )
+        with track_stage("notify") as stage:
+            notification_manager = NotificationManager()
+            notif_results = notification_manager.send_budget_notification(
+                analysis_result,
+                report_index=report_index
+            )
+            stage["rows"] = sum(1 for sent in notif_results.values() if sent is True)
+            stage["success"] = any(sent is True for sent in notif_results.values())
 
         # Verifier les resultats
         sms_ok = notif_results.get('sms', False)
@@ -8,6 +8,7 @@ les transactions bancaires en différentes catégories, avec apprentissage conti
 
 import json
 import pickle
+import threading
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 from datetime import datetime
@@ -367,3 +368,46 @@ def create_classifier(config_dir: Path = None) -> SmartClassifier:
         config_dir = Path(__file__).parent.parent / "data" / "ml"
 
     return SmartClassifier(config_dir)
+
+
+_shared_classifiers: Dict[Path, Tuple[tuple, SmartClassifier]] = {}
+_shared_lock = threading.Lock()
+
+
+def _data_signature(data_dir: Path) -> tuple:
+    """(mtime, taille) des fichiers du classificateur: change à chaque sauvegarde."""
+    signature = []
+    for name in ("training_data.json", "classifier_model.pkl", "user_corrections.json"):
+        try:
+            stat_result = (data_dir / name).stat()
+            signature.append((stat_result.st_mtime_ns, stat_result.st_size))
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+
+def get_shared_classifier(config_dir: Path = None) -> SmartClassifier:
+    """
+    Classificateur partagé, rechargé seulement si ses fichiers ont changé.
+
+    Évite de relire le modèle à chaque analyse dans les processus longs
+    (serveur admin, processus d'analyse préchargé).
+
+    Args:
+        config_dir: Répertoire de configuration (défaut: ./data/ml)
+
+    Returns:
+        Instance de SmartClassifier
+    """
+    if config_dir is None:
+        config_dir = Path(__file__).parent.parent / "data" / "ml"
+    config_dir = Path(config_dir)
+
+    with _shared_lock:
+        cached = _shared_classifiers.get(config_dir)
+        if cached is not None and cached[0] == _data_signature(config_dir):
+            return cached[1]
+        classifier = create_classifier(config_dir)
+        # Signature prise après le chargement (un entraînement réécrit le modèle)
+        _shared_classifiers[config_dir] = (_data_signature(config_dir), classifier)
+        return classifier
@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Comptabilité de l'espace disque par répertoire suivi.
+
+Taille et nombre de fichiers de logs/, data/reports et des profils Chrome
+temporaires (.chrome_user_data_*) sans parcourir les répertoires à chaque
+consultation:
+
+- data/storage/storage.db (SQLite, mode WAL) garde une ligne par
+  répertoire, partagée par le pipeline et les processus du serveur admin
+- les écritures du pipeline (rapports, packs d'archive, profils Chrome
+  supprimés) passent par replace_file / remove_file / remove_tree, qui
+  reportent leur variation de taille dans le compteur du répertoire
+- un rapprochement périodique (thread de faible priorité, ou
+  "python linxo_agent/storage_accounting.py --reconcile") reparcourt les
+  répertoires et corrige les écarts (logs écrits par le shell, fichiers
+  écrits par Chrome, modifications manuelles)
+- budget optionnel par répertoire: STORAGE_BUDGET_<NOM>_MB
+  (ex. STORAGE_BUDGET_LOGS_MB=500)
+
+Tant qu'un répertoire n'a jamais été parcouru, ses variations sont
+ignorées: le premier rapprochement fixe la valeur de départ.
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import os
+import shutil
+import sqlite3
+import stat
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+BASE_DIR = Path(__file__).parent.parent
+
+STORAGE_DB_FILE = Path(
+    os.getenv("STORAGE_DB_FILE", str(BASE_DIR / "data" / "storage" / "storage.db"))
+)
+STORAGE_RECONCILE_INTERVAL = float(os.getenv("STORAGE_RECONCILE_INTERVAL", "3600"))
+
+# Nom -> (racine, motif des sous-répertoires comptés; None: toute la racine)
+TRACKED_DIRECTORIES: Dict[str, Tuple[Path, Optional[str]]] = {
+    "logs": (BASE_DIR / "logs", None),
+    "reports": (BASE_DIR / "data" / "reports", None),
+    "chrome_user_data": (BASE_DIR, ".chrome_user_data_*"),
+}
+
+
+def _budget_from_env(name: str) -> Optional[int]:
+    value = os.getenv(f"STORAGE_BUDGET_{name.upper()}_MB")
+    if not value:
+        return None
+    try:
+        return int(float(value) * 1024 * 1024)
+    except ValueError:
+        print(f"[WARN] Budget disque invalide pour {name}: {value}")
+        return None
+
+
+def scan_directory(root: Path, pattern: Optional[str] = None) -> Tuple[int, int]:
+    """
+    Parcourt un répertoire (sans suivre les liens symboliques)
+
+    Args:
+        root: Racine du parcours
+        pattern: Motif des sous-répertoires de `root` comptés (tous si None)
+
+    Returns:
+        Tuple[int, int]: (octets, nombre de fichiers)
+    """
+    total = files = 0
+    if pattern is None:
+        pending = [str(root)]
+    else:
+        try:
+            with os.scandir(root) as entries:
+                pending = [
+                    entry.path for entry in entries
+                    if fnmatch.fnmatch(entry.name, pattern) and entry.is_dir(follow_symlinks=False)
+                ]
+        except OSError:
+            pending = []
+
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            total += entry.stat(follow_symlinks=False).st_size
+                            files += 1
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return total, files
+
+
+class StorageLedger:
+    """Compteurs d'octets et de fichiers par répertoire suivi"""
+
+    def __init__(
+        self,
+        db_path: Path = STORAGE_DB_FILE,
+        directories: Optional[Dict[str, Tuple[Path, Optional[str]]]] = None,
+        budgets: Optional[Dict[str, Optional[int]]] = None,
+    ):
+        """
+        Args:
+            db_path: Base SQLite (créée au premier accès)
+            directories: Répertoires suivis (défaut: TRACKED_DIRECTORIES)
+            budgets: Budget en octets par nom (défaut: STORAGE_BUDGET_<NOM>_MB)
+        """
+        self.db_path = db_path
+        self.directories = dict(directories if directories is not None else TRACKED_DIRECTORIES)
+        self.budgets = (
+            budgets if budgets is not None
+            else {name: _budget_from_env(name) for name in self.directories}
+        )
+        self._roots = [
+            (name, os.path.abspath(root), pattern)
+            for name, (root, pattern) in self.directories.items()
+        ]
+        self._schema_lock = threading.Lock()
+        self._ready = False
+        # Variations accumulées pendant un lot (batch)
+        self._pending: Dict[str, List[int]] = {}
+        self._batch_depth = 0
+        self._pending_lock = threading.Lock()
+        self._reconciler: Optional[threading.Thread] = None
+        self._reconciler_stop = threading.Event()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _ensure_tables(self) -> None:
+        with self._schema_lock:
+            if not self._ready:
+                self._create_tables()
+                self._ready = True
+
+    def _create_tables(self) -> None:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS storage_dirs (
+                    name TEXT PRIMARY KEY,
+                    path TEXT NOT NULL,
+                    bytes INTEGER NOT NULL,
+                    files INTEGER NOT NULL,
+                    reconciled_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        self._ensure_tables()
+        conn = self._connect()
+        try:
+            # Compteurs reconstructibles: pas de fsync à chaque écriture
+            conn.execute("PRAGMA synchronous=NORMAL")
+            yield conn
+        finally:
+            conn.close()
+
+    # ------------------------------------------------------------------ #
+    # Variations                                                         #
+    # ------------------------------------------------------------------ #
+
+    def directory_for(self, path: Path) -> Optional[str]:
+        """Nom du répertoire suivi qui contient `path` (None si aucun)"""
+        path = os.path.abspath(path)
+        best = None
+        for name, root, pattern in self._roots:
+            if not path.startswith(root + os.sep):
+                continue
+            if pattern is not None:
+                first = path[len(root) + 1:].split(os.sep, 1)[0]
+                if not fnmatch.fnmatch(first, pattern):
+                    continue
+            if best is None or len(root) > len(best[1]):
+                best = (name, root)
+        return best[0] if best is not None else None
+
+    def record(self, path: Path, bytes_delta: int, files_delta: int = 0) -> None:
+        """
+        Reporte la variation de taille d'un fichier ou d'un sous-répertoire
+
+        Ne lève jamais d'exception: la comptabilité ne doit pas faire
+        échouer une écriture.
+
+        Args:
+            path: Fichier ou répertoire modifié
+            bytes_delta: Variation en octets
+            files_delta: Variation du nombre de fichiers
+        """
+        name = self.directory_for(path)
+        if name is None or (bytes_delta == 0 and files_delta == 0):
+            return
+        with self._pending_lock:
+            counters = self._pending.setdefault(name, [0, 0])
+            counters[0] += bytes_delta
+            counters[1] += files_delta
+            if self._batch_depth:
+                return
+        self.flush()
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Regroupe les variations du bloc en une seule transaction (tous threads)"""
+        with self._pending_lock:
+            self._batch_depth += 1
+        try:
+            yield
+        finally:
+            with self._pending_lock:
+                self._batch_depth -= 1
+            self.flush()
+
+    def flush(self) -> None:
+        """Enregistre les variations en attente (hors lot)"""
+        with self._pending_lock:
+            if self._batch_depth or not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+        try:
+            with self._connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                now = time.time()
+                for name, (bytes_delta, files_delta) in pending.items():
+                    # Répertoire jamais parcouru: valeur fixée au premier rapprochement
+                    conn.execute(
+                        """
+                        UPDATE storage_dirs
+                        SET bytes = MAX(0, bytes + ?), files = MAX(0, files + ?), updated_at = ?
+                        WHERE name = ?
+                        """,
+                        (bytes_delta, files_delta, now, name)
+                    )
+                conn.execute("COMMIT")
+        except (sqlite3.Error, OSError) as e:
+            print(f"[WARN] Comptabilite disque non mise a jour: {e}")
+
+    # ------------------------------------------------------------------ #
+    # Rapprochement                                                      #
+    # ------------------------------------------------------------------ #
+
+    def reconcile(self, names: Optional[List[str]] = None,
+                  max_age: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Reparcourt les répertoires et remplace leurs compteurs
+
+        Les variations enregistrées pendant le parcours peuvent être
+        comptées deux fois ou pas du tout: l'écart est corrigé au
+        rapprochement suivant.
+
+        Args:
+            names: Répertoires à parcourir (tous si None)
+            max_age: Ne parcourir que ceux rapprochés il y a plus de
+                `max_age` secondes (les autres processus du serveur font
+                le même rapprochement)
+
+        Returns:
+            Dict[str, dict]: Utilisation des répertoires parcourus
+        """
+        names = list(self.directories) if names is None else names
+        if max_age is not None:
+            known = self._rows()
+            names = [
+                name for name in names
+                if name not in known or time.time() - known[name]["reconciled_at"] >= max_age
+            ]
+
+        for name in names:
+            root, pattern = self.directories[name]
+            total, files = scan_directory(root, pattern)
+            now = time.time()
+            with self._connection() as conn:
+                conn.execute(
+                    """
+                    INSERT INTO storage_dirs (name, path, bytes, files, reconciled_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(name) DO UPDATE SET
+                        path = excluded.path, bytes = excluded.bytes, files = excluded.files,
+                        reconciled_at = excluded.reconciled_at, updated_at = excluded.updated_at
+                    """,
+                    (name, str(root), total, files, now, now)
+                )
+        if not names:
+            return {}
+        usage = self.usage()
+        return {name: usage[name] for name in names}
+
+    def start_reconciler(self, interval: float = STORAGE_RECONCILE_INTERVAL) -> None:
+        """Démarre le rapprochement périodique (thread de faible priorité)"""
+        if self._reconciler is not None and self._reconciler.is_alive():
+            return
+        self._reconciler_stop.clear()
+        self._reconciler = threading.Thread(
+            target=self._reconcile_loop, args=(interval,), name="storage-reconcile", daemon=True
+        )
+        self._reconciler.start()
+
+    def stop_reconciler(self, timeout: float = 5) -> None:
+        self._reconciler_stop.set()
+        if self._reconciler is not None:
+            self._reconciler.join(timeout)
+        self._reconciler = None
+
+    def _reconcile_loop(self, interval: float) -> None:
+        try:
+            # Linux: la priorité d'un thread se règle par son identifiant système
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+        except (AttributeError, OSError):
+            pass
+        while True:
+            try:
+                self.reconcile(max_age=interval / 2)
+            except (sqlite3.Error, OSError) as e:
+                print(f"[WARN] Rapprochement de l'espace disque en echec: {e}")
+            if self._reconciler_stop.wait(interval):
+                return
+
+    # ------------------------------------------------------------------ #
+    # Lecture                                                            #
+    # ------------------------------------------------------------------ #
+
+    def _rows(self) -> Dict[str, sqlite3.Row]:
+        with self._connection() as conn:
+            rows = conn.execute("SELECT * FROM storage_dirs").fetchall()
+        return {row["name"]: row for row in rows}
+
+    def usage(self, name: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Utilisation des répertoires suivis (lecture des compteurs)
+
+        Un répertoire jamais parcouru l'est immédiatement.
+
+        Args:
+            name: Un seul répertoire (tous si None)
+
+        Returns:
+            Dict[str, dict]: Nom -> {path, bytes, files, size_mb, budget_mb,
+            over_budget, reconciled_at, updated_at}
+        """
+        names = list(self.directories) if name is None else [name]
+        rows = self._rows()
+        missing = [n for n in names if n not in rows]
+        if missing:
+            self.reconcile(missing)
+            rows = self._rows()
+
+        usage = {}
+        for n in names:
+            row = rows[n]
+            budget = self.budgets.get(n)
+            usage[n] = {
+                "path": row["path"],
+                "bytes": row["bytes"],
+                "files": row["files"],
+                "size_mb": round(row["bytes"] / (1024 * 1024), 2),
+                "budget_mb": round(budget / (1024 * 1024), 2) if budget is not None else None,
+                "over_budget": budget is not None and row["bytes"] > budget,
+                "reconciled_at": datetime.fromtimestamp(row["reconciled_at"]).isoformat(),
+                "updated_at": datetime.fromtimestamp(row["updated_at"]).isoformat(),
+            }
+        return usage
+
+    def over_budget(self) -> List[str]:
+        """Répertoires dont la taille dépasse leur budget"""
+        return [name for name, entry in self.usage().items() if entry["over_budget"]]
+
+
+# Instance globale
+storage_ledger = StorageLedger()
+
+
+# ---------------------------------------------------------------------- #
+# Opérations sur les fichiers suivies                                    #
+# ---------------------------------------------------------------------- #
+
+def _file_size(path: Path) -> Optional[int]:
+    try:
+        st = os.stat(path, follow_symlinks=False)
+    except OSError:
+        return None
+    return st.st_size if stat.S_ISREG(st.st_mode) else None
+
+
+def replace_file(tmp_name: str, target: Path) -> None:
+    """os.replace(tmp_name, target) en comptant la variation de taille"""
+    new_size = _file_size(Path(tmp_name)) or 0
+    old_size = _file_size(target)
+    os.replace(tmp_name, target)
+    storage_ledger.record(target, new_size - (old_size or 0), 0 if old_size is not None else 1)
+
+
+def remove_file(path: Path) -> None:
+    """Supprime un fichier en comptant l'espace libéré"""
+    size = _file_size(path)
+    path.unlink()
+    if size is not None:
+        storage_ledger.record(path, -size, -1)
+
+
+def remove_tree(path: Path, ignore_errors: bool = False) -> None:
+    """shutil.rmtree en comptant l'espace libéré (parcours du seul sous-arbre)"""
+    if storage_ledger.directory_for(path) is None:
+        shutil.rmtree(path, ignore_errors=ignore_errors)
+        return
+    total, files = scan_directory(Path(path))
+    shutil.rmtree(path, ignore_errors=ignore_errors)
+    if ignore_errors and os.path.exists(path):
+        # Suppression partielle: le reste est recompté
+        remaining, remaining_files = scan_directory(Path(path))
+        total, files = total - remaining, files - remaining_files
+    storage_ledger.record(path, -total, -files)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Espace disque des répertoires suivis")
+    parser.add_argument("--reconcile", action="store_true", help="Reparcourir les répertoires")
+    args = parser.parse_args()
+
+    if args.reconcile:
+        storage_ledger.reconcile()
+    for name, entry in storage_ledger.usage().items():
+        budget = f" / budget {entry['budget_mb']} Mo" if entry["budget_mb"] is not None else ""
+        flag = " [DEPASSE]" if entry["over_budget"] else ""
+        print(f"{name:18} {entry['size_mb']:>10} Mo {entry['files']:>8} fichiers{budget}{flag}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
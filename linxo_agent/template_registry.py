@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Registre partagé des environnements Jinja2 (rapports HTML et emails).
+
+- Un seul Environment par famille de templates, créé à la demande
+- Cache de bytecode sur disque (data/cache/jinja) partagé entre les exécutions
+- Rechargement automatique si un template change (contrôle du mtime)
+- Précompilation possible à l'installation: python linxo_agent/template_registry.py
+"""
+
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Dict, List
+
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    Template,
+    select_autoescape,
+)
+
+PROJECT_ROOT = Path(__file__).parent.parent
+TEMPLATES_ROOT = PROJECT_ROOT / "templates"
+JINJA_CACHE_DIR = PROJECT_ROOT / "data" / "cache" / "jinja"
+
+# Familles de templates connues -> sous-répertoire de templates/
+TEMPLATE_GROUPS: Dict[str, str] = {
+    "reports": "reports",
+    "email": "email",
+}
+
+_environments: Dict[str, Environment] = {}
+_lock = threading.Lock()
+
+
+def _create_bytecode_cache() -> FileSystemBytecodeCache | None:
+    """Crée le cache de bytecode, ou None si le répertoire est inaccessible."""
+    try:
+        JINJA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        print(f"[WARN] Cache Jinja indisponible ({JINJA_CACHE_DIR}): {e}")
+        return None
+    return FileSystemBytecodeCache(str(JINJA_CACHE_DIR), "linxo_%s.cache")
+
+
+def get_environment(group: str = "reports") -> Environment:
+    """
+    Retourne l'environnement Jinja2 partagé pour une famille de templates.
+
+    Args:
+        group: Famille de templates ('reports' ou 'email')
+
+    Returns:
+        Environment: Environnement configuré (autoescape, cache, auto-reload)
+    """
+    env = _environments.get(group)
+    if env is not None:
+        return env
+
+    if group not in TEMPLATE_GROUPS:
+        raise ValueError(f"Famille de templates inconnue: {group}")
+
+    with _lock:
+        env = _environments.get(group)
+        if env is None:
+            env = Environment(
+                loader=FileSystemLoader(TEMPLATES_ROOT / TEMPLATE_GROUPS[group]),
+                autoescape=select_autoescape(["html", "xml"]),
+                bytecode_cache=_create_bytecode_cache(),
+                auto_reload=True,
+            )
+            _environments[group] = env
+    return env
+
+
+def get_template(name: str, group: str = "reports") -> Template:
+    """Raccourci: charge un template depuis l'environnement partagé."""
+    return get_environment(group).get_template(name)
+
+
+def precompile_templates() -> List[str]:
+    """
+    Compile tous les templates connus et remplit le cache de bytecode.
+
+    Returns:
+        List[str]: Templates compilés (format 'famille/nom')
+    """
+    compiled: List[str] = []
+    for group in TEMPLATE_GROUPS:
+        env = get_environment(group)
+        for name in env.list_templates(filter_func=lambda n: n.endswith(".j2")):
+            env.get_template(name)
+            compiled.append(f"{group}/{name}")
+    return compiled
+
+
+if __name__ == "__main__":
+    templates = precompile_templates()
+    print(f"[OK] {len(templates)} templates precompiles dans {JINJA_CACHE_DIR}")
+    for template_name in templates:
+        print(f"  - {template_name}")
@@ -9,6 +9,29 @@ import subprocess
 from pathlib import Path
 from typing import Optional
 
+# Marqueur "rapports à synchroniser" (hors du répertoire synchronisé): posé à
+# chaque modification des rapports, retiré seulement après un upload réussi
+SYNC_PENDING_FILE = Path(__file__).parent.parent / "data" / "reports.unsynced"
+
+
+def mark_reports_unsynced(marker: Path = SYNC_PENDING_FILE) -> None:
+    """Note que des rapports ont changé depuis le dernier upload réussi."""
+    marker.parent.mkdir(parents=True, exist_ok=True)
+    marker.touch()
+
+
+def mark_reports_synced(marker: Path = SYNC_PENDING_FILE) -> None:
+    """Retire le marqueur après un upload réussi."""
+    try:
+        marker.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def reports_unsynced(marker: Path = SYNC_PENDING_FILE) -> bool:
+    """True si des rapports modifiés n'ont pas encore été envoyés au VPS."""
+    return marker.exists()
+
 
 def upload_reports_to_vps(
     report_dir: Path,
@@ -188,7 +211,8 @@ if __name__ == "__main__":
 
     if data_reports.exists():
         print("Test d'upload des rapports...")
-        upload_reports_to_vps(data_reports)
+        if upload_reports_to_vps(data_reports):
+            mark_reports_synced()
 
     if static_dir.exists():
         print("\nTest d'upload des fichiers statiques...")
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Processus d'analyse préchargé (côté enfant)
+
+Lancé une fois par le serveur admin (voir report_server/admin/warm_worker.py):
+- charge au démarrage le script principal (linxo_agent.py), l'analyseur,
+  le classificateur ML et les templates de rapports
+- lit ensuite des travaux sur stdin, un objet JSON par ligne:
+  {"args": [...], "env": {...}}
+- exécute main() du script principal avec ces arguments, comme
+  "python linxo_agent.py <args>", sans redémarrer d'interpréteur
+- renvoie sur stdout un objet JSON par ligne: {"event": "ready"} une fois
+  prêt, {"event": "line", "line": ...} pour chaque ligne affichée, puis
+  {"event": "exit", "code": ...} en fin de travail
+
+Le protocole passe par une copie privée du descripteur 1; le descripteur 1
+lui-même est redirigé vers stderr, si bien qu'un sous-processus, une
+extension C ou un os.write(1, ...) ne peut pas corrompre le protocole.
+
+Usage: python -m linxo_agent.warm_runner [--script linxo_agent.py] [--no-preload]
+"""
+
+import argparse
+import importlib.util
+import io
+import json
+import os
+import sys
+import threading
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+from types import ModuleType
+from typing import Callable, List
+
+BASE_DIR = Path(__file__).parent.parent
+MAIN_SCRIPT = BASE_DIR / "linxo_agent.py"
+
+
+class _LineWriter(io.TextIOBase):
+    """
+    Flux texte qui transmet chaque ligne complète
+
+    sys.stdout est commun à tout le processus: seules les écritures du
+    thread du travail sont transmises, celles des autres threads (rendu en
+    arrière-plan, rapprochement disque...) partent sur stderr.
+    """
+
+    def __init__(self, emit: Callable[[str], None]):
+        super().__init__()
+        self._emit = emit
+        self._pending = ""
+        self._owner = threading.get_ident()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if threading.get_ident() != self._owner:
+            return sys.__stderr__.write(text)
+        lines = (self._pending + text).split("\n")
+        self._pending = lines.pop()
+        for line in lines:
+            self._emit(line.rstrip("\r"))
+        return len(text)
+
+    def close_line(self) -> None:
+        """Dernière ligne sans saut de ligne final"""
+        if self._pending:
+            self._emit(self._pending)
+            self._pending = ""
+
+
+def load_main_module(script: Path) -> ModuleType:
+    """Charge le script principal comme module (son nom entre en conflit avec le package)"""
+    if str(BASE_DIR) not in sys.path:
+        sys.path.insert(0, str(BASE_DIR))
+    spec = importlib.util.spec_from_file_location("linxo_agent_main", script)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def preload() -> None:
+    """Imports lourds, classificateur et templates chargés avant le premier travail"""
+    try:
+        from linxo_agent import reports  # noqa: F401
+        from linxo_agent.template_registry import precompile_templates
+        precompile_templates()
+    except Exception as e:  # pylint: disable=broad-except
+        print(f"[WARN] Prechargement des rapports incomplet: {e}")
+
+    try:
+        # Module tel qu'importé par l'analyseur (import à plat): même cache
+        from smart_classifier import get_shared_classifier
+        get_shared_classifier()
+    except Exception as e:  # pylint: disable=broad-except
+        print(f"[WARN] Prechargement du classificateur incomplet: {e}")
+
+
+def _reset_config() -> None:
+    """Configuration relue à chaque travail (.env, dépenses récurrentes)"""
+    # Module importé sous deux noms (import à plat dans l'analyseur)
+    for name in ("linxo_agent.config", "config"):
+        module = sys.modules.get(name)
+        if module is not None and hasattr(module, "_CONFIG_INSTANCE"):
+            module._CONFIG_INSTANCE = None  # pylint: disable=protected-access
+
+
+def run_job(module: ModuleType, script: Path, args: List[str], env: dict,
+            emit: Callable[[str], None]) -> int:
+    """
+    Exécute main() du script principal comme un nouveau processus le ferait
+
+    Returns:
+        int: Code de sortie
+    """
+    os.environ.clear()
+    os.environ.update(env)
+    _reset_config()
+    sys.argv = [str(script)] + list(args)
+
+    writer = _LineWriter(emit)
+    with redirect_stdout(writer), redirect_stderr(writer):
+        try:
+            code = module.main()
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except Exception:  # pylint: disable=broad-except
+            traceback.print_exc()
+            code = 1
+    writer.close_line()
+    return code if isinstance(code, int) else 0
+
+
+def serve(script: Path = MAIN_SCRIPT, with_preload: bool = True) -> None:
+    """Boucle principale: un travail à la fois, jusqu'à la fermeture de stdin"""
+    # Tube du protocole sur un descripteur privé (non hérité par les
+    # sous-processus), descripteur 1 redirigé vers stderr
+    sys.stdout.flush()
+    protocol = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    os.dup2(2, 1)
+    protocol_lock = threading.Lock()
+
+    def send(message: dict) -> None:
+        with protocol_lock:
+            protocol.write(json.dumps(message, ensure_ascii=False) + "\n")
+            protocol.flush()
+
+    # Affichages hors travail (chargement): vers stderr, pas dans le protocole
+    sys.stdout = sys.stderr
+    module = load_main_module(script)
+    if with_preload:
+        preload()
+    base_env = dict(os.environ)
+    send({"event": "ready", "pid": os.getpid()})
+
+    for raw in sys.stdin:
+        if not raw.strip():
+            continue
+        try:
+            job = json.loads(raw)
+        except ValueError:
+            send({"event": "exit", "code": 2})
+            continue
+        code = run_job(
+            module, script, job.get("args", []), job.get("env") or base_env,
+            lambda line: send({"event": "line", "line": line})
+        )
+        send({"event": "exit", "code": code})
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Processus d'analyse prechargé")
+    parser.add_argument("--script", type=Path, default=MAIN_SCRIPT)
+    parser.add_argument("--no-preload", action="store_true")
+    args = parser.parse_args()
+    serve(args.script, with_preload=not args.no_preload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -59,6 +59,9 @@ echo -e "${GREEN}[2/6]${NC} Vérification des dépendances Python..."
 # Activer le venv et installer les dépendances
 su - "$USER" -c "cd $INSTALL_DIR && source .venv/bin/activate && pip install -q -r requirements.txt"
 
+# Précompiler les templates Jinja (cache de bytecode dans data/cache/jinja)
+su - "$USER" -c "cd $INSTALL_DIR && source .venv/bin/activate && python linxo_agent/template_registry.py"
+
 echo -e "${GREEN}✓${NC} Dépendances installées"
 echo
 
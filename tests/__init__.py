@@ -1 +1,14 @@
 # Tests package
+
+import atexit
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+# Bases SQLite d'exécution dans un répertoire temporaire: les modules les
+# ouvrent à l'import, les tests ne doivent rien écrire dans le dépôt
+_RUNTIME_DIR = Path(tempfile.mkdtemp(prefix='linxo-tests-'))
+atexit.register(shutil.rmtree, _RUNTIME_DIR, ignore_errors=True)
+os.environ['STORAGE_DB_FILE'] = str(_RUNTIME_DIR / 'storage' / 'storage.db')
+os.environ['FEEDBACK_DB_FILE'] = str(_RUNTIME_DIR / 'ml' / 'classification_feedback.db')
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests de l'exécution des traitements admin hors de la boucle asyncio
+"""
+
+import asyncio
+import operator
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault('REPORTS_BASIC_PASS', 'test_password')
+
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from linxo_agent.report_server import app as report_app
+from linxo_agent.report_server.admin import routes as admin_routes
+from linxo_agent.report_server.admin.auth import verify_admin_auth
+from linxo_agent.report_server.admin.offload import WorkerPool
+from linxo_agent.report_server.admin.system_metrics import SystemSampler
+from linxo_agent.storage_accounting import StorageLedger
+
+
+class TestWorkerPool(unittest.TestCase):
+    """Pool borné: résultat, délai dépassé, saturation"""
+
+    def setUp(self):
+        self.pool = WorkerPool(io_workers=1, cpu_workers=1, io_timeout=0.2, cpu_timeout=60)
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+        self.pool.shutdown()
+
+    def test_run_io_returns_result(self):
+        result = asyncio.run(self.pool.run_io(sorted, [3, 1, 2], reverse=True))
+        self.assertEqual(result, [3, 2, 1])
+
+    def test_timeout_raises_504(self):
+        with self.assertRaises(HTTPException) as ctx:
+            asyncio.run(self.pool.run_io(self.release.wait, 5))
+        self.assertEqual(ctx.exception.status_code, 504)
+
+    def test_saturated_pool_raises_503(self):
+        async def scenario():
+            # 1 thread: deux travaux en vol au maximum (un en cours, un en attente)
+            pending = [
+                asyncio.ensure_future(self.pool.run_io(self.release.wait, 5, timeout=5))
+                for _ in range(2)
+            ]
+            await asyncio.sleep(0.05)
+            try:
+                await self.pool.run_io(time.time)
+            finally:
+                self.release.set()
+                await asyncio.gather(*pending)
+
+        with self.assertRaises(HTTPException) as ctx:
+            asyncio.run(scenario())
+        self.assertEqual(ctx.exception.status_code, 503)
+
+    def test_slot_released_after_timeout(self):
+        for _ in range(3):
+            with self.assertRaises(HTTPException):
+                asyncio.run(self.pool.run_io(time.sleep, 0.3))
+        time.sleep(0.4)
+        self.assertEqual(asyncio.run(self.pool.run_io(len, "abc")), 3)
+
+    def test_loop_stays_responsive(self):
+        async def scenario():
+            job = asyncio.ensure_future(self.pool.run_io(time.sleep, 0.15))
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            latency = time.perf_counter() - start
+            await job
+            return latency
+
+        self.assertLess(asyncio.run(scenario()), 0.1)
+
+    def test_run_cpu_in_subprocess(self):
+        self.assertEqual(asyncio.run(self.pool.run_cpu(operator.mul, 6, 7)), 42)
+
+
+class TestSystemSampler(unittest.TestCase):
+    """Relevés en arrière-plan dans un tampon circulaire"""
+
+    def setUp(self):
+        self.sampler = SystemSampler(Path(__file__).parent, interval=0.02, history_size=5)
+        self.calls = []
+        self.sampler.add_collector('extra', lambda: self.calls.append(1) or len(self.calls))
+
+    def tearDown(self):
+        self.sampler.stop()
+
+    def test_latest_without_thread_samples_once(self):
+        snapshot = self.sampler.sample_now()
+        self.assertIsNone(snapshot['cpu_percent'])
+        self.assertIn('free_gb', snapshot['disk'])
+        self.assertEqual(snapshot['extra'], 1)
+        # Deuxième relevé: CPU mesuré sur l'intervalle écoulé
+        self.assertIsNotNone(self.sampler.sample_now()['cpu_percent'])
+
+    def test_background_thread_fills_ring_buffer(self):
+        self.sampler.ensure_started()
+        deadline = time.monotonic() + 5
+        while len(self.calls) < 8 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        history = self.sampler.history()
+        self.assertEqual(len(history), 5)
+        self.assertEqual(len(self.sampler.history(2)), 2)
+        self.assertEqual(set(history[-1]), {
+            'timestamp', 'cpu_percent', 'memory_percent', 'disk_percent',
+            'chrome_count', 'chrome_memory_mb'
+        })
+        self.assertGreaterEqual(self.sampler.latest()['extra'], 8)
+
+    def test_failing_collector_does_not_stop_sampling(self):
+        self.sampler.add_collector('broken', lambda: 1 / 0)
+        with mock.patch('builtins.print'):
+            snapshot = self.sampler.sample_now()
+        self.assertIsNone(snapshot['broken'])
+        self.assertEqual(snapshot['extra'], 1)
+
+
+class TestAdminRoutesOffload(unittest.TestCase):
+    """Les routes admin passent par le pool"""
+
+    def setUp(self):
+        report_app.app.dependency_overrides[verify_admin_auth] = lambda: True
+        self.client = TestClient(report_app.app)
+        # Comptabilité disque dans une base temporaire (pas de data/storage)
+        self.tmp = Path(tempfile.mkdtemp())
+        self.ledger = StorageLedger(self.tmp / 'storage.db', directories={'logs': (self.tmp, None)})
+        patcher = mock.patch.object(admin_routes, 'storage_ledger', self.ledger)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        report_app.app.dependency_overrides.pop(verify_admin_auth, None)
+        self.ledger.stop_reconciler()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_status_endpoint(self):
+        response = self.client.get('/admin/api/status')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('disk', response.json())
+
+    def test_status_history_endpoint(self):
+        self.client.get('/admin/api/status')
+        response = self.client.get('/admin/api/status/history?limit=10')
+        self.assertEqual(response.status_code, 200)
+        points = response.json()['points']
+        self.assertTrue(1 <= len(points) <= 10)
+        self.assertIn('memory_percent', points[-1])
+
+    def test_slow_status_returns_504(self):
+        pool = WorkerPool(io_timeout=0.1)
+        release = threading.Event()
+        try:
+            with mock.patch.object(admin_routes, 'worker_pool', pool), \
+                    mock.patch.object(admin_routes, 'get_system_status', lambda: release.wait(5)):
+                response = self.client.get('/admin/api/status')
+        finally:
+            release.set()
+            pool.shutdown()
+        self.assertEqual(response.status_code, 504)
+
+
+if __name__ == '__main__':
+    unittest.main()
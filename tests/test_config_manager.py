@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests du cache, des écritures atomiques et du verrou de depenses_recurrentes.json
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from linxo_agent import config as config_module
+from linxo_agent.config import config_file_lock, config_version, read_json_config
+from linxo_agent.report_server.admin import config_manager as config_manager_module
+from linxo_agent.report_server.admin.config_manager import ConfigManager
+
+
+class ConfigManagerTestCase(unittest.TestCase):
+    """Fichier de dépenses temporaire"""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.expenses_file = self.tmp / "depenses_recurrentes.json"
+        self.expenses_file.write_text(json.dumps({
+            "depenses_fixes": [{"id": 1, "libelle": "LOYER", "montant": 800}],
+            "revenus": [],
+            "ajustements_budget": [],
+        }), encoding="utf-8")
+        self.manager = ConfigManager()
+        self.manager.expenses_file = self.expenses_file
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+
+class TestConfigManagerCache(ConfigManagerTestCase):
+
+    def test_getters_parse_once_until_file_changes(self):
+        with mock.patch.object(config_manager_module.json, "load", wraps=json.load) as load:
+            first = self.manager.get_expenses()
+            first["depenses_fixes"].clear()
+            second = self.manager.get_expenses()
+            self.assertEqual(load.call_count, 1)
+            # Copie: une modification de l'appelant ne touche pas le cache
+            self.assertEqual(len(second["depenses_fixes"]), 1)
+
+            # Réécriture externe (autre processus, édition manuelle)
+            data = json.loads(self.expenses_file.read_text(encoding="utf-8"))
+            data["depenses_fixes"].append({"id": 2, "libelle": "EDF", "montant": 60})
+            self.expenses_file.write_text(json.dumps(data), encoding="utf-8")
+            self.assertEqual(len(self.manager.get_expenses()["depenses_fixes"]), 2)
+            self.assertEqual(load.call_count, 2)
+
+    def test_writes_are_atomic_and_bump_version(self):
+        self.assertEqual(self.manager.version(), 0)
+        inode = self.expenses_file.stat().st_ino
+        self.assertTrue(self.manager.add_expense({"libelle": "EDF", "montant": 60}))
+        self.assertEqual(self.manager.version(), 1)
+        # Nouveau fichier (os.replace), pas de fichier temporaire restant
+        self.assertNotEqual(self.expenses_file.stat().st_ino, inode)
+        self.assertEqual(sorted(p.name for p in self.tmp.iterdir()),
+                         ["depenses_recurrentes.json", "depenses_recurrentes.json.lock"])
+
+        data, version = read_json_config(self.expenses_file)
+        self.assertEqual([e["id"] for e in data["depenses_fixes"]], [1, 2])
+        self.assertEqual(version, 1)
+        self.assertEqual(len(self.manager.get_expenses()["depenses_fixes"]), 2)
+
+    def test_get_config_reloads_hand_edits(self):
+        # Fichier de dépenses temporaire: le fichier réel (et son verrou) n'est pas ouvert
+        with mock.patch.object(config_module.Config, '_load_depenses_config'):
+            instance = config_module.Config()
+        instance.depenses_file = self.expenses_file
+        instance._load_depenses_config()
+        with mock.patch.object(config_module, '_CONFIG_INSTANCE', instance):
+            self.assertEqual(len(config_module.get_config().depenses_data['depenses_fixes']), 1)
+
+            # Édition manuelle: version inchangée, seuls mtime et taille changent
+            data = json.loads(self.expenses_file.read_text(encoding="utf-8"))
+            data["depenses_fixes"].append({"id": 2, "libelle": "EDF", "montant": 60})
+            self.expenses_file.write_text(json.dumps(data), encoding="utf-8")
+            self.assertEqual(config_version(self.expenses_file), 0)
+            self.assertIs(config_module.get_config(), instance)
+            self.assertEqual(len(instance.depenses_data['depenses_fixes']), 2)
+
+    def test_failed_or_noop_edit_does_not_write(self):
+        self.assertFalse(self.manager.update_expense(99, {"libelle": "X"}))
+        self.assertTrue(self.manager.delete_expense(1))
+        self.assertFalse(self.manager.delete_expense(1))
+        self.assertEqual(self.manager.version(), 1)
+        self.assertEqual(self.manager.get_expenses()["depenses_fixes"], [])
+
+
+class TestConfigFileLock(ConfigManagerTestCase):
+    """Verrou partagé avec Config._load_depenses_config"""
+
+    def test_reader_waits_for_writer(self):
+        events = []
+        locked = threading.Event()
+
+        def reader():
+            locked.wait(5)
+            read_json_config(self.expenses_file)
+            events.append("read")
+
+        thread = threading.Thread(target=reader)
+        thread.start()
+        with config_file_lock(self.expenses_file, exclusive=True):
+            locked.set()
+            time.sleep(0.1)
+            events.append("write")
+        thread.join(5)
+        self.assertEqual(events, ["write", "read"])
+
+    def test_concurrent_adds_are_not_lost(self):
+        managers = []
+        for _ in range(4):
+            manager = ConfigManager()
+            manager.expenses_file = self.expenses_file
+            managers.append(manager)
+
+        threads = [
+            threading.Thread(target=lambda m=m: [m.add_income({"montant": 1}) for _ in range(5)])
+            for m in managers
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+
+        self.assertEqual(len(self.manager.get_expenses()["revenus"]), 20)
+        self.assertEqual(config_version(self.expenses_file), 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests des tâches admin (file d'attente, sortie par curseur, tampon circulaire)
+"""
+
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from fastapi import HTTPException
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from linxo_agent.report_server.admin.executor import (
+    TaskExecutor, TaskOutput, TaskPriority, TaskQueueFullError, TaskStatus
+)
+from linxo_agent.report_server.admin.offload import worker_pool
+from linxo_agent.report_server.admin.warm_worker import WarmWorker
+
+# Script principal de substitution pour le processus préchargé
+FAKE_MAIN_SCRIPT = """
+import os
+import sys
+import threading
+
+def main():
+    if '--crash' in os.environ.get('WARM_TEST', ''):
+        os._exit(3)
+    print('args', ' '.join(sys.argv[1:]))
+    print('env', os.environ.get('WARM_TEST'))
+    print('pid', os.getpid(), file=sys.stderr)
+    # Écriture directe sur le descripteur 1 (sous-processus, extension C)
+    os.write(1, b'hors protocole\\n')
+    # Thread en arrière-plan: pas dans la sortie du travail
+    worker = threading.Thread(target=print, args=('autre thread',))
+    worker.start()
+    worker.join()
+    return 0 if '--skip-notifications' in sys.argv else 4
+"""
+
+
+def python_command(code):
+    return [sys.executable, '-c', code]
+
+
+async def wait_finished(executor, task_ids):
+    for task_id in task_ids:
+        task = await executor.get_task(task_id)
+        while not task.is_finished:
+            await task.output.wait_for_lines(task.output.last_seq, 1)
+
+
+class TestTaskOutput(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_cursor_reads_only_new_lines(self):
+        async def scenario():
+            output = TaskOutput(self.temp_dir / 'task.log', max_lines=10)
+            for i in range(1, 4):
+                output.append(f'ligne {i}')
+            first = await output.read(0)
+            output.append('ligne 4')
+            second = await output.read(first[1])
+            third = await output.read(second[1])
+            output.close()
+            return first, second, third
+
+        first, second, third = asyncio.run(scenario())
+        self.assertEqual(first, (['ligne 1', 'ligne 2', 'ligne 3'], 3))
+        self.assertEqual(second, (['ligne 4'], 4))
+        self.assertEqual(third, ([], 4))
+
+    def test_old_lines_read_back_from_spill_file(self):
+        async def scenario():
+            output = TaskOutput(self.temp_dir / 'task.log', max_lines=5)
+            for i in range(1, 21):
+                output.append(f'ligne {i}')
+            # Lignes 3..: les 13 premières viennent du fichier, puis le tampon
+            spilled = await output.read(2, limit=100)
+            buffered = await output.read(spilled[1], limit=100)
+            output.close()
+            return output, spilled, buffered
+
+        output, spilled, buffered = asyncio.run(scenario())
+        self.assertEqual(len(output), 20)
+        self.assertEqual(output.first_buffered_seq, 16)
+        self.assertEqual(spilled, ([f'ligne {i}' for i in range(3, 16)], 15))
+        self.assertEqual(buffered, ([f'ligne {i}' for i in range(16, 21)], 20))
+        self.assertEqual(len((self.temp_dir / 'task.log').read_text().splitlines()), 20)
+
+    def test_without_spill_file_skips_lost_lines(self):
+        async def scenario():
+            output = TaskOutput(None, max_lines=3)
+            for i in range(1, 8):
+                output.append(f'ligne {i}')
+            return await output.read(0)
+
+        self.assertEqual(asyncio.run(scenario()), (['ligne 5', 'ligne 6', 'ligne 7'], 7))
+
+    def test_wait_for_lines_wakes_on_append(self):
+        async def scenario():
+            output = TaskOutput(None)
+            waiter = asyncio.ensure_future(output.wait_for_lines(0, 5))
+            await asyncio.sleep(0.01)
+            output.append('nouvelle')
+            await asyncio.wait_for(waiter, 1)
+            return await output.read(0)
+
+        self.assertEqual(asyncio.run(scenario()), (['nouvelle'], 1))
+
+
+class ExecutorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        # Lectures de la base encore en cours dans le pool après la fin de la boucle
+        worker_pool.shutdown(wait=True)
+        shutil.rmtree(self.temp_dir)
+
+    def make_executor(self, **kwargs):
+        kwargs.setdefault('poll_interval', 0.02)
+        return TaskExecutor(self.temp_dir / 'tasks.db', self.temp_dir, **kwargs)
+
+
+class TestTaskExecutorOutput(ExecutorTestCase):
+
+    def test_status_returns_output_after_cursor(self):
+        async def scenario():
+            executor = self.make_executor()
+            task_id = await executor.execute_task(
+                'Test', python_command('for i in range(5): print(f"ligne {i}")')
+            )
+            task = await executor.get_task(task_id)
+            await wait_finished(executor, [task_id])
+            full = await executor.get_task_status(task_id)
+            tail = await executor.get_task_status(task_id, after=full['next_seq'] - 2)
+            await executor.cleanup_old_tasks(max_age_hours=-1)
+            return task, full, tail
+
+        task, full, tail = asyncio.run(scenario())
+        self.assertEqual(full['status'], TaskStatus.SUCCESS.value)
+        self.assertEqual(full['output'][-5:], [f'ligne {i}' for i in range(5)])
+        self.assertEqual(full['next_seq'], full['output_seq'])
+        self.assertEqual(tail['output'], ['ligne 3', 'ligne 4'])
+        self.assertFalse(task.output.spill_path.exists())
+
+
+class TestTaskScheduling(ExecutorTestCase):
+    """File d'attente: ressources exclusives, limite, priorités, persistance"""
+
+    def test_shared_resource_runs_tasks_one_after_another(self):
+        async def scenario():
+            executor = self.make_executor(max_concurrent=3)
+            first = await executor.execute_task(
+                'A', python_command('import time; time.sleep(0.2)'), resources=('browser',)
+            )
+            second = await executor.execute_task('B', python_command('pass'), resources=('browser', 'csv'))
+            other = await executor.execute_task('C', python_command('print(1)'), resources=('reports',))
+            states = [(await executor.get_task(i)).status for i in (first, second, other)]
+            await wait_finished(executor, [first, second, other])
+            tasks = [await executor.get_task(i) for i in (first, second)]
+            return states, tasks
+
+        states, (first, second) = asyncio.run(scenario())
+        self.assertEqual(states, [TaskStatus.RUNNING, TaskStatus.PENDING, TaskStatus.RUNNING])
+        self.assertGreaterEqual(second.start_time, first.end_time)
+
+    def test_identical_pending_command_is_deduplicated(self):
+        async def scenario():
+            executor = self.make_executor(max_concurrent=1)
+            running = await executor.execute_task('A', python_command('import time; time.sleep(0.1)'))
+            queued = await executor.execute_task('B', python_command('pass'))
+            again = await executor.execute_task('B', python_command('pass'))
+            await wait_finished(executor, [running, queued])
+            return queued, again, len(await executor.list_tasks())
+
+        queued, again, count = asyncio.run(scenario())
+        self.assertEqual(queued, again)
+        self.assertEqual(count, 2)
+
+    def test_queue_full_and_priorities(self):
+        async def scenario():
+            executor = self.make_executor(max_concurrent=1, queue_size=2)
+            blocker = await executor.execute_task('Bloquant', python_command('import time; time.sleep(0.2)'))
+            low = await executor.execute_task('Bas', python_command('print(1)'), priority=TaskPriority.LOW)
+            high = await executor.execute_task('Haut', python_command('print(2)'), priority=TaskPriority.HIGH)
+            with self.assertRaises(TaskQueueFullError):
+                await executor.execute_task('Refusé', python_command('print(3)'))
+            await wait_finished(executor, [blocker, low, high])
+            return [await executor.get_task(i) for i in (low, high)]
+
+        low, high = asyncio.run(scenario())
+        self.assertGreaterEqual(low.start_time, high.end_time)
+
+    def test_state_survives_restart(self):
+        async def before_restart():
+            executor = self.make_executor(max_concurrent=1)
+            done = await executor.execute_task('Fini', python_command('print("sortie")'))
+            await wait_finished(executor, [done])
+            # Tâche en cours et tâche en attente au moment de l'arrêt
+            interrupted = await executor.execute_task('Longue', python_command('import time; time.sleep(5)'))
+            queued = await executor.execute_task('Suivante', python_command('print("repris")'))
+            await asyncio.sleep(0.05)
+            return done, interrupted, queued
+
+        async def after_restart(done, interrupted, queued):
+            executor = self.make_executor(max_concurrent=1)
+            await wait_finished(executor, [queued])
+            statuses = [(await executor.get_task(i)).status for i in (done, interrupted, queued)]
+            output = await executor.get_task_status(done)
+            return statuses, output['output'], (await executor.get_task_status(queued))['output']
+
+        ids = asyncio.run(before_restart())
+        statuses, done_output, queued_output = asyncio.run(after_restart(*ids))
+
+        self.assertEqual(statuses, [TaskStatus.SUCCESS, TaskStatus.ERROR, TaskStatus.SUCCESS])
+        self.assertEqual(done_output[-1], 'sortie')
+        self.assertEqual(queued_output[-1], 'repris')
+
+
+
+class TestSharedTaskStore(ExecutorTestCase):
+    """Plusieurs processus serveur (un gestionnaire par processus) sur la même base"""
+
+    def test_other_worker_follows_task_output(self):
+        async def scenario():
+            worker_a, worker_b = self.make_executor(), self.make_executor()
+            task_id = await worker_a.execute_task('A', python_command(
+                'import time\nfor i in range(3):\n    print(f"ligne {i}", flush=True); time.sleep(0.05)'
+            ))
+            view = await worker_b.get_task(task_id)
+            lines, cursor = [], 0
+            while True:
+                finished = view.is_finished
+                new_lines, cursor = await view.output.read(cursor)
+                lines += new_lines
+                if finished and not new_lines:
+                    break
+                await view.output.wait_for_lines(cursor, 1)
+            return view, lines, await worker_b.list_tasks()
+
+        view, lines, listed = asyncio.run(scenario())
+        self.assertEqual(view.status, TaskStatus.SUCCESS)
+        self.assertEqual(lines[-3:], ['ligne 0', 'ligne 1', 'ligne 2'])
+        self.assertEqual(listed[0]['output_seq'], len(lines))
+
+    def test_resources_and_queue_shared_between_workers(self):
+        async def scenario():
+            worker_a, worker_b = self.make_executor(), self.make_executor()
+            first = await worker_a.execute_task(
+                'A', python_command('import time; time.sleep(0.2)'), resources=('browser',)
+            )
+            second, deduplicated = await worker_b.submit_task(
+                'B', python_command('print(2)'), resources=('browser',)
+            )
+            again, deduplicated_again = await worker_a.submit_task(
+                'B', python_command('print(2)'), resources=('browser',)
+            )
+            view = await worker_b.get_task(second)
+            status_before = view.status
+            while not view.is_finished:
+                await view.output.wait_for_lines(view.output.last_seq, 1)
+            first_task = await worker_b.get_task(first)
+            return status_before, view, first_task, (second, deduplicated, again, deduplicated_again)
+
+        status_before, view, first_task, submissions = asyncio.run(scenario())
+        self.assertEqual(status_before, TaskStatus.PENDING)
+        self.assertEqual(view.status, TaskStatus.SUCCESS)
+        self.assertGreaterEqual(view.start_time, first_task.end_time)
+        second, deduplicated, again, deduplicated_again = submissions
+        self.assertEqual((deduplicated, again, deduplicated_again), (False, second, True))
+
+    def test_task_of_vanished_worker_marked_as_interrupted(self):
+        async def scenario():
+            executor = self.make_executor()
+            await executor.list_tasks()
+            # Tâche prise par un processus qui n'existe plus
+            lost_id, _ = executor.store.enqueue(
+                {'id': 'perdue', 'name': 'Perdue', 'command': ['true'], 'resources': ['csv'],
+                 'priority': 5, 'queued_at': '2025-01-15T06:00:00', 'output_file': None},
+                queue_size=5
+            )
+            executor.store.claim(2, '999999999:disparu')
+            await asyncio.sleep(0.1)
+            return await executor.get_task_status(lost_id)
+
+        status = asyncio.run(scenario())
+        self.assertEqual(status['status'], TaskStatus.ERROR.value)
+        self.assertIn('Interrompue', status['error'])
+
+    def test_final_state_written_when_pool_is_saturated(self):
+        async def refuse(*args, **kwargs):
+            raise HTTPException(status_code=503, detail="Serveur occupé")
+
+        async def scenario():
+            executor = self.make_executor()
+            task_id = await executor.execute_task('A', python_command('import time; time.sleep(0.2)'))
+            with mock.patch.object(worker_pool, 'run_io', refuse):
+                await asyncio.sleep(0.5)
+            # reap() de nouveau possible: la tâche ne doit pas être vue orpheline
+            await asyncio.sleep(0.1)
+            return executor.store.get(task_id)
+
+        state = asyncio.run(scenario())
+        self.assertEqual(state['status'], TaskStatus.SUCCESS.value)
+        self.assertEqual(state['exit_code'], 0)
+
+    def test_idle_workers_do_not_write(self):
+        async def scenario():
+            worker_a, worker_b = self.make_executor(), self.make_executor()
+            await worker_a.list_tasks()
+            await worker_b.list_tasks()
+            before = worker_a.store.version()
+            await asyncio.sleep(0.3)
+            return before, worker_a.store.version()
+
+        before, after = asyncio.run(scenario())
+        self.assertEqual(before, after)
+
+    def test_pruned_tasks_lose_their_output_file(self):
+        async def scenario():
+            executor = self.make_executor()
+            with mock.patch('linxo_agent.report_server.admin.executor.TASK_HISTORY_SIZE', 1):
+                first = await executor.execute_task('A', python_command('print(1)'))
+                await wait_finished(executor, [first])
+                second = await executor.execute_task('B', python_command('print(2)'))
+                await wait_finished(executor, [second])
+                await asyncio.sleep(0.05)
+            return first, second, await executor.list_tasks()
+
+        first, second, listed = asyncio.run(scenario())
+        self.assertEqual([task['id'] for task in listed], [second])
+        self.assertFalse((self.temp_dir / f'{first}.log').exists())
+
+
+
+
+class TestWarmWorker(ExecutorTestCase):
+    """Analyses dans le processus préchargé"""
+
+    def setUp(self):
+        super().setUp()
+        self.script = self.temp_dir / 'main_script.py'
+        self.script.write_text(FAKE_MAIN_SCRIPT, encoding='utf-8')
+        self.warm = WarmWorker(self.script, enabled=True, preload=False)
+
+    def command(self, *args):
+        return [sys.executable, str(self.script)] + list(args)
+
+    def test_only_analysis_commands_are_warm(self):
+        self.assertEqual(self.warm.job_args(self.command('--skip-download')), ['--skip-download'])
+        self.assertIsNone(self.warm.job_args(self.command()))
+        self.assertIsNone(self.warm.job_args(self.command('--skip-download', '--csv-file', 'x.csv')))
+        self.assertIsNone(self.warm.job_args(python_command('print(1)')))
+
+    def test_jobs_reuse_process_and_stream_output(self):
+        async def scenario():
+            results = []
+            try:
+                for env in ({'WARM_TEST': 'un'}, {'WARM_TEST': 'deux'}):
+                    output = TaskOutput(None)
+                    code = await self.warm.run(['--skip-download', '--skip-notifications'], output, env)
+                    results.append((code, (await output.read(0))[0]))
+            finally:
+                await self.warm.shutdown()
+            return results
+
+        (code_1, lines_1), (code_2, lines_2) = asyncio.run(scenario())
+        self.assertEqual((code_1, code_2), (0, 0))
+        self.assertEqual(lines_1[:2], ['args --skip-download --skip-notifications', 'env un'])
+        self.assertEqual(lines_2[1], 'env deux')
+        self.assertNotIn('autre thread', lines_1)
+        # Même processus pour les deux travaux
+        self.assertEqual(lines_1[2], lines_2[2])
+
+    def test_executor_runs_analysis_in_warm_worker(self):
+        async def scenario():
+            executor = self.make_executor(warm=self.warm)
+            try:
+                warm_id = await executor.execute_task('Analyse', self.command('--skip-download'))
+                await wait_finished(executor, [warm_id])
+                # Processus arrêté pendant un travail, relancé au suivant
+                with mock.patch.dict(os.environ, {'WARM_TEST': '--crash'}):
+                    crash_id = await executor.execute_task(
+                        'Analyse', self.command('--skip-download', '--skip-notifications')
+                    )
+                    await wait_finished(executor, [crash_id])
+                again_id = await executor.execute_task('Analyse', self.command('--skip-download'))
+                await wait_finished(executor, [again_id])
+                return [await executor.get_task_status(i) for i in (warm_id, crash_id, again_id)]
+            finally:
+                await self.warm.shutdown()
+
+        warm, crash, again = asyncio.run(scenario())
+        self.assertEqual((warm['status'], warm['exit_code']), (TaskStatus.ERROR.value, 4))
+        self.assertIn('args --skip-download', warm['output'])
+        self.assertEqual(crash['exit_code'], -1)
+        self.assertIn('arrete en cours de tache', crash['output'][-1])
+        self.assertEqual(again['exit_code'], 4)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
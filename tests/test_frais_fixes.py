@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests du rattachement des frais fixes aux dépenses de référence
+"""
+
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+# Ajouter le répertoire parent et linxo_agent au path (imports à plat du module)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'linxo_agent'))
+
+from linxo_agent.reports import build_frais_fixes_page
+import analyzer
+import config
+
+
+DEPENSES_FIXES = [
+    {'id': 7, 'libelle': 'EDF', 'identifiant': 'EDF', 'montant': 50.0},
+    {'libelle': 'VIR PHIL LOYER', 'identifiant': 'Phil', 'montant': 100.0},
+    {'libelle': 'VIR PHIL CANTINE', 'identifiant': 'Phil', 'montant': 20.0},
+    {'libelle': 'TAXE FONCIERE', 'identifiant': 'TAXE', 'montant': 900.0, 'mois_occurrence': [10]},
+]
+
+
+class CapturingEnv:
+    """Environnement Jinja factice: mémorise le contexte de rendu"""
+
+    def __init__(self):
+        self.context = None
+
+    def get_template(self, name):
+        return SimpleNamespace(generate=self._generate)
+
+    def _generate(self, **context):
+        self.context = context
+        yield "<html></html>"
+
+
+class TestReferenceMatching(unittest.TestCase):
+    """L'analyse pose l'identifiant de la référence rattachée"""
+
+    def test_ref_id(self):
+        est_fixe, match = analyzer.est_depense_recurrente(
+            {'libelle': 'VIR PHIL CANTINE JANVIER', 'montant': -20.0}, DEPENSES_FIXES
+        )
+        self.assertTrue(est_fixe)
+        self.assertEqual(match['ref_id'], analyzer.reference_id(DEPENSES_FIXES[2]))
+        self.assertTrue(match['ref_id'].startswith('ref-'))
+
+        _, match = analyzer.est_depense_recurrente(
+            {'libelle': 'PRLV EDF', 'montant': -50.0}, DEPENSES_FIXES
+        )
+        self.assertEqual(match['ref_id'], 'id-7')
+
+    def test_ref_id_independent_of_position(self):
+        ref_id = analyzer.reference_id(DEPENSES_FIXES[2], DEPENSES_FIXES)
+        edited = [{'libelle': 'NOUVEAU', 'montant': 5.0}] + list(reversed(DEPENSES_FIXES))
+        self.assertEqual(analyzer.reference_id(DEPENSES_FIXES[2], edited), ref_id)
+
+        # Doublons exacts: départagés par leur rang parmi les entrées identiques
+        twins = [dict(DEPENSES_FIXES[2]), dict(DEPENSES_FIXES[2])]
+        self.assertNotEqual(analyzer.reference_id(twins[0], twins), analyzer.reference_id(twins[1], twins))
+
+
+class TestBuildFraisFixesPage(unittest.TestCase):
+    """Répartition prélevés / en attente / non appliqués"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_repartition_par_identifiant(self):
+        analysis_result = {
+            'depenses_fixes': [
+                {'libelle': 'PRLV EDF', 'montant': -50.0, 'depense_fixe_id': 'id-7'},
+                {'libelle': 'VIR PHIL CANTINE', 'montant': -20.0,
+                 'depense_fixe_id': analyzer.reference_id(DEPENSES_FIXES[2])},
+                {'libelle': 'ABONNEMENT', 'montant': -9.99, 'depense_fixe_id': None},
+            ]
+        }
+        env = CapturingEnv()
+        # Fichier modifié depuis l'analyse: nouvelle entrée en tête de liste
+        edited = [{'libelle': 'ASSURANCE', 'identifiant': 'MAAF', 'montant': 30.0, 'mois_occurrence': [3]}]
+        fake_config = SimpleNamespace(depenses_data={'depenses_fixes': edited + DEPENSES_FIXES})
+
+        with mock.patch.object(config, 'get_config', return_value=fake_config):
+            build_frais_fixes_page(
+                base_dir=self.temp_dir,
+                report_date_str='2025-01-15',
+                base_url='http://localhost/reports',
+                signing_key=None,
+                analysis_result=analysis_result,
+                env=env,
+            )
+
+        context = env.context
+        # Toutes les transactions fixes de l'analyse sont listées
+        self.assertEqual(len(context['preleves']), 3)
+        self.assertAlmostEqual(context['total_preleve'], 79.99)
+        # "Phil" loyer n'est pas prélevé même si l'autre "Phil" l'est
+        self.assertEqual([f['libelle'] for f in context['en_attente']], ['VIR PHIL LOYER'])
+        self.assertEqual([f['libelle'] for f in context['non_appliques']], ['TAXE FONCIERE', 'ASSURANCE'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests de la lecture des logs (index des lignes, tail, recherche, suivi en direct)
+"""
+
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from linxo_agent.report_server.admin import log_follow, log_search
+from linxo_agent.report_server.admin.log_follow import follow_log, format_sse, parse_resume_id
+from linxo_agent.report_server.admin.log_index import LineIndex, read_last_lines
+from linxo_agent.report_server.admin.log_search import LogSearchIndex
+from linxo_agent.report_server.admin.logs_manager import LogsManager
+
+
+class LogsTestCase(unittest.TestCase):
+    """Répertoire de logs temporaire"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.log_path = self.temp_dir / 'daily_report_20250115.log'
+        self.manager = LogsManager()
+        self.manager.logs_dir = self.temp_dir
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write_lines(self, lines, mode='w'):
+        with open(self.log_path, mode, encoding='utf-8') as f:
+            f.write(''.join(f'{line}\n' for line in lines))
+
+
+class TestReadLogFile(LogsTestCase):
+
+    def test_pagination_seeks_requested_range(self):
+        self.write_lines([f'2025-01-15 10:00:00 [INFO] ligne {i}' for i in range(1, 501)])
+
+        lines, total, has_more = self.manager.read_log_file(self.log_path.name, offset=250, limit=3)
+
+        self.assertEqual(total, 500)
+        self.assertTrue(has_more)
+        self.assertEqual([entry['line_number'] for entry in lines], [251, 252, 253])
+        self.assertTrue(lines[0]['line'].endswith('ligne 251'))
+        self.assertEqual(lines[0]['timestamp'], '2025-01-15 10:00:00')
+
+        lines, total, has_more = self.manager.read_log_file(self.log_path.name, offset=498, limit=10)
+        self.assertEqual(len(lines), 2)
+        self.assertFalse(has_more)
+
+    def test_index_extended_as_file_grows(self):
+        self.write_lines(['premiere', 'deuxieme'])
+        self.assertEqual(self.manager.read_log_file(self.log_path.name)[1], 2)
+
+        with open(self.log_path, 'a', encoding='utf-8') as f:
+            f.write('troisieme\nquatrieme sans fin')
+        lines, total, _ = self.manager.read_log_file(self.log_path.name, offset=2)
+
+        self.assertEqual(total, 4)
+        self.assertEqual([entry['line'] for entry in lines], ['troisieme', 'quatrieme sans fin'])
+
+    def test_sidecar_reused_and_rebuilt_after_truncation(self):
+        self.write_lines(['a', 'b', 'c'])
+        self.manager.read_log_file(self.log_path.name)
+        sidecar = self.temp_dir / '.index' / f'{self.log_path.name}.idx'
+        self.assertTrue(sidecar.exists())
+
+        self.write_lines(['x'])
+        fresh = LineIndex(self.log_path, sidecar)
+        self.assertEqual(fresh.read_lines(0, 10), (['x'], 1))
+
+    def test_filters(self):
+        self.write_lines(['[INFO] debut', '[ERROR] 2FA echec', '[INFO] 2FA ok', '[ERROR] autre'])
+
+        lines, total, _ = self.manager.read_log_file(self.log_path.name, level_filter='ERROR')
+        self.assertEqual(total, 2)
+        self.assertEqual([entry['line_number'] for entry in lines], [2, 4])
+
+        lines, total, _ = self.manager.read_log_file(
+            self.log_path.name, level_filter='ERROR', search_query='2fa'
+        )
+        self.assertEqual(total, 1)
+        self.assertEqual(lines[0]['line_number'], 2)
+
+    def test_rejects_path_outside_logs_dir(self):
+        self.assertEqual(self.manager.read_log_file('../etc/passwd'), ([], 0, False))
+        self.assertEqual(self.manager.tail_log_file('../etc/passwd'), [])
+
+
+class TestTailLogFile(LogsTestCase):
+
+    def test_tail_numbers_last_lines(self):
+        self.write_lines([f'ligne {i}' for i in range(1, 1001)])
+
+        entries = self.manager.tail_log_file(self.log_path.name, 3)
+
+        self.assertEqual([entry['line'] for entry in entries], ['ligne 998', 'ligne 999', 'ligne 1000'])
+        self.assertEqual([entry['line_number'] for entry in entries], [998, 999, 1000])
+
+    def test_read_last_lines_across_blocks(self):
+        self.write_lines([f'ligne {i}' for i in range(1, 101)])
+
+        self.assertEqual(read_last_lines(self.log_path, 5, block_size=7),
+                         [f'ligne {i}' for i in range(96, 101)])
+        self.assertEqual(len(read_last_lines(self.log_path, 500, block_size=7)), 100)
+
+    def test_empty_file(self):
+        self.log_path.write_bytes(b'')
+        self.assertEqual(self.manager.tail_log_file(self.log_path.name), [])
+        self.assertEqual(self.manager.read_log_file(self.log_path.name), ([], 0, False))
+
+
+class TestLogSearchIndex(LogsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.index = LogSearchIndex(self.temp_dir)
+        self.write_lines([
+            '2025-01-15 06:00:01 [INFO] Connexion a Linxo',
+            '2025-01-15 06:00:05 [WARNING] Code 2FA demande',
+            '2025-01-15 06:00:09 [ERROR] Echec 2fa',
+        ])
+        (self.temp_dir / 'daily_report_20250114.log').write_text(
+            '[ERROR] Timeout selenium\n[SUCCESS] Rapport envoye\n', encoding='utf-8'
+        )
+
+    def test_search_is_case_insensitive_across_files(self):
+        lines, total, has_more = self.index.search('2FA')
+
+        self.assertEqual(total, 2)
+        self.assertFalse(has_more)
+        self.assertEqual([(entry['file'], entry['line_number']) for entry in lines],
+                         [(self.log_path.name, 2), (self.log_path.name, 3)])
+        self.assertEqual(lines[0]['level'], 'WARNING')
+        self.assertEqual(lines[0]['timestamp'], '2025-01-15 06:00:05')
+
+    def test_level_and_file_filters_with_pagination(self):
+        lines, total, has_more = self.index.search(level='ERROR', limit=1)
+        self.assertEqual(total, 2)
+        self.assertTrue(has_more)
+        self.assertEqual(lines[0]['file'], self.log_path.name)
+
+        lines, total, _ = self.index.search('[error]', file_name='daily_report_20250114.log')
+        self.assertEqual(total, 1)
+        self.assertEqual(lines[0]['line'], '[ERROR] Timeout selenium')
+
+        # Requête plus courte qu'un trigramme
+        self.assertEqual(self.index.search('2f')[1], 2)
+
+    def test_incremental_sync_and_rotation(self):
+        self.index.sync()
+        with open(self.log_path, 'a', encoding='utf-8') as f:
+            f.write('[ERROR] Nouvelle erreur\nligne en cours')
+        self.assertEqual(self.index.sync(), 1)
+        self.assertEqual(self.index.search('nouvelle')[0][0]['line_number'], 4)
+
+        self.write_lines(['[INFO] apres rotation'])
+        self.assertEqual(self.index.search('2FA')[1], 0)
+        self.assertEqual(self.index.search('rotation')[0][0]['line_number'], 1)
+
+        (self.temp_dir / 'daily_report_20250114.log').unlink()
+        self.assertEqual(self.index.search('selenium')[1], 0)
+
+    def test_concurrent_writers_share_the_index(self):
+        # Deux instances: verrous de synchronisation distincts, comme deux workers
+        self.write_lines([f'[INFO] ligne {i}' for i in range(5000)], mode='a')
+        indexes = [self.index, LogSearchIndex(self.temp_dir)]
+        errors = []
+
+        def run(index):
+            try:
+                index.sync()
+            except Exception as e:  # pylint: disable=broad-except
+                errors.append(e)
+
+        with mock.patch.object(log_search, 'INGEST_BLOCK_SIZE', 4096):
+            threads = [threading.Thread(target=run, args=(index,)) for index in indexes]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(30)
+
+        self.assertEqual(errors, [])
+        lines, total, _ = self.index.search('ligne 4999', sync=False)
+        self.assertEqual((total, lines[0]['line_number']), (1, 5003))
+        self.assertEqual(self.index.search(file_name=self.log_path.name, sync=False)[1], 5003)
+
+
+class TestFollowLog(LogsTestCase):
+    """Suivi en direct: nouvelles lignes, rotation, reprise"""
+
+    def follow(self, actions, count, **kwargs):
+        """Collecte `count` événements en appliquant `actions` entre deux lectures"""
+        kwargs.setdefault('poll_interval', 0.02)
+
+        async def scenario():
+            events = []
+            stream = follow_log(self.log_path, LineIndex(self.log_path), **kwargs)
+            try:
+                while len(events) < count:
+                    message = await asyncio.wait_for(stream.__anext__(), 2)
+                    if message['event'] == 'ping':
+                        continue
+                    events.append(message)
+                    if actions:
+                        actions.pop(0)()
+            finally:
+                await stream.aclose()
+            return events
+
+        return asyncio.run(scenario())
+
+    def append(self, text):
+        with open(self.log_path, 'a', encoding='utf-8') as f:
+            f.write(text)
+
+    def test_backlog_then_only_new_lines(self):
+        self.write_lines(['[INFO] un', '[INFO] deux', '[INFO] trois'])
+
+        events = self.follow([lambda: self.append('[ERROR] quatre\ncinq en cours')], 2, backlog=2)
+
+        self.assertEqual([entry['line_number'] for entry in events[0]['lines']], [2, 3])
+        self.assertEqual(events[1]['lines'], [{
+            'line': '[ERROR] quatre', 'line_number': 4, 'level': 'ERROR', 'timestamp': None
+        }])
+        self.assertTrue(format_sse(events[1]).startswith(f"id: {events[1]['id']}\nevent: lines\n"))
+
+    def test_line_longer_than_chunk_is_sent_in_parts(self):
+        self.write_lines(['un'])
+        dump = 'x' * 40
+
+        with mock.patch.object(log_follow, 'FOLLOW_CHUNK_SIZE', 16):
+            events = self.follow([lambda: self.append(f'{dump}\ntrois\n')], 4)
+
+        parts = [entry for event in events[1:] for entry in event['lines']]
+        self.assertEqual(''.join(entry['line'] for entry in parts[:-1]), dump)
+        self.assertTrue(all(entry.get('partial') for entry in parts[:2]))
+        self.assertEqual({entry['line_number'] for entry in parts[:-1]}, {2})
+        self.assertEqual((parts[-1]['line'], parts[-1]['line_number']), ('trois', 3))
+
+    def test_polling_fallback_without_inotify(self):
+        self.write_lines(['un'])
+        with mock.patch.object(log_follow, '_libc', None):
+            events = self.follow([lambda: self.append('deux\n')], 2)
+        self.assertEqual(events[1]['lines'][0]['line_number'], 2)
+
+    def test_rotation_sends_old_tail_then_new_file(self):
+        self.write_lines(['avant'])
+
+        def rotate():
+            self.append('fin ancien\n')
+            os.rename(self.log_path, self.temp_dir / 'old.log.1')
+            self.write_lines(['nouveau'])
+
+        events = self.follow([rotate], 4, backlog=1)
+
+        self.assertEqual([event['event'] for event in events], ['lines', 'lines', 'rotated', 'lines'])
+        self.assertEqual(events[1]['lines'][0]['line'], 'fin ancien')
+        self.assertEqual(events[3]['lines'][0]['line_number'], 1)
+
+    def test_resume_from_event_id(self):
+        self.write_lines(['un', 'deux'])
+        first = self.follow([], 1)[0]
+        self.append('trois\n')
+
+        events = self.follow([], 1, resume=parse_resume_id(first['id']))
+        self.assertEqual(events[0]['lines'][0], {
+            'line': 'trois', 'line_number': 3, 'level': 'INFO', 'timestamp': None
+        })
+
+        # Autre inode: le fichier a été remplacé pendant la déconnexion
+        os.rename(self.log_path, self.temp_dir / 'old.log.1')
+        self.write_lines(['remplacant'])
+        events = self.follow([], 2, resume=parse_resume_id(events[0]['id']))
+        self.assertEqual(events[0]['event'], 'rotated')
+        self.assertEqual(events[1]['lines'][0]['line'], 'remplacant')
+
+    def test_offset_aligned_on_line_start(self):
+        self.write_lines(['aaaa', 'bbbb', 'cccc'])
+        events = self.follow([], 1, offset=7)
+        self.assertEqual([entry['line'] for entry in events[0]['lines']], ['bbbb', 'cccc'])
+        self.assertEqual(events[0]['lines'][0]['line_number'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests de l'archivage des rapports en packs mensuels
+"""
+
+import gzip
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import zipfile
+from datetime import date
+from pathlib import Path
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault('REPORTS_BASIC_PASS', 'test_password')
+
+from fastapi.testclient import TestClient
+
+from linxo_agent import report_archive
+from linxo_agent.report_archive import archive_reports, archived_dates, read_archived_file
+from linxo_agent.report_server import app as report_app
+from linxo_agent.reports import read_report_manifest
+
+
+class ArchiveTestCase(unittest.TestCase):
+    """Racine de rapports temporaire avec trois dates"""
+
+    DATES = ('2025-01-10', '2025-01-20', '2025-03-01')
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        for report_date in self.DATES:
+            report_dir = self.root / report_date
+            report_dir.mkdir()
+            html = f"<html>{report_date}</html>".encode('utf-8')
+            (report_dir / 'index.html').write_bytes(html)
+            (report_dir / 'index.html.gz').write_bytes(gzip.compress(html))
+            (report_dir / 'manifest.json').write_text(
+                json.dumps({'report_date': report_date}), encoding='utf-8'
+            )
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+
+class TestArchiveReports(ArchiveTestCase):
+    """Regroupement par mois et lecture depuis le pack"""
+
+    def test_archivage_par_mois(self):
+        archived = archive_reports(30, self.root, today=date(2025, 3, 5))
+
+        self.assertEqual(archived, {'2025-01': ['2025-01-10', '2025-01-20']})
+        self.assertFalse((self.root / '2025-01-10').exists())
+        self.assertTrue((self.root / '2025-03-01').exists())
+        self.assertEqual(archived_dates(self.root), ['2025-01-10', '2025-01-20'])
+
+        archived_file = read_archived_file(self.root, '2025-01-20', 'index.html')
+        self.assertEqual(archived_file.data, b"<html>2025-01-20</html>")
+        with zipfile.ZipFile(self.root / 'archive' / '2025-01.zip') as pack:
+            self.assertEqual(
+                pack.getinfo('2025-01-10/index.html.gz').compress_type, zipfile.ZIP_STORED
+            )
+
+        self.assertEqual(read_report_manifest('2025-01-10', self.root)['report_date'], '2025-01-10')
+
+    def test_rapport_regenere_remplace(self):
+        archive_reports(30, self.root, today=date(2025, 3, 5))
+        regenerated = self.root / '2025-01-10'
+        regenerated.mkdir()
+        (regenerated / 'index.html').write_bytes(b"<html>v2</html>")
+
+        archive_reports(30, self.root, today=date(2025, 3, 5))
+
+        self.assertEqual(read_archived_file(self.root, '2025-01-10', 'index.html').data, b"<html>v2</html>")
+        self.assertIsNone(read_archived_file(self.root, '2025-01-10', 'manifest.json'))
+        self.assertIsNotNone(read_archived_file(self.root, '2025-01-20', 'index.html'))
+
+    def test_pack_remplace_ferme(self):
+        archive_reports(30, self.root, today=date(2025, 3, 5))
+        pack = self.root / 'archive' / '2025-01.zip'
+        reader = report_archive._PackReader()
+        with reader.open(pack) as (_, first):
+            self.assertIsNotNone(first.fp)
+            # Pack réécrit pendant la lecture: l'ancien reste ouvert jusqu'à sa fin
+            (self.root / '2025-01-10').mkdir()
+            (self.root / '2025-01-10' / 'index.html').write_bytes(b"<html>v2</html>")
+            archive_reports(30, self.root, today=date(2025, 3, 5))
+            with reader.open(pack) as (_, second):
+                self.assertIsNot(second, first)
+                self.assertIsNotNone(first.fp)
+        self.assertIsNone(first.fp)
+        reader.close()
+        self.assertIsNone(second.fp)
+
+
+class TestServeArchivedReports(ArchiveTestCase):
+    """Le serveur sert les pages archivées comme les pages sur disque"""
+
+    def setUp(self):
+        super().setUp()
+        archive_reports(30, self.root, today=date(2025, 3, 5))
+        self.old_base_dir = report_app.REPORTS_BASE_DIR
+        report_app.REPORTS_BASE_DIR = self.root
+        report_app.report_cache.clear()
+        self.client = TestClient(report_app.app)
+        self.auth = (report_app.REPORTS_BASIC_USER, report_app.REPORTS_BASIC_PASS)
+
+    def tearDown(self):
+        report_app.REPORTS_BASE_DIR = self.old_base_dir
+        report_app.report_cache.clear()
+        super().tearDown()
+
+    def test_page_archivee(self):
+        response = self.client.get(
+            '/reports/2025-01-10/index.html', auth=self.auth, headers={'Accept-Encoding': 'gzip'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['content-encoding'], 'gzip')
+        self.assertEqual(response.text, "<html>2025-01-10</html>")
+
+        etag = response.headers['etag']
+        cached = self.client.get(
+            '/reports/2025-01-10/index.html',
+            auth=self.auth,
+            headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag},
+        )
+        self.assertEqual(cached.status_code, 304)
+
+    def test_page_absente(self):
+        response = self.client.get('/reports/2025-01-10/absente.html', auth=self.auth)
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
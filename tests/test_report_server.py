@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests du service des rapports par le serveur FastAPI
+"""
+
+import gzip
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault('REPORTS_BASIC_PASS', 'test_password')
+
+from fastapi.testclient import TestClient
+
+from linxo_agent import pipeline_metrics
+from linxo_agent.report_server import app as report_app
+
+
+class ReportServerTestCase(unittest.TestCase):
+    """Répertoire de rapports temporaire servi par l'application"""
+
+    HTML = "<html><body>Rapport</body></html>"
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.report_dir = self.temp_dir / '2025-01-15'
+        self.report_dir.mkdir()
+        (self.report_dir / 'index.html').write_text(self.HTML, encoding='utf-8')
+        (self.report_dir / 'index.html.gz').write_bytes(gzip.compress(self.HTML.encode('utf-8')))
+
+        self.old_base_dir = report_app.REPORTS_BASE_DIR
+        report_app.REPORTS_BASE_DIR = self.temp_dir
+        report_app.report_cache.clear()
+        self.client = TestClient(report_app.app)
+        self.auth = (report_app.REPORTS_BASIC_USER, report_app.REPORTS_BASIC_PASS)
+
+    def tearDown(self):
+        report_app.REPORTS_BASE_DIR = self.old_base_dir
+        shutil.rmtree(self.temp_dir)
+
+
+class TestPrecompressedReports(ReportServerTestCase):
+    """Négociation Accept-Encoding sur les variantes pré-compressées"""
+
+    def test_parse_accept_encoding(self):
+        self.assertEqual(
+            report_app.parse_accept_encoding("gzip, br;q=0.5, deflate;q=0"),
+            {'gzip': 1.0, 'br': 0.5},
+        )
+        self.assertEqual(report_app.parse_accept_encoding(None), {})
+
+    def test_sert_variante_gzip(self):
+        response = self.client.get(
+            '/reports/2025-01-15/index.html',
+            auth=self.auth,
+            headers={'Accept-Encoding': 'gzip, br'},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['content-encoding'], 'gzip')
+        self.assertEqual(response.headers['vary'], 'Accept-Encoding')
+        self.assertEqual(response.text, self.HTML)
+
+    def test_sans_compression(self):
+        response = self.client.get(
+            '/reports/2025-01-15/index.html',
+            auth=self.auth,
+            headers={'Accept-Encoding': 'identity'},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('content-encoding', response.headers)
+        self.assertEqual(response.text, self.HTML)
+
+    def test_variante_br_preferee(self):
+        (self.report_dir / 'index.html.br').write_bytes(b'br')
+        page = report_app.get_report_file(self.report_dir / 'index.html')
+        served, encoding = report_app.select_precompressed(page, 'gzip, br')
+        self.assertEqual(encoding, 'br')
+        self.assertEqual(served.path.name, 'index.html.br')
+
+        served, encoding = report_app.select_precompressed(page, 'gzip, br;q=0.5')
+        self.assertEqual(encoding, 'gzip')
+
+
+class TestConditionalReports(ReportServerTestCase):
+    """ETag / Last-Modified et cache mémoire"""
+
+    def _get(self, **headers):
+        headers.setdefault('Accept-Encoding', 'identity')
+        return self.client.get('/reports/2025-01-15/index.html', auth=self.auth, headers=headers)
+
+    def test_etag_304(self):
+        first = self._get()
+        etag = first.headers['etag']
+        self.assertTrue(etag.startswith('"'))
+        self.assertIn('last-modified', first.headers)
+
+        second = self._get(**{'If-None-Match': etag})
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.content, b'')
+
+        other = self._get(**{'If-None-Match': '"autre"'})
+        self.assertEqual(other.status_code, 200)
+
+    def test_if_modified_since(self):
+        last_modified = self._get().headers['last-modified']
+        response = self._get(**{'If-Modified-Since': last_modified})
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_par_variante(self):
+        identity = self._get().headers['etag']
+        gzipped = self._get(**{'Accept-Encoding': 'gzip'}).headers['etag']
+        self.assertNotEqual(identity, gzipped)
+
+    def test_invalidation_mtime(self):
+        report_app.report_cache.revalidate_seconds = 0
+        try:
+            etag = self._get().headers['etag']
+            page = self.report_dir / 'index.html'
+            page.write_text("<html>v2</html>", encoding='utf-8')
+            os.utime(page, ns=(page.stat().st_atime_ns, page.stat().st_mtime_ns + 10**9))
+            response = self._get(**{'If-None-Match': etag})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.text, "<html>v2</html>")
+        finally:
+            report_app.report_cache.revalidate_seconds = report_app.REPORTS_CACHE_REVALIDATE
+
+    def test_cache_sans_acces_disque(self):
+        self._get()
+        (self.report_dir / 'index.html').unlink()
+        # Entrée encore fraîche: servie depuis la mémoire
+        self.assertEqual(self._get().text, self.HTML)
+
+    def test_gros_fichier_diffuse_sans_cache(self):
+        export = self.report_dir / 'export.csv'
+        export.write_bytes(b'date;montant\n' * 100)
+        with mock.patch.object(report_app.report_cache, 'max_entry_bytes', 1024):
+            response = self.client.get('/reports/2025-01-15/export.csv', auth=self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, export.read_bytes())
+        self.assertIsNone(report_app.report_cache.lookup(export))
+
+
+class TestReportFileCache(unittest.TestCase):
+    """LRU borné en octets"""
+
+    def test_eviction_lru(self):
+        temp_dir = Path(tempfile.mkdtemp())
+        try:
+            files = []
+            for name in ('a', 'b', 'c'):
+                path = temp_dir / name
+                path.write_bytes(b'x' * 10)
+                files.append(path)
+
+            cache = report_app.ReportFileCache(max_bytes=25)
+            cache.load(files[0])
+            cache.load(files[1])
+            cache.lookup(files[0])
+            cache.load(files[2])
+
+            self.assertEqual(cache.size, 20)
+            self.assertIsNotNone(cache.lookup(files[0]))
+            self.assertIsNone(cache.lookup(files[1]))
+        finally:
+            shutil.rmtree(temp_dir)
+
+
+class TestMetrics(ReportServerTestCase):
+    """Exposition /metrics (latence, cache, pipeline)"""
+
+    def setUp(self):
+        super().setUp()
+        report_app.request_latency.clear()
+        self.metrics_file = self.temp_dir / 'pipeline.json'
+        patcher = mock.patch.object(pipeline_metrics, 'PIPELINE_METRICS_FILE', self.metrics_file)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _metrics(self):
+        response = self.client.get('/metrics', auth=self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers['content-type'].startswith('text/plain'))
+        return response.text
+
+    def test_latence_par_route(self):
+        self.client.get('/reports/2025-01-15/index.html', auth=self.auth)
+        self.client.get('/reports/2025-01-16/absent.html', auth=self.auth)
+
+        text = self._metrics()
+        route = 'route="/reports/{date_path}/{file_path:path}",method="GET"'
+        self.assertIn(f'linxo_http_request_duration_seconds_count{{{route},status="200"}} 1', text)
+        self.assertIn(f'linxo_http_request_duration_seconds_count{{{route},status="404"}} 1', text)
+        self.assertIn(f'linxo_http_request_duration_seconds_bucket{{{route},status="200",le="+Inf"}} 1', text)
+        self.assertIn('linxo_report_cache_hit_ratio', text)
+
+    def test_etapes_du_pipeline(self):
+        with pipeline_metrics.track_stage('classify') as stage:
+            stage['rows'] = 42
+        with self.assertRaises(RuntimeError):
+            with pipeline_metrics.track_stage('upload'):
+                raise RuntimeError('rsync')
+        with pipeline_metrics.track_stage('notify') as stage:
+            stage['success'] = False
+        # Appel hors pipeline (admin, scripts): rien n'est enregistré
+        with pipeline_metrics.track_stage('parse', enabled=False) as stage:
+            stage['rows'] = 7
+        pipeline_metrics.record_stage('exclude', rows=3)
+
+        text = self._metrics()
+        self.assertIn('linxo_pipeline_stage_rows{stage="classify"} 42', text)
+        self.assertIn('linxo_pipeline_stage_success{stage="upload"} 0', text)
+        self.assertIn('linxo_pipeline_stage_success{stage="notify"} 0', text)
+        self.assertIn('linxo_pipeline_stage_rows{stage="exclude"} 3', text)
+        self.assertNotIn('linxo_pipeline_stage_duration_seconds{stage="exclude"}', text)
+        self.assertNotIn('stage="parse"', text)
+
+    def test_authentification_requise(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+
+
+if __name__ == '__main__':
+    unittest.main()
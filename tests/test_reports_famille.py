@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests de la classification vectorisée des familles de dépenses
+"""
+
+import subprocess
+import unittest
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from linxo_agent.reports import (
+    FAMILLE_RULES,
+    _parse_dates_column,
+    _partition_by_famille,
+    TransactionBatch,
+    classify_famille,
+    classify_famille_batch,
+    classify_famille_series,
+)
+
+
+class TestClassifyFamilleSeries(unittest.TestCase):
+    """Le moteur vectorisé doit reproduire exactement classify_famille"""
+
+    def test_identique_au_scalaire(self):
+        categories = []
+        libelles = []
+        # Chaque mot-clé de chaque règle, seul puis combiné avec le suivant
+        keywords = [k for _, cat_kw, lib_kw in FAMILLE_RULES for k in cat_kw + lib_kw]
+        for i, keyword in enumerate(keywords):
+            following = keywords[(i + 1) % len(keywords)]
+            categories.extend([keyword.lower(), "", f"{following} {keyword}"])
+            libelles.extend(["", keyword.title(), following])
+        categories.extend(["Autre", "Café & bar", "eau"])
+        libelles.extend(["DIVERS", "", "edf facture"])
+
+        expected = [classify_famille(c, l) for c, l in zip(categories, libelles)]
+        result = classify_famille_series(pd.Series(categories), pd.Series(libelles))
+
+        self.assertEqual(result.tolist(), expected)
+        self.assertEqual(classify_famille_batch(categories, libelles), expected)
+
+    def test_valeurs_manquantes(self):
+        result = classify_famille_series(
+            pd.Series([None, "Alimentation"]),
+            pd.Series(["NETFLIX", None]),
+        )
+        self.assertEqual(result.tolist(), ["Abonnements", "Alimentation"])
+
+    def test_conserve_index(self):
+        categories = pd.Series(["Transport", "Santé"], index=[10, 20])
+        libelles = pd.Series(["TOTAL", "PHARMACIE"], index=[10, 20])
+        result = classify_famille_series(categories, libelles)
+        self.assertEqual(list(result.index), [10, 20])
+        self.assertEqual(result[10], "Transports")
+
+    def test_doublons(self):
+        categories = pd.Series(['Transport', 'Loisirs', 'transport', None] * 50, index=range(100, 300))
+        libelles = pd.Series(['TOTAL', 'NETFLIX', 'total', 'EDF'] * 50, index=range(100, 300))
+        result = classify_famille_series(categories, libelles)
+        self.assertEqual(
+            result.tolist(), ['Transports', 'Loisirs & Sports', 'Transports', 'Énergie & Eau'] * 50
+        )
+        self.assertEqual(list(result.index), list(range(100, 300)))
+
+    def test_serie_vide(self):
+        result = classify_famille_series(pd.Series([], dtype=object), pd.Series([], dtype=object))
+        self.assertEqual(len(result), 0)
+
+
+class TestPartitionByFamille(unittest.TestCase):
+    """Partition unique des lignes par famille"""
+
+    def test_partition_stable(self):
+        familles = pd.Series(["Transports", "Alimentation", "Transports", None, "Alimentation"])
+        names, order, bounds = _partition_by_famille(familles)
+
+        self.assertEqual(names, ["Alimentation", "Transports"])
+        groups = {
+            name: order[bounds[i]:bounds[i + 1]].tolist()
+            for i, name in enumerate(names)
+        }
+        self.assertEqual(groups, {"Alimentation": [1, 4], "Transports": [0, 2]})
+
+    def test_tri_par_date(self):
+        dates = pd.Series(["14/01/2025", "", "2025-01-15", "invalide", "13/01/2025"])
+        keys = _parse_dates_column(dates)
+        order = np.argsort(-keys, kind="stable").tolist()
+        # Date décroissante, dates vides/invalides en dernier dans l'ordre d'origine
+        self.assertEqual(order, [2, 0, 4, 1, 3])
+
+
+class TestTransactionBatch(unittest.TestCase):
+    """Lot de colonnes construit sans pandas"""
+
+    RECORDS = [
+        {'date_str': '14/01/2025', 'libelle': 'NETFLIX', 'montant': -9.99, 'categorie': 'Loisirs'},
+        {'date': '2025-01-15', 'libelle': 'EDF', 'montant': 'abc', 'categorie': 'Énergie'},
+        {'libelle': 'SNCF', 'montant': None, 'categorie': 'Transport'},
+    ]
+
+    def test_depuis_transactions(self):
+        batch = TransactionBatch.from_records(self.RECORDS)
+        self.assertEqual(len(batch), 3)
+        self.assertEqual(batch.montants.tolist(), [-9.99, 0.0, 0.0])
+        self.assertEqual(batch.dates, ['14/01/2025', '2025-01-15', ''])
+        self.assertIsNone(batch.familles)
+
+    def test_identique_au_dataframe(self):
+        df = pd.DataFrame({
+            'montant': [-9.99, 'abc', np.nan],
+            'libelle': ['NETFLIX', 'EDF', 'SNCF'],
+            'categorie': ['Loisirs', 'Énergie', 'Transport'],
+            'date_str': ['14/01/2025', '2025-01-15', None],
+        })
+        from_df = TransactionBatch.from_dataframe(df)
+        from_records = TransactionBatch.from_records(self.RECORDS)
+        self.assertEqual(from_df.montants.tolist(), from_records.montants.tolist())
+        self.assertEqual(from_df.dates, from_records.dates)
+        self.assertEqual(df['montant'].tolist()[1], 'abc')  # DataFrame non modifié
+        # Familles du moteur vectorisé, identiques au classement sans pandas
+        self.assertEqual(
+            from_df.familles,
+            classify_famille_batch(from_records.categories, from_records.libelles),
+        )
+
+
+    def test_colonnes_manquantes(self):
+        with self.assertRaises(ValueError):
+            TransactionBatch.from_dataframe(pd.DataFrame({'montant': [1.0]}))
+
+    def test_import_sans_pandas(self):
+        code = (
+            "import sys; sys.path.insert(0, 'linxo_agent'); import reports; "
+            "print('pandas' in sys.modules)"
+        )
+        output = subprocess.run(
+            [sys.executable, '-c', code],
+            cwd=Path(__file__).parent.parent, capture_output=True, text=True, check=True,
+        ).stdout
+        self.assertEqual(output.strip().splitlines()[-1], 'False')
+
+
+if __name__ == '__main__':
+    unittest.main()
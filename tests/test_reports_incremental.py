@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests de la génération incrémentale des rapports (empreintes de contexte)
+"""
+
+import gzip
+import hashlib
+import json
+import re
+import unittest
+import shutil
+import sys
+import tempfile
+from datetime import date
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+import pandas as pd
+
+# Ajouter le répertoire parent et linxo_agent au path (imports à plat du module)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'linxo_agent'))
+
+from linxo_agent import reports as reports_module
+from linxo_agent.reports import (
+    MANIFEST_FILE,
+    build_daily_report,
+    latest_report_manifest,
+    load_manifest,
+    read_report_manifest,
+    resolve_render_workers,
+    write_page_stream,
+)
+import config as config_module
+
+
+# Les jetons signés contiennent une expiration à la seconde près
+TOKEN_RE = re.compile(r"\?t=[0-9a-f]+:\d+")
+
+# Registre de templates tel qu'importé par reports.py (import à plat)
+templates = sys.modules[reports_module.get_environment.__module__]
+
+
+def read_page(path):
+    return TOKEN_RE.sub('', path.read_text(encoding='utf-8'))
+
+
+class ReportTestCase(unittest.TestCase):
+    """Génère un rapport de test dans une racine temporaire (supprimée après chaque test)"""
+
+    REPORT_DATE = date(2000, 1, 15)
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        for patcher in (
+            mock.patch.object(reports_module, 'REPORTS_ROOT', self.root / 'reports'),
+            mock.patch.object(templates, 'JINJA_CACHE_DIR', self.root / 'jinja'),
+            mock.patch.dict(templates._environments, clear=True),
+            # Pas de lecture de linxo_agent/depenses_recurrentes.json
+            mock.patch.object(config_module, 'get_config',
+                              return_value=SimpleNamespace(depenses_data={'depenses_fixes': []})),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.df = pd.DataFrame({
+            'date': ['15/01/2000', '14/01/2000', '13/01/2000'],
+            'libelle': ['CARREFOUR', 'TOTAL STATION', 'RESTAURANT'],
+            'montant': [-45.50, -60.00, -35.00],
+            'categorie': ['Alimentation', 'Transport', 'Restaurant'],
+            'date_str': ['15/01/2000', '14/01/2000', '13/01/2000'],
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _build(self, df, render_workers=None):
+        return build_daily_report(
+            df,
+            report_date=self.REPORT_DATE,
+            base_url='http://localhost:8810/reports',
+            signing_key='test_key',
+            render_workers=render_workers,
+        )
+
+
+
+class TestIncrementalReport(ReportTestCase):
+    """Seules les pages dont le contexte change doivent être réécrites"""
+
+    def test_reconstruction_identique(self):
+        first = self._build(self.df)
+        self.assertIn(first.base_dir / 'index.html', first.changed_files)
+        self.assertIn('index.html', load_manifest(first.base_dir)['pages'])
+        self.assertTrue((first.base_dir / MANIFEST_FILE).exists())
+        self.assertTrue((first.base_dir / 'index.html.gz').exists())
+
+        # Les jetons signés changent à chaque exécution mais ne comptent pas
+        second = self._build(self.df)
+        self.assertEqual(second.changed_files, [])
+
+    def test_seules_pages_modifiees(self):
+        self._build(self.df)
+        df = self.df.copy()
+        df.loc[1, 'montant'] = -70.00
+        report = self._build(df)
+
+        changed = {path.name for path in report.changed_files}
+        self.assertIn('index.html', changed)
+        self.assertIn('family-transports.html', changed)
+        self.assertNotIn('family-alimentation.html', changed)
+
+    def test_page_supprimee_regeneree(self):
+        first = self._build(self.df)
+        (first.base_dir / 'family-alimentation.html').unlink()
+        second = self._build(self.df)
+        self.assertEqual(
+            [path.name for path in second.changed_files], ['family-alimentation.html']
+        )
+
+    def test_jetons_proches_expiration(self):
+        first = self._build(self.df)
+        pages = load_manifest(first.base_dir)['pages']
+        self.assertIn('token_expiry', pages['index.html'])
+        # Jetons valides 24 h: tous considérés comme expirant bientôt
+        with mock.patch('linxo_agent.reports.TOKEN_RENEW_MARGIN', 48 * 3600):
+            second = self._build(self.df)
+        self.assertEqual(
+            sorted(path.name for path in second.changed_files),
+            sorted(path.name for path in first.changed_files),
+        )
+        self.assertEqual(self._build(self.df).changed_files, [])
+
+    def test_transactions_sans_dataframe(self):
+        from_df = self._build(self.df)
+        expected = {path.name: read_page(path) for path in from_df.changed_files}
+
+        records = self.df.to_dict('records')
+        from_records = self._build(records)
+        self.assertEqual(from_records.changed_files, [])
+        self.assertEqual(
+            [(f['name'], f['total']) for f in from_records.families],
+            [(f['name'], f['total']) for f in from_df.families],
+        )
+        for name, html in expected.items():
+            self.assertEqual(read_page(from_records.base_dir / name), html)
+
+
+class TestParallelRendering(ReportTestCase):
+    """Le rendu parallèle doit produire le même résultat que le rendu séquentiel"""
+
+    def test_ordre_stable_et_timings(self):
+        sequential = self._build(self.df, render_workers=1)
+        expected = {path.name: read_page(path) for path in sequential.changed_files}
+        (sequential.base_dir / MANIFEST_FILE).unlink()
+
+        parallel = self._build(self.df, render_workers=4)
+        self.assertEqual(
+            [f['name'] for f in parallel.families], [f['name'] for f in sequential.families]
+        )
+        self.assertEqual(set(parallel.render_timings), set(expected))
+        for name, html in expected.items():
+            self.assertEqual(read_page(parallel.base_dir / name), html)
+
+    def test_resolution_workers(self):
+        self.assertEqual(resolve_render_workers(3), 3)
+        self.assertGreaterEqual(resolve_render_workers(0), 1)
+
+
+class TestStreamedPages(unittest.TestCase):
+    """Écriture d'une page rendue par morceaux"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_morceaux_et_variantes(self):
+        chunks = [f"<p>ligne {i} é</p>\n" for i in range(20000)]
+        html = ''.join(chunks).encode('utf-8')
+        page = self.temp_dir / 'page.html'
+
+        content_hash, size = write_page_stream(page, iter(chunks))
+
+        self.assertEqual(page.read_bytes(), html)
+        self.assertEqual(gzip.decompress((self.temp_dir / 'page.html.gz').read_bytes()), html)
+        self.assertEqual(content_hash, hashlib.sha256(html).hexdigest())
+        self.assertEqual(size, len(html))
+        self.assertEqual(
+            sorted(p.name for p in self.temp_dir.iterdir() if not p.name.endswith('.br')),
+            ['page.html', 'page.html.gz'],
+        )
+
+    def test_erreur_de_rendu(self):
+        page = self.temp_dir / 'page.html'
+        page.write_text('ancienne', encoding='utf-8')
+
+        def chunks():
+            yield '<html>'
+            raise RuntimeError('template')
+
+        with self.assertRaises(RuntimeError):
+            write_page_stream(page, chunks())
+        # Page précédente intacte, aucun fichier temporaire laissé
+        self.assertEqual(page.read_text(encoding='utf-8'), 'ancienne')
+        self.assertEqual([p.name for p in self.temp_dir.iterdir()], ['page.html'])
+
+
+class TestReportManifest(ReportTestCase):
+    """Synthèse du rapport écrite dans manifest.json"""
+
+    def test_contenu_manifeste(self):
+        analysis_result = {'total_variables': 650.0, 'total_fixes': 300.0}
+        # Appel par mot-clé: nom historique du paramètre
+        report = build_daily_report(
+            df=self.df,
+            report_date=self.REPORT_DATE,
+            base_url='http://localhost:8810/reports',
+            budget_max=1300.0,
+            analysis_result=analysis_result,
+        )
+
+        manifest = read_report_manifest(self.REPORT_DATE)
+        self.assertEqual(manifest['report_date'], '2000-01-15')
+        self.assertAlmostEqual(manifest['grand_total'], report.grand_total)
+        self.assertEqual(
+            [f['name'] for f in manifest['families']], [f['name'] for f in report.families]
+        )
+        self.assertEqual(manifest['totals'], {'fixes': 300.0, 'variables': 650.0})
+        self.assertAlmostEqual(manifest['budget']['reste'], 650.0)
+        self.assertAlmostEqual(manifest['prediction']['fin_mois'], 650.0 / 15 * 31)
+
+        index_html = (report.base_dir / 'index.html').read_bytes()
+        self.assertEqual(
+            manifest['pages']['index.html']['content_hash'],
+            hashlib.sha256(index_html).hexdigest(),
+        )
+
+    def test_dernier_manifeste(self):
+        root = Path(tempfile.mkdtemp())
+        try:
+            for report_date in ('2000-01-14', '2000-01-16'):
+                (root / report_date).mkdir()
+                (root / report_date / MANIFEST_FILE).write_text(
+                    json.dumps({'report_date': report_date}), encoding='utf-8'
+                )
+            (root / '2000-01-17').mkdir()  # sans manifeste
+            self.assertEqual(latest_report_manifest(root)['report_date'], '2000-01-16')
+        finally:
+            shutil.rmtree(root)
+
+    def test_sans_budget(self):
+        self._build(self.df)
+        manifest = read_report_manifest('2000-01-15')
+        self.assertIsNone(manifest['budget'])
+        self.assertIsNone(manifest['prediction'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests des synthèses mensuelles et annuelles
+"""
+
+import json
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from linxo_agent import rollups as rollups_module
+from linxo_agent.rollups import rebuild_rollups, update_rollups
+
+# Registre de templates tel qu'importé par rollups.py (import à plat)
+templates = sys.modules[rollups_module.get_environment.__module__]
+
+
+def write_manifest(root, report_date, grand_total, variables=0.0):
+    report_dir = root / report_date
+    report_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {
+        'report_date': report_date,
+        'grand_total': grand_total,
+        'total_transactions': 10,
+        'families': [{'name': 'Alimentation', 'slug': 'alimentation',
+                      'total': grand_total, 'count': 10, 'file': 'family-alimentation.html'}],
+        'totals': {'fixes': 100.0, 'variables': variables},
+        'budget': None,
+        'prediction': None,
+        'pages': {},
+    }
+    (report_dir / 'manifest.json').write_text(json.dumps(manifest), encoding='utf-8')
+
+
+class TestRollups(unittest.TestCase):
+    """Repli incrémental des rapports journaliers"""
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.cache_dir = Path(tempfile.mkdtemp())
+        self.state_dir = self.cache_dir / 'rollups_state'
+        for patcher in (
+            mock.patch.object(templates, 'JINJA_CACHE_DIR', self.cache_dir),
+            mock.patch.object(rollups_module, 'ROLLUPS_STATE_DIR', self.state_dir),
+            mock.patch.dict(templates._environments, clear=True),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        write_manifest(self.root, '2025-01-10', 100.0, variables=50.0)
+        write_manifest(self.root, '2025-01-20', 200.0, variables=80.0)
+        write_manifest(self.root, '2025-02-05', 30.0, variables=10.0)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+        shutil.rmtree(self.cache_dir)
+
+    def _state(self, name):
+        return json.loads((self.state_dir / name).read_text(encoding='utf-8'))
+
+    def test_reconstruction(self):
+        pages = {p.name for p in rebuild_rollups(self.root)}
+        self.assertEqual(pages, {'2025-01.html', '2025-02.html', '2025.html', 'index.html'})
+
+        # Le mois reprend le dernier jour, l'année cumule les mois
+        january = self._state('month-2025-01.json')['summary']
+        self.assertEqual(january['last_day'], '2025-01-20')
+        self.assertEqual(january['grand_total'], 200.0)
+        year = self._state('year-2025.json')
+        self.assertEqual(sorted(year['months']), ['2025-01', '2025-02'])
+
+        html = (self.root / 'rollups' / '2025.html').read_text(encoding='utf-8')
+        self.assertIn('230.00 €', html)
+        # L'état n'est pas publié avec les rapports
+        self.assertEqual(list(self.root.rglob('*-2025*.json')), [])
+
+    def test_jour_inchange_ignore(self):
+        rebuild_rollups(self.root)
+        self.assertEqual(update_rollups(['2025-01-20'], self.root), [])
+
+    def test_seul_mois_modifie(self):
+        rebuild_rollups(self.root)
+        write_manifest(self.root, '2025-02-06', 45.0)
+        pages = {p.name for p in update_rollups(['2025-02-06'], self.root)}
+        self.assertEqual(pages, {'2025-02.html', '2025.html', 'index.html'})
+        self.assertEqual(self._state('year-2025.json')['months']['2025-02']['grand_total'], 45.0)
+        self.assertEqual(self._state('year-2025.json')['months']['2025-01']['grand_total'], 200.0)
+
+    def test_ancien_etat_deplace(self):
+        rebuild_rollups(self.root)
+        legacy_dir = self.root / 'rollups' / 'state'
+        self.state_dir.rename(legacy_dir)
+
+        # L'état déplacé est repris: l'année garde le mois non modifié
+        write_manifest(self.root, '2025-02-06', 45.0)
+        update_rollups(['2025-02-06'], self.root)
+        self.assertFalse(legacy_dir.exists())
+        self.assertEqual(sorted(self._state('year-2025.json')['months']), ['2025-01', '2025-02'])
+
+
+if __name__ == '__main__':
+    unittest.main()
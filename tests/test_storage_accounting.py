@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests de la comptabilité de l'espace disque par répertoire
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+from unittest import mock
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from linxo_agent import report_archive
+from linxo_agent import reports as reports_module
+from linxo_agent.storage_accounting import StorageLedger, scan_directory
+
+# Module tel qu'importé par reports.py (import à plat)
+accounting = sys.modules[reports_module.replace_file.__module__]
+
+
+class StorageLedgerTestCase(unittest.TestCase):
+    """Base temporaire, répertoires logs/ et reports/, profils Chrome"""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.logs = self.tmp / "logs"
+        self.reports = self.tmp / "reports"
+        (self.reports / "2025-01-10").mkdir(parents=True)
+        self.logs.mkdir()
+        (self.logs / "a.log").write_bytes(b"x" * 100)
+        (self.reports / "2025-01-10" / "index.html").write_bytes(b"y" * 50)
+        profile = self.tmp / ".chrome_user_data_1"
+        (profile / "Default").mkdir(parents=True)
+        (profile / "Default" / "Cookies").write_bytes(b"z" * 30)
+        (self.tmp / "other.txt").write_bytes(b"ignored")
+
+        self.ledger = StorageLedger(
+            self.tmp / "db" / "storage.db",
+            directories={
+                "logs": (self.logs, None),
+                "reports": (self.reports, None),
+                "chrome_user_data": (self.tmp, ".chrome_user_data_*"),
+            },
+            budgets={"logs": 120},
+        )
+
+    def tearDown(self):
+        self.ledger.stop_reconciler()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+
+class TestStorageLedger(StorageLedgerTestCase):
+
+    def test_first_usage_scans_then_reads_counters(self):
+        usage = self.ledger.usage()
+        self.assertEqual((usage["logs"]["bytes"], usage["logs"]["files"]), (100, 1))
+        self.assertEqual(usage["reports"]["bytes"], 50)
+        self.assertEqual(usage["chrome_user_data"]["bytes"], 30)
+        self.assertFalse(usage["logs"]["over_budget"])
+
+        # Écriture hors comptabilité: visible seulement après rapprochement
+        (self.logs / "b.log").write_bytes(b"x" * 40)
+        with mock.patch.object(accounting, "scan_directory", side_effect=AssertionError):
+            self.assertEqual(self.ledger.usage("logs")["logs"]["bytes"], 100)
+        self.assertEqual(self.ledger.reconcile(["logs"])["logs"]["bytes"], 140)
+        self.assertEqual(self.ledger.over_budget(), ["logs"])
+
+    def test_records_ignored_until_first_reconcile(self):
+        self.ledger.record(self.logs / "a.log", 500, 1)
+        self.ledger.reconcile()
+        self.ledger.record(self.logs / "a.log", 25, 1)
+        self.ledger.record(self.tmp / "other.txt", 1000, 1)
+        usage = self.ledger.usage()
+        self.assertEqual((usage["logs"]["bytes"], usage["logs"]["files"]), (125, 2))
+        self.assertEqual(usage["reports"]["bytes"], 50)
+
+    def test_directory_for(self):
+        self.assertEqual(self.ledger.directory_for(self.reports / "2025-01-10" / "x"), "reports")
+        self.assertEqual(
+            self.ledger.directory_for(self.tmp / ".chrome_user_data_2" / "Default"), "chrome_user_data"
+        )
+        self.assertIsNone(self.ledger.directory_for(self.tmp / "other.txt"))
+        self.assertIsNone(self.ledger.directory_for(self.logs))
+
+    def test_batch_flushes_once(self):
+        self.ledger.reconcile()
+        with mock.patch.object(self.ledger, "_connection", wraps=self.ledger._connection) as connection:
+            with self.ledger.batch():
+                for _ in range(10):
+                    self.ledger.record(self.reports / "page.html", 10, 1)
+            self.assertEqual(connection.call_count, 1)
+        self.assertEqual(self.ledger.usage("reports")["reports"]["bytes"], 150)
+
+
+class TestTrackedFileOperations(StorageLedgerTestCase):
+    """Écritures du pipeline reportées dans les compteurs"""
+
+    def setUp(self):
+        super().setUp()
+        self.ledger.reconcile()
+        patcher = mock.patch.object(accounting, "storage_ledger", self.ledger)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_write_atomic_and_page_variants(self):
+        page = self.reports / "2025-01-10" / "index.html"
+        reports_module.write_atomic(page, b"y" * 80)
+        reports_module.write_page(self.reports / "2025-01-10" / "famille.html", "<html>ok</html>")
+
+        usage = self.ledger.usage("reports")["reports"]
+        self.assertEqual((usage["bytes"], usage["files"]), scan_directory(self.reports))
+
+    def test_archive_counts_in_one_flush(self):
+        (self.reports / "2025-01-11").mkdir()
+        (self.reports / "2025-01-11" / "index.html").write_bytes(b"w" * 70)
+        self.ledger.reconcile(["reports"])
+        with mock.patch.object(report_archive, "storage_ledger", self.ledger), \
+                mock.patch.object(self.ledger, "_connection", wraps=self.ledger._connection) as connection:
+            archived = report_archive.archive_reports(30, self.reports, today=date(2025, 3, 5))
+            self.assertEqual(connection.call_count, 1)
+
+        self.assertEqual(archived, {"2025-01": ["2025-01-10", "2025-01-11"]})
+        usage = self.ledger.usage("reports")["reports"]
+        self.assertEqual((usage["bytes"], usage["files"]), scan_directory(self.reports))
+
+    def test_remove_tree_and_file(self):
+        accounting.remove_tree(self.tmp / ".chrome_user_data_1", ignore_errors=True)
+        accounting.remove_file(self.logs / "a.log")
+        usage = self.ledger.usage()
+        self.assertEqual((usage["chrome_user_data"]["bytes"], usage["chrome_user_data"]["files"]), (0, 0))
+        self.assertEqual((usage["logs"]["bytes"], usage["logs"]["files"]), (0, 0))
+        self.assertFalse(os.path.exists(self.tmp / ".chrome_user_data_1"))
+
+
+if __name__ == '__main__':
+    unittest.main()
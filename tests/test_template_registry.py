@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests du registre partagé des environnements Jinja2
+"""
+
+import shutil
+import unittest
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from linxo_agent import template_registry
+
+
+class TestTemplateRegistry(unittest.TestCase):
+    """Tests du registre de templates"""
+
+    def setUp(self):
+        # Cache de bytecode et environnements propres au test
+        self.cache_dir = Path(tempfile.mkdtemp())
+        for patcher in (
+            mock.patch.object(template_registry, "JINJA_CACHE_DIR", self.cache_dir),
+            mock.patch.dict(template_registry._environments, clear=True),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_environnement_partage(self):
+        env1 = template_registry.get_environment("reports")
+        env2 = template_registry.get_environment("reports")
+        self.assertIs(env1, env2)
+        self.assertIsNot(env1, template_registry.get_environment("email"))
+
+    def test_configuration(self):
+        env = template_registry.get_environment("reports")
+        self.assertTrue(env.auto_reload)
+        self.assertIsNotNone(env.bytecode_cache)
+
+    def test_famille_inconnue(self):
+        with self.assertRaises(ValueError):
+            template_registry.get_environment("inconnue")
+
+    def test_precompilation(self):
+        compiled = template_registry.precompile_templates()
+        self.assertIn("reports/family.html.j2", compiled)
+        self.assertIn("email/daily_summary.html.j2", compiled)
+        self.assertTrue(any(self.cache_dir.iterdir()))
+
+
+if __name__ == '__main__':
+    unittest.main()